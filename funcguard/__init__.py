@@ -5,12 +5,13 @@ __version__ = (Path(__file__).parent / ".version").read_text().strip()
 from .core import timeout_handler, retry_function, ask_select
 from .tools import send_request, curl_cffi_request, check_url_valid, encode_basic_auth, md5_hash
 from .time_utils import (
-    time_log, time_diff, time_monitor, time_wait, color_logger,
-    get_now, cal_date_diff
+    time_log, time_diff, time_monitor, time_monitored, time_wait, color_logger,
+    get_now, cal_date_diff, ProgressTracker, Stopwatch, timer
 )
 
-from .printer import print_block, print_line, print_title, print_progress
-from .ip_utils import get_local_ip, get_public_ip, is_valid_ip, get_ip_info
+from .monitor_utils import TimingRegistry, timing_registry, timed, print_timing_report, SamplingProfiler, MemoryProbe
+from .printer import print_block, print_line, print_title, print_progress, ProgressRenderer, ProgressBar
+from .ip_utils import get_local_ip, get_public_ip, is_valid_ip, get_ip_info, IPRangeIndex
 from .pd_utils import (
     # 数据填充类
     fill_na as pd_fill_na,
@@ -32,9 +33,19 @@ from .pd_utils import (
     # 数据筛选类
     pd_filter,
     pd_select_columns,
+    pd_filter_chunks,
+    pd_filter_to_file,
+    pd_count_chunks,
     pd_build_mask,
     pd_build_masks,
     pd_combine_masks,
+    pd_compile_conditions,
+    pd_build_expr_mask,
+    pd_explain,
+    ConditionPlanner,
+    PackedMask,
+    ColumnIndex,
+    SortedIndex,
     pd_count,
     pd_value_counts,
     pd_group_agg,
@@ -43,8 +54,8 @@ from .pd_utils import (
 )
 from .calculate import format_difference
 
-from .models import RequestLog
-from .log_utils import setup_logger
+from .models import RequestLog, SlowCallProfile
+from .log_utils import setup_logger, JsonFormatter, DedupFilter, configure_funcguard_logger, funcguard_logger
 
 
 # 暴露主要接口
@@ -66,10 +77,24 @@ __all__ = [
     
     # 时间和日志工具
     "time_log",
+    "ProgressTracker",
     "time_diff",
     "time_monitor",
+    "time_monitored",
+    "Stopwatch",
+    "timer",
+    "TimingRegistry",
+    "timing_registry",
+    "timed",
+    "print_timing_report",
+    "SamplingProfiler",
+    "MemoryProbe",
     "time_wait",
     "setup_logger",
+    "JsonFormatter",
+    "DedupFilter",
+    "configure_funcguard_logger",
+    "funcguard_logger",
     "color_logger",
     "get_now",
     "cal_date_diff",
@@ -79,12 +104,15 @@ __all__ = [
     "print_line",
     "print_title",
     "print_progress",
+    "ProgressRenderer",
+    "ProgressBar",
 
     # IP 工具
     "get_local_ip",
     "get_public_ip",
     "is_valid_ip",
     "get_ip_info",
+    "IPRangeIndex",
 
     # pandas 数据填充类
     "pd_fill_na",
@@ -104,11 +132,21 @@ __all__ = [
     # 数据筛选类
     "pd_filter",
     "pd_select_columns",
+    "pd_filter_chunks",
+    "pd_filter_to_file",
+    "pd_count_chunks",
 
     # 统计分析类
     "pd_build_mask",
     "pd_build_masks",
     "pd_combine_masks",
+    "pd_compile_conditions",
+    "pd_build_expr_mask",
+    "pd_explain",
+    "ConditionPlanner",
+    "PackedMask",
+    "ColumnIndex",
+    "SortedIndex",
     "pd_count",
     "pd_value_counts",
     "pd_group_agg",
@@ -119,5 +157,6 @@ __all__ = [
     
     # 数据模型
     "RequestLog",
+    "SlowCallProfile",
 
 ]
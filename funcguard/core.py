@@ -1,5 +1,6 @@
 import time
 from concurrent.futures import ThreadPoolExecutor , TimeoutError
+from .log_utils import funcguard_logger
 
 
 class FuncguardTimeoutError(Exception):
@@ -44,7 +45,7 @@ def retry_function( func , max_retries = 5 , execute_timeout = 90 , task_name =
     :param func: 需要重试的函数
     :param max_retries: 最大重试次数
     :param execute_timeout: 执行超时时间
-    :param task_name: 任务名称，用于打印日志
+    :param task_name: 任务名称，用于打印日志（通过 funcguard logger 输出，可用 configure_funcguard_logger 配置或静默）
     :param args: func的位置参数
     :param kwargs: func的关键字参数
     :return: func的返回值
@@ -67,7 +68,7 @@ def retry_function( func , max_retries = 5 , execute_timeout = 90 , task_name =
         except Exception as e :
             last_exception = e
             retry_count += 1
-            print( e )
+            funcguard_logger.warning( "%s" , e )
             if "TimeoutError" in str( e ) :
                 # 计划延长的时间
                 extend_time = 30 * retry_count
@@ -80,10 +81,10 @@ def retry_function( func , max_retries = 5 , execute_timeout = 90 , task_name =
                     kwargs[ 'timeout' ] = original_timeout + extend_time
                     # print( f"增加timeout参数至: {kwargs[ 'timeout' ]}秒" )
 
-            print( f"{task_name} : {func.__name__} 请求失败，正在重试... (第{retry_count}次)" )
+            funcguard_logger.warning( "%s : %s 请求失败，正在重试... (第%d次)" , task_name , func.__name__ , retry_count )
             if retry_count < max_retries :  # 如果不是最后一次重试，则等待一段时间后重试
                 time.sleep( 5 * retry_count )
-    print( f"请求失败次数达到上限：{max_retries}次，终止请求。重试了{retry_count}次" )
+    funcguard_logger.error( "请求失败次数达到上限：%d次，终止请求。重试了%d次" , max_retries , retry_count )
     # 这里可以添加更多的错误处理逻辑，例如记录错误信息
     if last_exception:
         raise last_exception  # 重新抛出最后一个异常
@@ -3,10 +3,15 @@
 """
 IP地址检测工具模块
 
-提供获取本机IP地址、公网IP地址以及IP地址验证等功能。
+提供获取本机IP地址、公网IP地址、IP地址验证以及IP网段匹配等功能。
 """
 
+import csv
+import heapq
+import json
 import socket
+import ipaddress
+import numpy as np
 import requests
 
 
@@ -100,4 +105,260 @@ def get_ip_info():
         'hostname': socket.gethostname()
     }
     
-    return ip_info
\ No newline at end of file
+    return ip_info
+
+_IPV4_MAX = 2 ** 32 - 1
+_SEGMENT_DTYPE = np.dtype([("start", "<u4"), ("end", "<u4"), ("range_id", "<i8")])
+
+
+def _ip_to_int(ip):
+    """将单个 IPv4 地址（字符串或整数）转换为 32 位整数"""
+    if isinstance(ip, (int, np.integer)):
+        value = int(ip)
+        if value < 0 or value > _IPV4_MAX:
+            raise ValueError(f"IP整数超出IPv4范围: {ip}")
+        return value
+    return int(ipaddress.IPv4Address(str(ip).strip()))
+
+
+def _ips_to_ints(ips):
+    """
+    批量将 IPv4 地址转换为 uint32 数组
+
+    整数数组直接转换；字符串逐个拆成 4 段并校验后整体计算，避免逐个构造 IPv4Address 对象。
+    """
+    arr = np.asarray(ips)
+    if arr.ndim != 1:
+        arr = arr.reshape(-1)
+    if arr.size == 0:
+        return np.empty(0, dtype=np.uint32)
+    if np.issubdtype(arr.dtype, np.integer):
+        if arr.min() < 0 or arr.max() > _IPV4_MAX:
+            raise ValueError("IP整数超出IPv4范围")
+        return arr.astype(np.uint32)
+
+    # 每个地址单独拆分并校验段数，避免格式错误的地址之间相互“借用”字段
+    parts = [str(ip).strip().split(".") for ip in arr]
+    for ip, octet_texts in zip(arr, parts):
+        if len(octet_texts) != 4 or not all(text.isdigit() for text in octet_texts):
+            raise ValueError(f"IPv4地址格式不合法: {ip}")
+    octets = np.array(parts, dtype=np.int64)
+    invalid = (octets > 255).any(axis=1)
+    if invalid.any():
+        raise ValueError(f"IPv4地址格式不合法: {arr[int(np.argmax(invalid))]}")
+    ints = (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+    return ints.astype(np.uint32)
+
+
+def _parse_range(text):
+    """
+    解析单个网段文本，返回 (起始整数, 结束整数)
+
+    支持格式：CIDR（10.0.0.0/8）、区间（10.0.0.1-10.0.0.9）、单个IP（10.0.0.1）
+    """
+    text = text.strip()
+    if "/" in text:
+        network = ipaddress.IPv4Network(text, strict=False)
+        return int(network.network_address), int(network.broadcast_address)
+    if "-" in text:
+        start_text, end_text = text.split("-", 1)
+        start, end = _ip_to_int(start_text), _ip_to_int(end_text)
+        if start > end:
+            raise ValueError(f"网段起始IP大于结束IP: {text}")
+        return start, end
+    value = _ip_to_int(text)
+    return value, value
+
+
+class IPRangeIndex:
+    """
+    IPv4 网段索引，用于海量 IP 到网段/归属方的快速匹配
+
+    设计原理：
+    - 所有网段在构建时被切分为互不重叠的基本区间，每个区间记录覆盖它的最小（最具体）网段，
+      因此重叠网段按“最长前缀匹配”原则处理
+    - 基本区间以有序的起止整数数组存储，单个和批量查询均通过 numpy.searchsorted 完成，复杂度 O(log n)
+    - 区间数组可保存为 .npy 文件，加载时通过内存映射（mmap）读取，无需重新构建即可秒级启动
+
+    示例：
+        index = IPRangeIndex.from_file("subnets.csv", range_column="network", label_column="owner")
+        index.lookup("10.1.2.3")                   # 'office'
+        index.lookup_many(["10.1.2.3", "8.8.8.8"])  # ['office', None]
+        index.save("subnets.idx")
+        index = IPRangeIndex.load("subnets.idx")   # 内存映射加载
+    """
+
+    def __init__(self, ranges=(), labels=None):
+        """
+        构建网段索引
+
+        :param ranges: 网段列表，元素可以是 CIDR/区间/单IP 字符串，或 (起始IP, 结束IP) 元组
+        :param labels: 与 ranges 一一对应的标签列表，默认使用网段原文作为标签
+        """
+        ranges = list(ranges)
+        if labels is None:
+            labels = [r if isinstance(r, str) else f"{r[0]}-{r[1]}" for r in ranges]
+        labels = list(labels)
+        if len(labels) != len(ranges):
+            raise ValueError(f"labels 数量({len(labels)})与 ranges 数量({len(ranges)})不一致")
+
+        starts = np.empty(len(ranges), dtype=np.int64)
+        ends = np.empty(len(ranges), dtype=np.int64)
+        for i, item in enumerate(ranges):
+            if isinstance(item, str):
+                starts[i], ends[i] = _parse_range(item)
+            else:
+                starts[i], ends[i] = _ip_to_int(item[0]), _ip_to_int(item[1])
+                if starts[i] > ends[i]:
+                    raise ValueError(f"网段起始IP大于结束IP: {item}")
+
+        self._labels = labels
+        self._segments = self._build_segments(starts, ends)
+
+    @staticmethod
+    def _build_segments(starts, ends):
+        """扫描线切分重叠网段，返回互不重叠的基本区间结构化数组"""
+        if len(starts) == 0:
+            return np.empty(0, dtype=_SEGMENT_DTYPE)
+
+        # 所有网段边界：起点，以及终点的下一个地址
+        bounds = np.unique(np.concatenate([starts, ends + 1]))
+        open_order = np.argsort(starts, kind="stable")
+        widths = ends - starts
+
+        segments = []
+        active = []  # 小根堆：(网段宽度, 网段编号)，堆顶即为最具体的网段
+        next_open = 0
+        for left, right in zip(bounds[:-1], bounds[1:]):
+            while next_open < len(open_order) and starts[open_order[next_open]] <= left:
+                range_id = int(open_order[next_open])
+                heapq.heappush(active, (int(widths[range_id]), range_id))
+                next_open += 1
+            # 惰性删除已结束的网段
+            while active and ends[active[0][1]] < left:
+                heapq.heappop(active)
+            if not active:
+                continue
+            range_id = active[0][1]
+            # 与前一区间属于同一网段且首尾相接时合并，减少区间数量
+            if segments and segments[-1][2] == range_id and segments[-1][1] + 1 == left:
+                segments[-1][1] = int(right) - 1
+            else:
+                segments.append([int(left), int(right) - 1, range_id])
+
+        result = np.empty(len(segments), dtype=_SEGMENT_DTYPE)
+        if segments:
+            data = np.array(segments, dtype=np.int64)
+            result["start"] = data[:, 0]
+            result["end"] = data[:, 1]
+            result["range_id"] = data[:, 2]
+        return result
+
+    @classmethod
+    def from_file(cls, path, range_column=None, label_column=None, delimiter=None, encoding="utf-8"):
+        """
+        从 CSV 或文本文件加载网段
+
+        - 文本文件：每行一个网段，可在网段后用空白分隔附加标签，支持空行和以 # 开头的注释行
+          例如：10.0.0.0/8 内网
+        - CSV 文件（指定 range_column 时）：从 range_column 列读取网段，从 label_column 列读取标签
+
+        :param path: 文件路径
+        :param range_column: CSV 中网段所在列名，为 None 时按文本文件解析
+        :param label_column: CSV 中标签所在列名，默认使用网段原文作为标签
+        :param delimiter: CSV 分隔符，默认为 ","
+        :param encoding: 文件编码，默认为 utf-8
+        :return: IPRangeIndex 实例
+        """
+        ranges, labels = [], []
+        with open(path, "r", encoding=encoding, newline="") as f:
+            if range_column is not None:
+                for row in csv.DictReader(f, delimiter=delimiter or ","):
+                    text = (row.get(range_column) or "").strip()
+                    if not text:
+                        continue
+                    ranges.append(text)
+                    labels.append(row[label_column] if label_column else text)
+            else:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    parts = line.split(delimiter, 1)
+                    ranges.append(parts[0].strip())
+                    labels.append(parts[1].strip() if len(parts) > 1 else parts[0].strip())
+        return cls(ranges, labels)
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def labels(self):
+        """网段标签列表，match() 返回的网段编号即为此列表的下标"""
+        return self._labels
+
+    def match(self, ips):
+        """
+        批量匹配 IP 所属网段编号
+
+        :param ips: IP 列表/数组，元素可以是点分十进制字符串或整数
+        :return: np.ndarray[int64]，每个 IP 匹配到的最具体网段编号，未匹配为 -1
+        """
+        values = _ips_to_ints(ips)
+        segments = self._segments
+        result = np.full(len(values), -1, dtype=np.int64)
+        if len(segments) == 0 or len(values) == 0:
+            return result
+
+        pos = np.searchsorted(segments["start"], values, side="right") - 1
+        valid = pos >= 0
+        hit = np.zeros(len(values), dtype=bool)
+        hit[valid] = values[valid] <= segments["end"][pos[valid]]
+        result[hit] = segments["range_id"][pos[hit]]
+        return result
+
+    def lookup(self, ip):
+        """
+        查询单个 IP 所属网段标签
+
+        :param ip: 点分十进制字符串或整数
+        :return: 最具体网段的标签，未匹配返回 None
+        """
+        range_id = int(self.match([_ip_to_int(ip)])[0])
+        return self._labels[range_id] if range_id >= 0 else None
+
+    def lookup_many(self, ips):
+        """
+        批量查询 IP 所属网段标签
+
+        :param ips: IP 列表/数组
+        :return: 标签列表，未匹配的位置为 None
+        """
+        labels = self._labels
+        return [labels[i] if i >= 0 else None for i in self.match(ips).tolist()]
+
+    def save(self, path):
+        """
+        保存索引，便于下次通过内存映射快速加载
+
+        生成两个文件：path（区间数组，.npy 格式）和 path + ".labels.json"（标签列表）
+        """
+        with open(path, "wb") as f:
+            np.save(f, self._segments, allow_pickle=False)
+        with open(f"{path}.labels.json", "w", encoding="utf-8") as f:
+            json.dump(self._labels, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        加载 save() 保存的索引
+
+        :param path: save() 时使用的路径
+        :param mmap: 是否以只读内存映射方式加载区间数组，默认为 True
+        :return: IPRangeIndex 实例
+        """
+        index = cls.__new__(cls)
+        index._segments = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        with open(f"{path}.labels.json", "r", encoding="utf-8") as f:
+            index._labels = json.load(f)
+        return index
@@ -1,8 +1,24 @@
 """Logging utilities for funcguard."""
 
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
 import sys
-from typing import TextIO, cast
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from logging.handlers import (
+    BaseRotatingHandler,
+    QueueHandler,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+from typing import Callable, Hashable, Literal, TextIO, cast
 
 
 class ColoredFormatter(logging.Formatter):
@@ -28,13 +44,172 @@ class ColoredFormatter(logging.Formatter):
         return f"{color}{message}{self.COLORS['RESET']}"
 
 
+# LogRecord 自带的属性，JsonFormatter 只把其余属性（即 extra 传入的字段）作为附加字段输出
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    JSON Lines 格式化器：每条日志输出为一行 JSON，便于日志采集系统直接解析。
+
+    输出字段：time、level（含自定义的 SUCCESS / PROGRESS）、logger、message，
+    有异常时附加 exc_info / stack_info，通过 extra 传入的字段原样附加。
+    消息只在 format 时才合并参数，被等级过滤掉的日志不会产生任何格式化开销。
+    """
+
+    def __init__(self, datefmt: str | None = None, ensure_ascii: bool = False):
+        """
+        :param datefmt: 时间格式，默认输出带时区的 ISO 8601 时间（精确到毫秒）
+        :param ensure_ascii: 是否将非 ASCII 字符转义，默认 False（中文原样输出）
+        """
+        super().__init__(datefmt=datefmt)
+        self.ensure_ascii = ensure_ascii
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        return datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds")
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in data:
+                data[key] = value
+        return json.dumps(data, ensure_ascii=self.ensure_ascii, default=str)
+
+
+def _gzip_file(source: str, dest: str) -> None:
+    """将 source 压缩为 dest（先写临时文件再原子替换），完成后删除 source。"""
+    tmp_path = dest + ".tmp"
+    with open(source, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, dest)
+    os.remove(source)
+
+
+class _CompressingRotatorMixin:
+    """
+    轮转文件后台压缩：轮转时只把日志文件重命名为临时文件，gzip 压缩交给后台线程完成，
+    写日志的线程不会因压缩大文件而阻塞。
+
+    同一时间最多只有一个压缩任务；下一次轮转（或关闭 handler）前会等待上一次压缩完成，
+    保证备份文件的编号顺移和过期清理看到的都是已压缩好的 .gz 文件。
+    """
+
+    _compress_thread: threading.Thread | None = None
+
+    def _enable_compression(self) -> None:
+        self.namer = lambda name: name + ".gz"  # pyright: ignore[reportAttributeAccessIssue]
+        self.rotator = self._rotate_and_compress  # pyright: ignore[reportAttributeAccessIssue]
+
+    def _rotate_and_compress(self, source: str, dest: str) -> None:
+        if not os.path.exists(source):
+            return
+        # 临时文件以 "." 开头，不会被 TimedRotatingFileHandler 当作过期备份删除
+        dir_name, base_name = os.path.split(dest)
+        pending = os.path.join(dir_name, f".{base_name}.pending")
+        os.replace(source, pending)
+        thread = threading.Thread(
+            target=_gzip_file, args=(pending, dest), name="funcguard-log-compress"
+        )
+        thread.start()
+        self._compress_thread = thread
+
+    def _wait_compression(self) -> None:
+        thread = self._compress_thread
+        if thread is not None:
+            thread.join()
+            self._compress_thread = None
+
+
+class _CompressingRotatingFileHandler(_CompressingRotatorMixin, RotatingFileHandler):
+    """按文件大小轮转，可选 gzip 压缩备份文件。"""
+
+    def doRollover(self) -> None:
+        self._wait_compression()
+        super().doRollover()
+
+    def close(self) -> None:
+        super().close()
+        self._wait_compression()
+
+
+class _CompressingTimedRotatingFileHandler(_CompressingRotatorMixin, TimedRotatingFileHandler):
+    """按时间轮转，可选 gzip 压缩备份文件。"""
+
+    def doRollover(self) -> None:
+        self._wait_compression()
+        super().doRollover()
+
+    def close(self) -> None:
+        super().close()
+        self._wait_compression()
+
+
+def _build_file_handler(
+    log_file: str,
+    max_bytes: int,
+    rotate_when: str | None,
+    backup_count: int,
+    compress: bool,
+) -> logging.FileHandler:
+    """根据轮转参数创建文件 handler。"""
+    directory = os.path.dirname(os.path.abspath(log_file))
+    os.makedirs(directory, exist_ok=True)
+
+    if max_bytes and rotate_when:
+        raise ValueError("max_bytes 与 rotate_when 只能设置其中一个")
+    if max_bytes:
+        handler = _CompressingRotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    elif rotate_when:
+        handler = _CompressingTimedRotatingFileHandler(
+            log_file, when=rotate_when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        return logging.FileHandler(log_file, encoding="utf-8")
+
+    if compress:
+        handler._enable_compression()
+    return handler
+
+
+def _has_file_handler(logger: logging.Logger, log_file: str) -> bool:
+    """检查 logger 是否已配置写入同一文件的 handler（包括非阻塞模式下队列背后的 handler）。"""
+    path = os.path.abspath(log_file)
+    for handler in logger.handlers:
+        if isinstance(handler, _NonBlockingQueueHandler):
+            handler = handler.target
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == path:
+            return True
+    return False
+
+
 def _has_colored_handler(logger: logging.Logger) -> bool:
     """
-    检查 logger 是否已配置彩色 StreamHandler。
+    检查 logger 是否已配置彩色 StreamHandler（包括非阻塞模式下队列背后的 StreamHandler）。
 
     用于避免重复添加 handler，防止同一条日志被多次输出。
     """
     for handler in logger.handlers:
+        if isinstance(handler, _NonBlockingQueueHandler):
+            handler = handler.target
         if isinstance(handler, logging.StreamHandler) and isinstance(
             handler.formatter, ColoredFormatter
         ):
@@ -42,6 +217,134 @@ def _has_colored_handler(logger: logging.Logger) -> bool:
     return False
 
 
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    非阻塞队列 handler：调用线程只负责把日志记录放入队列，格式化和写入由后台线程完成。
+
+    队列已满时按 overflow 策略处理：
+    - "drop"：丢弃该条日志并计数，调用线程永不阻塞
+    - "block"：阻塞等待队列有空位，不丢失日志
+    """
+
+    def __init__(self, target: logging.Handler, maxsize: int, overflow: str):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"不支持的队列溢出策略: {overflow!r}，支持 'drop' 或 'block'")
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self.overflow = overflow
+        self.dropped = 0
+        self.listener = _BatchingListener(self.queue, target)  # pyright: ignore[reportArgumentType]
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 仅在调用线程合并消息参数（避免参数对象在入队后被修改），不做时间、颜色等格式化
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self.listener.stop()
+        stream = getattr(self.target, "stream", None)
+        if self.dropped and stream is not None:
+            stream.write(f"[funcguard] 非阻塞日志队列已满，共丢弃 {self.dropped} 条日志\n")
+            self.target.flush()
+            self.dropped = 0
+        if self in _non_blocking_handlers:
+            _non_blocking_handlers.remove(self)
+        super().close()
+
+
+class _BatchingListener:
+    """
+    后台日志写入线程：从队列中批量取出日志记录，格式化后合并为一次 write + flush 写入输出流。
+    """
+
+    _SENTINEL = None
+    _BATCH_SIZE = 512
+
+    def __init__(self, record_queue: queue.Queue, target: logging.Handler):
+        self.queue = record_queue
+        self.target = target
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="funcguard-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """写入队列中剩余的日志后停止线程。"""
+        if self._thread is None:
+            return
+        self.queue.put(self._SENTINEL)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self._BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._SENTINEL in batch
+            self._write([record for record in batch if record is not self._SENTINEL])
+            if stop:
+                return
+
+    def _write(self, records: list[logging.LogRecord]) -> None:
+        target = self.target
+        # 非流式 handler，以及需要在每条日志写入前判断是否轮转的轮转文件 handler，逐条交给 handle 处理
+        if not isinstance(target, logging.StreamHandler) or isinstance(target, BaseRotatingHandler):
+            for record in records:
+                if record.levelno >= target.level:
+                    target.handle(record)
+            return
+
+        lines = []
+        for record in records:
+            if record.levelno < target.level:
+                continue
+            # 与 Handler.handle 一致：先经过 handler 自身的过滤器（过滤器可返回替换后的记录），再格式化
+            result = target.filter(record)
+            if not result:
+                continue
+            if isinstance(result, logging.LogRecord):
+                record = result
+            try:
+                lines.append(target.format(record) + target.terminator)
+            except Exception:
+                target.handleError(record)
+        if not lines:
+            return
+        try:
+            with target.lock:  # pyright: ignore[reportOptionalContextManager]
+                target.stream.write("".join(lines))
+                target.flush()
+        except Exception:
+            target.handleError(records[-1])
+
+
+# 进程退出时写完所有非阻塞 handler 队列中剩余的日志
+_non_blocking_handlers: list[_NonBlockingQueueHandler] = []
+
+
+@atexit.register
+def _flush_non_blocking_handlers() -> None:
+    while _non_blocking_handlers:
+        _non_blocking_handlers.pop().close()
+
+
 SUCCESS_LEVEL = 25
 PROGRESS_LEVEL = 35
 logging.addLevelName(SUCCESS_LEVEL, "SUCCESS")
@@ -117,6 +420,15 @@ def setup_logger(
     level: int | str = logging.DEBUG,
     stream: TextIO | None = None,
     message_only: bool = False,
+    non_blocking: bool = False,
+    queue_size: int = 10000,
+    overflow: Literal["drop", "block"] = "drop",
+    log_file: str | None = None,
+    json_format: bool = True,
+    max_bytes: int = 0,
+    rotate_when: str | None = None,
+    backup_count: int = 7,
+    compress: bool = True,
 ) -> SuccessLogger:
     """
     创建并配置彩色日志输出。
@@ -139,6 +451,27 @@ def setup_logger(
             字符串支持："DEBUG"、"INFO"、"PROGRESS"、"SUCCESS"、"WARNING"/"WARN"、"ERROR"、"CRITICAL"/"FATAL"（大小写不敏感）。
         stream: 输出流，默认 sys.stdout。
         message_only: 是否仅输出日志消息（不包含时间与等级），默认 False。
+        non_blocking: 是否启用非阻塞模式，默认 False。
+            启用后调用线程只把日志记录放入队列，由后台线程完成格式化并批量写入输出流，
+            终端或管道写入缓慢时不会拖慢调用方（例如热循环中的 time_log / color_logger）。
+            进程退出时会自动写完队列中剩余的日志。
+            logger 已有的阻塞 handler（如之前创建的控制台或文件 handler）会被替换为非阻塞的队列 handler；
+            之后以 non_blocking=False 再次调用时不会改回阻塞模式。
+        queue_size: 非阻塞模式下的队列容量，默认 10000。
+        overflow: 非阻塞模式下队列已满时的处理策略，默认 "drop"。
+            "drop"：丢弃新日志（退出时打印丢弃数量），调用线程永不阻塞；
+            "block"：阻塞等待队列有空位，不丢失日志。
+        log_file: 日志文件路径，默认 None（仅输出到控制台）。
+            设置后在彩色控制台输出之外，同时写入该文件（目录不存在时自动创建）；
+            同一 logger 重复调用时不会重复添加写入同一文件的 handler。
+        json_format: 文件日志是否使用 JSON Lines 格式（见 JsonFormatter），默认 True；
+            False 时使用 "时间 - 等级 - 消息" 的纯文本格式（不含颜色码）。
+        max_bytes: 按大小轮转，单个文件超过该字节数时轮转，默认 0（不按大小轮转）。
+        rotate_when: 按时间轮转，取值同 TimedRotatingFileHandler 的 when，
+            如 "midnight"（每天零点）、"H"（每小时）、"D"（每天），默认 None（不按时间轮转）。
+            max_bytes 与 rotate_when 只能设置其中一个。
+        backup_count: 轮转后保留的备份文件数量，默认 7。
+        compress: 是否将轮转后的备份文件压缩为 .gz，默认 True。压缩在后台线程中进行，不阻塞写日志。
 
     Returns:
         配置完成的 logger。示例:
@@ -155,19 +488,238 @@ def setup_logger(
     logger = cast(SuccessLogger, logging.getLogger(name))
     normalized_level = _normalize_level(level)
     logger.setLevel(normalized_level)
+    if non_blocking:
+        _wrap_non_blocking(logger, queue_size, overflow)
 
     # 已配置彩色 handler 时直接复用，避免重复添加导致日志重复输出
-    if _has_colored_handler(logger):
-        return logger
+    if not _has_colored_handler(logger):
+        console_handler = logging.StreamHandler(stream or sys.stdout)
+        console_handler.setLevel(normalized_level)
+        if message_only:
+            formatter = ColoredFormatter("%(message)s")
+        else:
+            formatter = ColoredFormatter(
+                "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            )
+        console_handler.setFormatter(formatter)
+        _add_handler(logger, console_handler, non_blocking, queue_size, overflow)
+
+    if log_file is not None and not _has_file_handler(logger, log_file):
+        file_handler = _build_file_handler(
+            log_file, max_bytes, rotate_when, backup_count, compress
+        )
+        file_handler.setLevel(normalized_level)
+        if json_format:
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(
+                logging.Formatter(
+                    "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+                )
+            )
+        _add_handler(logger, file_handler, non_blocking, queue_size, overflow)
+    return logger
 
-    console_handler = logging.StreamHandler(stream or sys.stdout)
-    console_handler.setLevel(normalized_level)
-    if message_only:
-        formatter = ColoredFormatter("%(message)s")
+
+def _add_handler(
+    logger: logging.Logger,
+    handler: logging.Handler,
+    non_blocking: bool,
+    queue_size: int,
+    overflow: str,
+) -> None:
+    """为 logger 添加 handler；非阻塞模式下包装为队列 handler，由后台线程写入。"""
+    if non_blocking:
+        queue_handler = _NonBlockingQueueHandler(handler, queue_size, overflow)
+        _non_blocking_handlers.append(queue_handler)
+        logger.addHandler(queue_handler)
     else:
-        formatter = ColoredFormatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+        logger.addHandler(handler)
+
+
+def _wrap_non_blocking(logger: logging.Logger, queue_size: int, overflow: str) -> None:
+    """把 logger 上已有的阻塞输出流/文件 handler 替换为非阻塞队列 handler，由后台线程写入原 handler。"""
+    for handler in list(logger.handlers):
+        if isinstance(handler, _NonBlockingQueueHandler) or not isinstance(handler, logging.StreamHandler):
+            continue
+        logger.removeHandler(handler)
+        _add_handler(logger, handler, True, queue_size, overflow)
+
+
+class DedupFilter(logging.Filter):
+    """
+    日志去重与限流过滤器：相同的日志在时间窗口内只放行有限条数，其余的合并为"重复 N 次"摘要。
+
+    每个 key（默认为 logger 名 + 等级 + 合并参数后的消息）对应一个令牌桶：
+    桶容量为 burst，每 window 秒补满，即同一条日志每 window 秒最多输出 burst 次。
+    被拦截的日志只计数，下一次该日志被放行时在消息末尾附加被省略的次数；
+    调用 flush(logger) 可立即输出所有尚未输出的摘要（funcguard logger 在进程退出时自动调用）。
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        burst: int = 5,
+        max_keys: int = 10000,
+        key: Callable[[logging.LogRecord], Hashable] | None = None,
+        level: int | str = logging.NOTSET,
+    ):
+        """
+        :param window: 时间窗口（秒），默认 60
+        :param burst: 每个时间窗口内同一条日志最多放行的次数，默认 5
+        :param max_keys: 最多跟踪的不同日志数量，超过时淘汰最久未出现的日志，默认 10000
+        :param key: 自定义去重 key 的函数，接收 LogRecord，默认按 logger 名、等级和消息内容去重
+        :param level: 只对该等级及以上的日志去重，更低等级的日志直接放行，默认对所有日志去重
+        """
+        super().__init__()
+        if window <= 0 or burst < 1:
+            raise ValueError("window 必须大于 0，burst 必须大于等于 1")
+        self.window = window
+        self.burst = burst
+        self.max_keys = max_keys
+        self.key = key or self._default_key
+        self.level = _normalize_level(level)
+        self._refill_rate = burst / window
+        # key -> [剩余令牌, 上次补充时间, 被省略次数, 首次省略时间, 最近一条被省略的日志]
+        self._buckets: OrderedDict[Hashable, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_key(record: logging.LogRecord) -> Hashable:
+        return record.name, record.levelno, record.getMessage()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or getattr(record, "_dedup_summary", False):
+            return True
+
+        key = self.key(record)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.burst), now, 0, 0.0, None]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self._refill_rate)
+                bucket[1] = now
+
+            if bucket[0] < 1:
+                if bucket[2] == 0:
+                    bucket[3] = now
+                bucket[2] += 1
+                bucket[4] = record
+                return False
+
+            bucket[0] -= 1
+            suppressed, since = bucket[2], bucket[3]
+            bucket[2], bucket[4] = 0, None
+
+        if suppressed:
+            record.msg = self._summary(record.getMessage(), suppressed, now - since)
+            record.args = None
+        return True
+
+    @staticmethod
+    def _summary(message: str, count: int, elapsed: float) -> str:
+        return f"{message}（过去 {elapsed:.0f} 秒内重复 {count} 次，已省略）"
+
+    def flush(self, logger: logging.Logger) -> None:
+        """立即通过 logger 输出所有尚未输出的"重复 N 次"摘要。"""
+        now = time.monotonic()
+        pending = []
+        with self._lock:
+            for bucket in self._buckets.values():
+                if bucket[2]:
+                    pending.append((bucket[4], bucket[2], now - bucket[3]))
+                    bucket[2], bucket[4] = 0, None
+
+        for record, count, elapsed in pending:
+            logger.log(
+                record.levelno,
+                self._summary(record.getMessage(), count, elapsed),
+                extra={"_dedup_summary": True},
+            )
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """始终写入当前的 sys.stdout（而不是创建 handler 时的 sys.stdout），兼容输出重定向。"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):  # pyright: ignore[reportIncompatibleVariableOverride]
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+def configure_funcguard_logger(
+    level: int | str = logging.INFO,
+    silent: bool = False,
+    dedup: bool = True,
+    window: float = 60.0,
+    burst: int = 5,
+    dedup_level: int | str = logging.WARNING,
+    stream: TextIO | None = None,
+    non_blocking: bool = False,
+) -> logging.Logger:
+    """
+    配置 funcguard 内部输出（retry_function 的重试信息、send_request 的日志保存提示、
+    time_log 等）所使用的 logger。
+
+    默认只输出消息本身（与 print 相同），WARNING 及以上的相同消息（重试、请求失败信息）按 DedupFilter 去重限流，
+    避免依赖服务故障时大量线程的重试信息刷屏；time_log 等 INFO 输出不去重，逐条输出。
+
+    :param level: 日志等级，默认 "INFO"；重试信息为 WARNING，重试次数耗尽为 ERROR
+    :param silent: 静默模式，为 True 时不输出任何内容，默认 False
+    :param dedup: 是否启用去重限流，默认 True
+    :param window: 去重时间窗口（秒），默认 60
+    :param burst: 每个时间窗口内同一条消息最多输出的次数，默认 5
+    :param dedup_level: 去重的最低等级，默认 "WARNING"（仅重试、请求失败信息）；更低等级的消息不去重
+    :param stream: 输出流，默认始终写入当前的 sys.stdout
+    :param non_blocking: 是否启用非阻塞模式（同 setup_logger），默认 False；
+        启用后 time_log / ProgressTracker 等热循环中的输出只入队，由后台线程写入
+    :return: 配置完成的 funcguard logger，也可自行添加 handler（如 setup_logger 的文件日志）
+    """
+    logger = logging.getLogger("funcguard")
+    # 重新配置前先输出旧过滤器中尚未输出的摘要
+    for old_filter in list(logger.filters):
+        if isinstance(old_filter, DedupFilter):
+            old_filter.flush(logger)
+            logger.removeFilter(old_filter)
+    for handler in list(logger.handlers):
+        target = handler.target if isinstance(handler, _NonBlockingQueueHandler) else handler
+        if getattr(target, "_funcguard_default", False):
+            logger.removeHandler(handler)
+            if handler is not target:
+                handler.close()  # 写完队列中剩余的日志
+
+    logger.setLevel(_normalize_level(level))
+    logger.propagate = False
+    logger.disabled = silent
+
+    handler = _StdoutHandler() if stream is None else logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._funcguard_default = True  # pyright: ignore[reportAttributeAccessIssue]
+    _add_handler(logger, handler, non_blocking, 10000, "drop")
+    if dedup:
+        logger.addFilter(DedupFilter(window=window, burst=burst, level=dedup_level))
     return logger
+
+
+funcguard_logger = configure_funcguard_logger()
+
+
+@atexit.register
+def _flush_dedup_summaries() -> None:
+    if funcguard_logger.disabled:
+        return
+    for log_filter in funcguard_logger.filters:
+        if isinstance(log_filter, DedupFilter):
+            log_filter.flush(funcguard_logger)
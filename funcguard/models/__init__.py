@@ -1,6 +1,8 @@
 from .request_models import RequestLog
+from .monitor_models import SlowCallProfile
 
 # 暴露主要接口
 __all__ = [
-    "RequestLog"
+    "RequestLog",
+    "SlowCallProfile",
 ]
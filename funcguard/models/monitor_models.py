@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass
+class SlowCallProfile:
+    """
+    time_monitored 慢调用分析配置
+
+    - mode: "sample" 在调用期间启用轻量采样分析器（后台线程定时采集调用栈），超过阈值时保存采样结果；
+            "rerun" 正常执行，超过阈值时使用 cProfile 重新执行一次（仅适用于可重复执行的幂等函数）
+    - save_dir: 分析报告保存目录
+    - sample_interval: 采样间隔（秒），仅 "sample" 模式有效
+    - top_n: 报告中保留的调用栈/函数条目数量
+    - min_interval: 同一函数两次捕获之间的最小间隔（秒），用于限制分析开销
+    - max_captures: 同一函数最多捕获的次数
+    """
+    mode: Literal["sample", "rerun"] = "sample"
+    save_dir: str = "slow_calls"
+    sample_interval: float = 0.005
+    top_n: int = 20
+    min_interval: float = 60.0
+    max_captures: int = 10
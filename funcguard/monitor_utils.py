@@ -0,0 +1,543 @@
+"""
+函数性能监控模块，提供高精度计时注册表、百分位统计、报告打印和慢调用分析功能
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+from .log_utils import funcguard_logger
+
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖，未安装时回退到 /proc/self/statm
+    psutil = None
+
+
+_MB = 1024 * 1024
+
+
+def _func_name(func):
+    """获取函数的完整名称（模块名.限定名），用作注册表中的键"""
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None) or getattr(func, "__name__", repr(func))
+    return f"{module}.{qualname}" if module else qualname
+
+
+def _percentile(sorted_samples, q):
+    """从已排序的样本中取百分位数（最近秩法），没有样本时返回 None"""
+    if not sorted_samples:
+        return None
+    pos = min(len(sorted_samples) - 1, max(0, round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[pos]
+
+
+class TimingStats:
+    """
+    单个函数的耗时统计
+
+    调用次数、总耗时、最小/最大耗时精确累计；百分位数基于固定容量的蓄水池采样（Reservoir Sampling）估算，
+    内存占用与调用次数无关。
+    """
+
+    __slots__ = (
+        "name", "count", "total_ns", "min_ns", "max_ns", "_samples", "_reservoir_size",
+        "mem_count", "peak_total", "peak_max", "rss_delta_max", "blocks_delta_max",
+    )
+
+    def __init__(self, name, reservoir_size = 1024):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+        self._samples = []
+        self._reservoir_size = reservoir_size
+        # 内存统计（仅启用内存跟踪的调用会计入）
+        self.mem_count = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.rss_delta_max = None
+        self.blocks_delta_max = None
+
+    def add_memory(self, peak_bytes, rss_delta, blocks_delta):
+        """记录一次调用的内存使用：tracemalloc 峰值、RSS 增量、已分配内存块增量"""
+        self.mem_count += 1
+        self.peak_total += peak_bytes
+        self.peak_max = max(self.peak_max, peak_bytes)
+        if rss_delta is not None:
+            self.rss_delta_max = rss_delta if self.rss_delta_max is None else max(self.rss_delta_max, rss_delta)
+        self.blocks_delta_max = blocks_delta if self.blocks_delta_max is None else max(self.blocks_delta_max, blocks_delta)
+
+    def add(self, elapsed_ns, rng):
+        """记录一次调用耗时（纳秒）"""
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if self.max_ns is None or elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+        # Algorithm R：前 k 次全部保留，之后以 k/count 的概率替换随机位置
+        if len(self._samples) < self._reservoir_size:
+            self._samples.append(elapsed_ns)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < self._reservoir_size:
+                self._samples[slot] = elapsed_ns
+
+    def percentile(self, q):
+        """
+        估算耗时百分位数（纳秒）
+
+        :param q: 百分位，0~100
+        :return: 百分位耗时（纳秒），没有记录时返回 None
+        """
+        return _percentile(sorted(self._samples), q)
+
+    def to_dict(self):
+        """导出统计结果，耗时单位为秒"""
+        samples = sorted(self._samples)
+
+        def _seconds(ns):
+            return ns / 1e9 if ns is not None else None
+
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total": self.total_ns / 1e9,
+            "mean": self.total_ns / self.count / 1e9 if self.count else None,
+            "min": _seconds(self.min_ns),
+            "max": _seconds(self.max_ns),
+            "p50": _seconds(_percentile(samples, 50)),
+            "p95": _seconds(_percentile(samples, 95)),
+            "p99": _seconds(_percentile(samples, 99)),
+            "mem_count": self.mem_count,
+            "peak_mean_mb": self.peak_total / self.mem_count / _MB if self.mem_count else None,
+            "peak_max_mb": self.peak_max / _MB if self.mem_count else None,
+            "rss_delta_max_mb": self.rss_delta_max / _MB if self.rss_delta_max is not None else None,
+            "blocks_delta_max": self.blocks_delta_max,
+        }
+
+
+class TimingRegistry:
+    """
+    函数耗时注册表，按函数聚合调用次数、总耗时、最小/最大耗时和 p50/p95/p99
+
+    线程安全；全局实例为 timing_registry，time_monitored(high_resolution=True) 和 @timed 默认记录到此实例。
+
+    示例：
+        @timed
+        def load_data():
+            ...
+
+        load_data()
+        timing_registry.report()
+    """
+
+    def __init__(self, reservoir_size = 1024):
+        """
+        :param reservoir_size: 每个函数保留的耗时样本数量上限，用于估算百分位数，默认 1024
+        """
+        self.reservoir_size = reservoir_size
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    def record(self, name, elapsed_ns):
+        """
+        记录一次调用耗时
+
+        :param name: 函数名称
+        :param elapsed_ns: 耗时（纳秒）
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = TimingStats(name, self.reservoir_size)
+            stats.add(elapsed_ns, self._rng)
+
+    def record_memory(self, name, usage):
+        """
+        记录一次调用的内存使用
+
+        :param name: 函数名称
+        :param usage: MemoryProbe.stop() 返回的内存使用字典
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = TimingStats(name, self.reservoir_size)
+            stats.add_memory(usage["peak_bytes"], usage["rss_delta"], usage["blocks_delta"])
+
+    def get(self, name):
+        """获取指定函数的统计结果字典，不存在时返回 None"""
+        with self._lock:
+            stats = self._stats.get(name)
+            return stats.to_dict() if stats is not None else None
+
+    def stats(self, sort_by = "total"):
+        """
+        获取所有函数的统计结果
+
+        :param sort_by: 排序字段，支持 "total"、"count"、"mean"、"max"、"p50"、"p95"、"p99"、"peak_max_mb" 等，降序排列
+        :return: 统计结果字典列表
+        """
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._stats.values()]
+        if rows and sort_by not in rows[0]:
+            raise ValueError(f"sort_by 参数不支持: {sort_by}")
+        return sorted(rows, key = lambda row: row[sort_by] or 0, reverse = True)
+
+    def reset(self):
+        """清空所有统计数据"""
+        with self._lock:
+            self._stats.clear()
+
+    def report(self, sort_by = "total", top = None):
+        """
+        打印耗时统计报告，耗时单位为毫秒
+
+        :param sort_by: 排序字段，同 stats()
+        :param top: 仅打印前 top 个函数，默认打印全部
+        :return: 统计结果字典列表
+        """
+        rows = self.stats(sort_by)
+        if top is not None:
+            rows = rows[:top]
+
+        # 耗时列单位为毫秒；存在内存记录时追加内存列（单位 MB）
+        time_columns = ("total", "mean", "min", "max", "p50", "p95", "p99")
+        memory_columns = ("peak_mean_mb", "peak_max_mb", "rss_delta_max_mb")
+        show_memory = any(row["mem_count"] for row in rows)
+        columns = ("count",) + time_columns + (memory_columns if show_memory else ())
+
+        name_width = max([len("function")] + [len(row["name"]) for row in rows])
+        col_width = max(10, *(len(col) for col in columns))
+        header = f"{'function':<{name_width}}  " + "  ".join(f"{col:>{col_width}}" for col in columns)
+        print(header)
+        print("-" * len(header))
+        for row in rows:
+            cells = [f"{row['count']:>{col_width}}"]
+            for col in columns[1:]:
+                value = row[col]
+                if value is None:
+                    cells.append(f"{'-':>{col_width}}")
+                else:
+                    scale = 1000 if col in time_columns else 1
+                    cells.append(f"{value * scale:>{col_width}.3f}")
+            print(f"{row['name']:<{name_width}}  " + "  ".join(cells))
+        return rows
+
+
+# 全局耗时注册表
+timing_registry = TimingRegistry()
+
+
+def _current_rss():
+    """获取当前进程的常驻内存（RSS，字节），无法获取时返回 None"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# tracemalloc 由所有 MemoryProbe 共享：第一个探针启动跟踪，最后一个探针结束时才停止
+_probe_lock = threading.Lock()
+_active_probes = set()
+_probe_owns_tracing = False
+
+
+class MemoryProbe:
+    """
+    单次调用的内存测量：tracemalloc 分配峰值、RSS 增量、已分配内存块数量增量
+
+    - 若 tracemalloc 尚未启动，则由第一个探针启动、最后一个探针停止，嵌套或多线程并发的探针互不干扰：
+      新探针重置全局峰值前，会先把截至此时的峰值记入其他正在测量的探针
+    - 若 tracemalloc 已由调用方启动，则不会重置其峰值，也不会停止跟踪；
+      此时若测量期间全局峰值没有刷新，分配峰值只能以结束时的内存占用作为下限
+    - tracemalloc 只统计 Python 内存分配器的分配，numpy/pandas 的数据缓冲区同样会被计入
+    """
+
+    __slots__ = ("_baseline", "_peak_before", "_peak_seen", "_rss_before", "_blocks_before")
+
+    def start(self):
+        global _probe_owns_tracing
+        with _probe_lock:
+            if not _active_probes:
+                _probe_owns_tracing = not tracemalloc.is_tracing()
+                if _probe_owns_tracing:
+                    tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if _probe_owns_tracing:
+                for probe in _active_probes:
+                    probe._peak_seen = max(probe._peak_seen, peak)
+                tracemalloc.reset_peak()
+                peak = current
+            self._baseline = current
+            self._peak_before = peak
+            self._peak_seen = 0
+            _active_probes.add(self)
+        self._rss_before = _current_rss()
+        self._blocks_before = sys.getallocatedblocks()
+        return self
+
+    def stop(self):
+        """
+        结束测量
+
+        :return: {"peak_bytes": 分配峰值（相对开始时）, "rss_delta": RSS 增量（字节，可能为 None）,
+                  "blocks_delta": 内存块增量}
+        """
+        blocks_delta = sys.getallocatedblocks() - self._blocks_before
+        with _probe_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            if not _probe_owns_tracing and peak <= self._peak_before:
+                peak = current
+            peak = max(peak, self._peak_seen)
+            _active_probes.discard(self)
+            if not _active_probes and _probe_owns_tracing:
+                tracemalloc.stop()
+        rss_after = _current_rss()
+        rss_delta = rss_after - self._rss_before if rss_after is not None and self._rss_before is not None else None
+        return {
+            "peak_bytes": max(0, peak - self._baseline),
+            "rss_delta": rss_delta,
+            "blocks_delta": blocks_delta,
+        }
+
+
+def timed(func = None, *, name = None, registry = None, track_memory = False):
+    """
+    函数耗时统计装饰器，使用 perf_counter_ns 计时并记录到注册表（包括抛出异常的调用）
+
+    :param func: 被装饰的函数（直接使用 @timed 时自动传入）
+    :param name: 注册表中的名称，默认为 "模块名.函数限定名"
+    :param registry: 记录到的注册表，默认为全局 timing_registry
+    :param track_memory: 是否同时记录内存使用（tracemalloc 峰值、RSS 增量、内存块增量），默认 False
+
+    示例：
+        @timed
+        def parse(): ...
+
+        @timed(name="db.query")
+        def query(): ...
+    """
+    def decorator(target):
+        key = name or _func_name(target)
+
+        @wraps(target)
+        def wrapper(*args, **kwargs):
+            probe = MemoryProbe().start() if track_memory else None
+            start = time.perf_counter_ns()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                elapsed_ns = time.perf_counter_ns() - start
+                target_registry = registry or timing_registry
+                target_registry.record(key, elapsed_ns)
+                if probe is not None:
+                    target_registry.record_memory(key, probe.stop())
+
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def print_timing_report(sort_by = "total", top = None):
+    """
+    打印全局注册表的耗时统计报告（timing_registry.report 的快捷方式）
+
+    :param sort_by: 排序字段，支持 "total"、"count"、"mean"、"max"、"p50"、"p95"、"p99"
+    :param top: 仅打印前 top 个函数，默认打印全部
+    :return: 统计结果字典列表
+    """
+    return timing_registry.report(sort_by, top)
+
+
+class SamplingProfiler:
+    """
+    轻量级采样分析器：后台线程按固定间隔采集目标线程的调用栈
+
+    与 cProfile 的逐函数插桩不同，采样分析器不拦截任何函数调用，被分析代码几乎没有额外开销，
+    开销仅来自后台线程的定时采样，且与采样间隔成正比。
+    """
+
+    def __init__(self, interval = 0.005, max_depth = 64):
+        """
+        :param interval: 采样间隔（秒），默认 5 毫秒
+        :param max_depth: 每次采样保留的最大栈深度
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()  # 调用栈（从外到内的帧元组）-> 采样次数
+        self._target_id = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """开始采样当前线程"""
+        self._target_id = threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target = self._run, name = "funcguard-sampler", daemon = True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止采样"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append((code.co_filename, frame.f_lineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def report(self, top_n = 20):
+        """
+        生成采样报告文本：最常见的调用栈，以及按累计/自身采样次数排序的函数表
+
+        :param top_n: 保留的条目数量
+        :return: 报告文本
+        """
+        total = sum(self.samples.values())
+        lines = [f"采样次数: {total}，采样间隔: {self.interval * 1000:.1f}ms", ""]
+        if not total:
+            return "\n".join(lines)
+
+        lines.append(f"=== Top {top_n} 调用栈 ===")
+        for stack, count in self.samples.most_common(top_n):
+            lines.append(f"-- {count} 次 ({count / total * 100:.1f}%)")
+            for filename, lineno, name in stack:
+                lines.append(f"    {filename}:{lineno} {name}")
+        lines.append("")
+
+        # 累计：函数出现在栈中任意位置的采样次数；自身：函数位于栈顶的采样次数
+        cumulative, own = Counter(), Counter()
+        for stack, count in self.samples.items():
+            for func_key in {(filename, name) for filename, _, name in stack}:
+                cumulative[func_key] += count
+            own[(stack[-1][0], stack[-1][2])] += count
+
+        lines.append(f"=== Top {top_n} 函数（按累计采样次数） ===")
+        lines.append(f"{'cumulative':>12}  {'cum%':>6}  {'self':>8}  function")
+        for (filename, name), count in cumulative.most_common(top_n):
+            lines.append(
+                f"{count:>12}  {count / total * 100:>5.1f}%  {own[(filename, name)]:>8}  {filename}:{name}"
+            )
+        return "\n".join(lines)
+
+
+class _SlowCallLimiter:
+    """慢调用捕获限流：同一函数两次捕获之间至少间隔 min_interval 秒，且总次数不超过 max_captures"""
+
+    def __init__(self):
+        self._history = {}  # 函数名 -> (上次捕获时间, 已捕获次数)
+        self._lock = threading.Lock()
+
+    def allow(self, name, config):
+        """仅检查是否可以捕获，不占用名额（用于决定是否启动采样线程）"""
+        with self._lock:
+            return self._allowed(name, config, time.monotonic())
+
+    def acquire(self, name, config):
+        """检查并占用一次捕获名额，检查与记录在同一把锁内完成，并发的慢调用不会突破限流"""
+        with self._lock:
+            now = time.monotonic()
+            if not self._allowed(name, config, now):
+                return False
+            _, count = self._history.get(name, (None, 0))
+            self._history[name] = (now, count + 1)
+            return True
+
+    def _allowed(self, name, config, now):
+        last_time, count = self._history.get(name, (None, 0))
+        if count >= config.max_captures:
+            return False
+        return last_time is None or now - last_time >= config.min_interval
+
+    def reset(self):
+        with self._lock:
+            self._history.clear()
+
+
+_slow_call_limiter = _SlowCallLimiter()
+
+
+def arm_slow_call_sampler(func, config):
+    """
+    为一次调用准备采样分析器：仅 "sample" 模式且未被限流时返回 SamplingProfiler，否则返回 None
+    """
+    if config.mode != "sample":
+        return None
+    if not _slow_call_limiter.allow(_func_name(func), config):
+        return None
+    return SamplingProfiler(config.sample_interval)
+
+
+def capture_slow_call(func, args, kwargs, elapsed, threshold, config, sampler = None):
+    """
+    保存慢调用的分析报告
+
+    - "sample" 模式：写入调用期间的采样结果（需传入 arm_slow_call_sampler 返回的 sampler）
+    - "rerun" 模式：未被限流时使用 cProfile 重新执行一次函数，写入按累计耗时排序的统计表及调用方信息
+
+    :return: 报告文件路径；被限流或无可用数据时返回 None
+    """
+    name = _func_name(func)
+    if config.mode not in ("sample", "rerun"):
+        raise ValueError(f"不支持的慢调用分析模式: {config.mode}，支持 'sample' 或 'rerun'")
+    if config.mode == "sample" and sampler is None:
+        return None
+    if not _slow_call_limiter.acquire(name, config):
+        return None
+
+    if config.mode == "sample":
+        body = sampler.report(config.top_n)
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(func, *args, **kwargs)
+        except Exception as e:
+            # 重新执行失败时仍保存已采集到的统计数据
+            funcguard_logger.warning("cProfile 重新执行 %s 时出错: %s", name, e)
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream = stream).sort_stats("cumulative")
+        stats.print_stats(config.top_n)
+        stats.print_callers(config.top_n)
+        body = stream.getvalue()
+
+    os.makedirs(config.save_dir, exist_ok = True)
+    safe_name = re.sub(r"[^\w.-]", "_", name)
+    path = os.path.join(config.save_dir, f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.txt")
+    header = (
+        f"函数: {name}\n"
+        f"耗时: {elapsed:.6f}秒，阈值: {threshold}秒\n"
+        f"分析模式: {config.mode}\n"
+        f"捕获时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    )
+    with open(path, "w", encoding = "utf-8") as f:
+        f.write(header + body)
+    return path
@@ -15,12 +15,20 @@ from .statistics import (
     pd_build_mask, 
     pd_build_masks, 
     pd_combine_masks, 
+    pd_compile_conditions,
+    pd_build_expr_mask,
+    pd_explain,
+    ConditionPlanner,
+    PackedMask,
+    ColumnIndex,
+    SortedIndex,
     pd_count, 
     pd_value_counts, 
     pd_group_agg, 
     DataFrameStatistics
 )
 from .filter import pd_filter, pd_select_columns
+from .chunk_utils import pd_filter_chunks, pd_filter_to_file, pd_count_chunks
 
 # 启用未来行为：禁止静默降级
 pd.set_option("future.no_silent_downcasting", True)
@@ -45,11 +53,21 @@ __all__ = [
     # 数据筛选类
     "pd_filter",
     "pd_select_columns",
+    "pd_filter_chunks",
+    "pd_filter_to_file",
+    "pd_count_chunks",
 
     # 统计分析类
     "pd_build_mask",
     "pd_build_masks",
     "pd_combine_masks",
+    "pd_compile_conditions",
+    "pd_build_expr_mask",
+    "pd_explain",
+    "ConditionPlanner",
+    "PackedMask",
+    "ColumnIndex",
+    "SortedIndex",
     "pd_count",
     "pd_value_counts",
     "pd_group_agg",
@@ -0,0 +1,309 @@
+"""
+分块（out-of-core）筛选工具模块。
+
+对大于内存的 CSV / Parquet 文件或 DataFrame 分块迭代器逐块应用筛选条件，
+内存占用只与分块大小有关。读取文件时只读取需要的列（列裁剪）；
+Parquet 文件还会根据行组（row group）的最小值/最大值统计信息跳过不可能满足条件的行组（谓词下推）。
+"""
+
+import operator
+from collections.abc import Iterable, Iterator
+from os import PathLike
+from pathlib import Path
+
+import pandas as pd
+
+from .filter import pd_filter
+from .statistics.mask_utils import _normalize_condition
+from .statistics.expr_utils import _condition_columns as _expression_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖，仅读写 Parquet 时需要
+    pa = None
+    pq = None
+
+
+Source = str | PathLike[str] | Iterable[pd.DataFrame]
+
+# 默认每块行数
+DEFAULT_CHUNKSIZE = 100_000
+
+# 可利用行组最小值/最大值判断的比较运算符
+_RANGE_COMPARE = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def _require_pyarrow() -> None:
+    if pq is None:
+        raise ImportError("读写 Parquet 文件需要安装 pyarrow：pip install pyarrow")
+
+
+def _infer_format(path: str | PathLike[str], file_format: str | None) -> str:
+    """根据 file_format 或文件后缀确定格式：csv / tsv / parquet"""
+    if file_format is not None:
+        file_format = file_format.lower()
+    else:
+        suffixes = [s.lower() for s in Path(path).suffixes]
+        # 支持 data.csv.gz 等压缩文件
+        suffix = next((s for s in reversed(suffixes) if s in (".csv", ".tsv", ".txt", ".parquet", ".pq")), "")
+        file_format = {".csv": "csv", ".txt": "csv", ".tsv": "tsv", ".parquet": "parquet", ".pq": "parquet"}.get(suffix)
+    if file_format not in ("csv", "tsv", "parquet"):
+        raise ValueError(f"无法识别的文件格式: {path}，请通过 file_format 指定 'csv'、'tsv' 或 'parquet'")
+    return file_format
+
+
+def _condition_columns(conditions) -> list:
+    """收集条件中引用的列名（分块筛选不支持掩码Series列表）"""
+    if isinstance(conditions, list) and any(isinstance(item, pd.Series) for item in conditions):
+        raise ValueError("分块筛选不支持掩码Series列表，请使用条件元组或嵌套表达式")
+    return _expression_columns(conditions)
+
+
+def _read_columns(conditions, columns: list | None) -> list | None:
+    """需要读取的列：输出列 + 条件列；columns 为 None 时读取全部列"""
+    if columns is None:
+        return None
+    return list(dict.fromkeys(list(columns) + _condition_columns(conditions)))
+
+
+def _row_group_may_match(row_group, conditions, logic: str) -> bool:
+    """
+    根据行组的统计信息判断是否可能存在满足条件的行（无法判断时返回 True）。
+    仅处理 and 组合的条件元组；嵌套表达式、or 组合不做下推。
+    """
+    if isinstance(conditions, tuple):
+        conditions = [conditions]
+    if not isinstance(conditions, list) or logic != "and" or not all(isinstance(c, tuple) for c in conditions):
+        return True
+
+    names = {row_group.column(i).path_in_schema: i for i in range(row_group.num_columns)}
+    for condition in conditions:
+        column, op, value = _normalize_condition(condition)
+        if column not in names:
+            continue
+        stats = row_group.column(names[column]).statistics
+        if stats is None:
+            continue
+        try:
+            if op == "null" and stats.has_null_count and stats.null_count == 0:
+                return False
+            if op == "not null" and stats.has_null_count and stats.null_count == row_group.num_rows:
+                return False
+            if not stats.has_min_max:
+                continue
+            low, high = stats.min, stats.max
+            if op in (">", ">="):
+                if not _RANGE_COMPARE[op](high, value):
+                    return False
+            elif op in ("<", "<="):
+                if not _RANGE_COMPARE[op](low, value):
+                    return False
+            elif op == "==":
+                if value < low or value > high:
+                    return False
+            elif op == "in" and not isinstance(value, (str, bytes)):
+                if not any(low <= v <= high for v in value):
+                    return False
+        except TypeError:
+            continue  # 统计值与条件值类型不可比较（如时间与字符串），不做下推
+    return True
+
+
+def _iter_source(
+    source: Source,
+    read_columns: list | None,
+    conditions,
+    logic: str,
+    chunksize: int,
+    file_format: str | None,
+    read_kwargs: dict,
+) -> Iterator[pd.DataFrame]:
+    """按块读取数据源，文件只读取需要的列，Parquet 跳过不可能满足条件的行组"""
+    if not isinstance(source, (str, PathLike)):
+        for chunk in source:
+            yield chunk
+        return
+
+    fmt = _infer_format(source, file_format)
+    if fmt == "parquet":
+        _require_pyarrow()
+        parquet_file = pq.ParquetFile(source, **read_kwargs)
+        metadata = parquet_file.metadata
+        row_groups = [
+            i for i in range(metadata.num_row_groups)
+            if _row_group_may_match(metadata.row_group(i), conditions, logic)
+        ]
+        if not row_groups:
+            # 所有行组都被跳过时仍返回一个空块，保留列结构
+            yield parquet_file.schema_arrow.empty_table().to_pandas()[read_columns or slice(None)]
+            return
+        for batch in parquet_file.iter_batches(batch_size=chunksize, row_groups=row_groups, columns=read_columns):
+            yield batch.to_pandas()
+        return
+
+    if fmt == "tsv":
+        read_kwargs.setdefault("sep", "\t")
+    with pd.read_csv(source, chunksize=chunksize, usecols=read_columns, **read_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _iter_filtered(
+    source: Source,
+    conditions,
+    logic: str,
+    columns: list | None,
+    chunksize: int,
+    file_format: str | None,
+    read_kwargs: dict,
+) -> Iterator[pd.DataFrame]:
+    """逐块筛选，包括筛选后为空的块（用于保留列结构）"""
+    if chunksize <= 0:
+        raise ValueError(f"chunksize 必须为正整数，当前值: {chunksize}")
+    read_columns = _read_columns(conditions, columns)
+    for chunk in _iter_source(source, read_columns, conditions, logic, chunksize, file_format, dict(read_kwargs)):
+        filtered = pd_filter(chunk, conditions, logic)
+        if columns is not None:
+            filtered = filtered[list(columns)]
+        yield filtered
+
+
+def pd_filter_chunks(
+    source: Source,
+    conditions: tuple | dict | list[tuple | dict],
+    logic: str = "and",
+    columns: list[str] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    file_format: str | None = None,
+    **read_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    分块筛选大文件或 DataFrame 分块迭代器，逐块返回筛选结果，内存占用只与分块大小有关
+
+    参数：
+    - source：数据源，支持：
+        - CSV / TSV / Parquet 文件路径（按后缀识别，也可通过 file_format 指定）
+        - DataFrame 迭代器，如 pd.read_csv(path, chunksize=...) 的返回值
+    - conditions：筛选条件，格式与 pd_filter 相同（不支持掩码Series列表）
+    - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+    - columns (List[str])：输出的列，默认为None（全部列）；
+        读取文件时只读取输出列和条件中用到的列
+    - chunksize (int)：每块行数，默认 100000
+    - file_format (str)：文件格式 "csv"、"tsv" 或 "parquet"，默认为None（按后缀识别）
+    - read_kwargs：传给 pd.read_csv 或 pyarrow.parquet.ParquetFile 的其他参数（如 sep、encoding）
+
+    返回：
+    - Iterator[pd.DataFrame]：筛选后的非空数据块
+
+    说明：
+    - Parquet 文件会根据行组的最小值/最大值、空值数量统计信息跳过不可能满足条件的行组
+      （仅限 and 组合的条件元组），需要安装 pyarrow
+    - CSV 文件无法跳过数据，但只解析需要的列
+
+    示例：
+        for chunk in pd_filter_chunks("events.csv", [("status", "==", "paid"), ("amount", ">", 100)],
+                                   columns=["order_id", "amount"]):
+            process(chunk)
+    """
+    for chunk in _iter_filtered(source, conditions, logic, columns, chunksize, file_format, read_kwargs):
+        if not chunk.empty:
+            yield chunk
+
+
+def pd_filter_to_file(
+    source: Source,
+    output: str | PathLike[str],
+    conditions: tuple | dict | list[tuple | dict],
+    logic: str = "and",
+    columns: list[str] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    file_format: str | None = None,
+    output_format: str | None = None,
+    **read_kwargs,
+) -> int:
+    """
+    分块筛选并将结果写入文件（CSV / TSV / Parquet），内存占用只与分块大小有关
+
+    参数：
+    - source：数据源，同 pd_filter_chunks
+    - output (str | PathLike)：输出文件路径，已存在时覆盖
+    - conditions：筛选条件，格式与 pd_filter 相同（不支持掩码Series列表）
+    - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+    - columns (List[str])：输出的列，默认为None（全部列）
+    - chunksize (int)：每块行数，默认 100000
+    - file_format (str)：输入文件格式，默认为None（按后缀识别）
+    - output_format (str)：输出文件格式 "csv"、"tsv" 或 "parquet"，默认为None（按输出文件后缀识别）
+    - read_kwargs：传给读取函数的其他参数
+
+    返回：
+    - int：写入的行数
+
+    示例：
+        rows = pd_filter_to_file("daily.parquet", "paid.parquet", ("status", "==", "paid"))
+    """
+    fmt = _infer_format(output, output_format)
+    written = 0
+    chunks = _iter_filtered(source, conditions, logic, columns, chunksize, file_format, read_kwargs)
+
+    if fmt == "parquet":
+        _require_pyarrow()
+        writer = None
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(output, table.schema)
+                else:
+                    # 后续块按第一块的结构写入（如全为空值的 object 列）
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                if chunk.empty and written:
+                    continue
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+    sep = "\t" if fmt == "tsv" else ","
+    first = True
+    for chunk in chunks:
+        if chunk.empty and not first:
+            continue
+        # 第一块（即使为空）写入表头，之后追加
+        chunk.to_csv(output, mode="w" if first else "a", header=first, index=False, sep=sep)
+        first = False
+        written += len(chunk)
+    return written
+
+
+def pd_count_chunks(
+    source: Source,
+    conditions: tuple | dict | list[tuple | dict],
+    logic: str = "and",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    file_format: str | None = None,
+    **read_kwargs,
+) -> int:
+    """
+    分块统计大文件中符合条件的行数，只读取条件中用到的列
+
+    参数：
+    - source：数据源，同 pd_filter_chunks
+    - conditions：筛选条件，格式与 pd_filter 相同（不支持掩码Series列表）
+    - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+    - chunksize (int)：每块行数，默认 100000
+    - file_format (str)：输入文件格式，默认为None（按后缀识别）
+    - read_kwargs：传给读取函数的其他参数
+
+    返回：
+    - int：符合条件的行数
+    """
+    condition_columns = _condition_columns(conditions)
+    return sum(
+        len(chunk)
+        for chunk in _iter_filtered(
+            source, conditions, logic, condition_columns, chunksize, file_format, read_kwargs
+        )
+    )
@@ -1,25 +1,83 @@
+import numpy as np
 import pandas as pd
 from os import PathLike
+from typing import Literal
 
 from .statistics.mask_utils import build_single_mask, build_base_mask, combine_masks
+from .statistics.parallel import parallel_mask
+
+
+# pd_filter 支持的结果类型
+RESULT_MODES = ("frame", "positions", "mask", "view")
+
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def _copy_on_write() -> bool:
+    """pandas 是否启用了写时复制（pandas 3.0 起始终启用）"""
+    if _PANDAS_MAJOR >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def _detach(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    返回与原 DataFrame 互不影响的结果：
+    写时复制模式下索引结果在首次写入时才复制数据，无需再防御性地 copy()
+    """
+    return df if _copy_on_write() else df.copy()
+
+
+def _filter_result(df: pd.DataFrame, mask: pd.Series | np.ndarray | None, result: str):
+    """按 result 返回筛选结果，mask 为 None 表示全部行"""
+    if mask is None:
+        if result == "frame":
+            return df.copy(deep=False) if _copy_on_write() else df.copy()
+        mask = np.ones(len(df), dtype=bool)
+
+    if result == "frame":
+        return _detach(df[mask])
+
+    if isinstance(mask, pd.Series):
+        # 可空布尔结果中的 NA 与 df[mask] 的语义一致，视为 False
+        values = mask.to_numpy(dtype=bool, na_value=False)
+    else:
+        values = mask
+    if result == "mask":
+        return pd.Series(values, index=df.index, copy=False)
+
+    positions = np.flatnonzero(values)
+    if result == "positions":
+        return positions
+
+    # view：匹配行连续时返回切片视图（写时复制模式下首次写入才复制），否则只取行一次
+    if _copy_on_write() and (
+        len(positions) == 0 or positions[-1] - positions[0] + 1 == len(positions)
+    ):
+        start = int(positions[0]) if len(positions) else 0
+        return df.iloc[start:start + len(positions)]
+    return _detach(df.iloc[positions])
 
 
 def pd_filter(
     df: pd.DataFrame,
-    conditions: tuple | list[tuple] | list[pd.Series],
-    logic: str = "and"
-) -> pd.DataFrame:
+    conditions: tuple | dict | list[tuple | dict] | list[pd.Series],
+    logic: str = "and",
+    parallel: int | None = None,
+    result: Literal["frame", "positions", "mask", "view"] = "frame",
+) -> pd.DataFrame | pd.Series | np.ndarray:
     """
     根据条件筛选DataFrame数据
 
     智能识别条件类型，自动选择合适的掩码构建方式：
     - 单个条件元组：使用 build_single_mask（性能最优）
     - 条件元组列表：使用 build_base_mask
+    - 嵌套逻辑表达式：使用 build_base_mask，按表达式树短路求值
     - 掩码Series列表：使用 combine_masks
 
     参数：
     - df (pd.DataFrame)：输入的DataFrame
-    - conditions：筛选条件，支持三种格式：
+    - conditions：筛选条件，支持四种格式：
         1. 单个条件元组：(列名, 运算符, 值)
            例如：('age', '>', 25)
            对于 null/not null 运算符：(列名, 运算符)
@@ -31,18 +89,32 @@ def pd_filter(
         3. 掩码Series列表：[pd.Series, pd.Series, ...]
            例如：[mask1, mask2]
 
+        4. 嵌套逻辑表达式：{"and": [...]}、{"or": [...]}、{"not": ...} 任意嵌套，
+           也可以作为条件元组列表中的元素
+           例如：{"or": [("dept", "==", "IT"), {"and": [("age", ">", 25), ("level", ">=", 3)]}]}
+
     - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
-        仅对条件元组列表和掩码Series列表有效
+        仅对条件元组列表和掩码Series列表有效（嵌套表达式使用分组自身的逻辑）
+    - parallel (int)：并行求值的进程数，-1 表示使用全部 CPU 核心，默认为None（串行）
+        按行分区在多个进程中求值条件（适合 contains、regex、empty 等逐行计算的 object/字符串条件），
+        数值、日期时间和分类列通过共享内存传递，其他列按分区切片序列化；
+        行数少于 200000 时仍串行求值。对掩码Series列表无效
+    - result (str)：返回结果的类型，默认为 "frame"
+        - "frame"：筛选后的DataFrame；写时复制模式下（pandas 3.0 起始终启用）不再额外 copy()
+        - "positions"：符合条件的行位置（np.ndarray，int），可用于 df.iloc / df.take
+        - "mask"：布尔掩码 Series（索引与 df 相同，可空布尔结果中的 NA 视为 False）
+        - "view"：只读场景使用的DataFrame，匹配行连续时为原数据的切片视图，
+          写时复制模式下首次写入时才复制数据；否则与 "frame" 相同
 
     返回：
-    - pd.DataFrame：筛选后的DataFrame
+    - pd.DataFrame | pd.Series | np.ndarray：按 result 返回筛选结果
 
     支持的运算符：
     - 比较运算：>, >=, <, <=, ==, !=
     - 集合运算：in, not in
     - 空值判断：null, not null
     - 空值/空容器判断：empty, not empty（覆盖 NaN/None、空字符串、空列表、空元组、空字典、空集合）
-    - 字符串匹配：contains, not contains, startswith, endswith
+    - 字符串匹配：contains, not contains, startswith, endswith, regex（正则字符串或预编译的 re.Pattern）
 
     示例：
     # 单个条件筛选
@@ -67,22 +139,51 @@ def pd_filter(
     # 字符串匹配
     filtered_df = pd_filter(df, ('name', 'contains', '张'))
 
+    # 只需要行位置或掩码时不复制数据
+    positions = pd_filter(df, ('age', '>', 25), result='positions')
+    mask = pd_filter(df, ('age', '>', 25), result='mask')
+
+    # 多进程并行求值（大表上的字符串匹配）
+    filtered_df = pd_filter(df, ('comment', 'regex', r'退款|投诉'), parallel=8)
+
+    # 嵌套逻辑：(dept == IT) OR (age > 25 AND NOT name contains "test")
+    # and 分组中后面的条件只在仍满足前面条件的行上求值，代价高的条件放在后面
+    filtered_df = pd_filter(df, {"or": [
+        ('dept', '==', 'IT'),
+        {"and": [('age', '>', 25), {"not": ('name', 'contains', 'test')}]}
+    ]})
+
     # 组合多个掩码
     mask1 = pd_filter(df, [('age', '>', 25), ('salary', '>', 5000)])
     mask2 = pd_filter(df, ('dept', '==', 'IT'))
     filtered_df = pd_filter(df, [mask1, mask2], logic='or')
     """
+    if result not in RESULT_MODES:
+        raise ValueError(f"不支持的结果类型: {result}，支持 {', '.join(map(repr, RESULT_MODES))}")
+
     if df.empty:
-        return df.copy()
+        return _filter_result(df, None, result)
+
+    # 并行求值：条件元组、条件元组列表或嵌套表达式
+    if parallel is not None and isinstance(conditions, (tuple, dict, list)) and conditions \
+            and not (isinstance(conditions, list) and isinstance(conditions[0], pd.Series)):
+        values = parallel_mask(df, conditions, logic, parallel)
+        if values is not None:
+            return _filter_result(df, values, result)
 
     # 情况1：单个条件元组
     if isinstance(conditions, tuple):
         mask = build_single_mask(df, conditions)
-        return df[mask].copy()
+        return _filter_result(df, mask, result)
+
+    # 情况1.1：嵌套逻辑表达式
+    if isinstance(conditions, dict):
+        mask = build_base_mask(df, conditions)
+        return _filter_result(df, mask, result)
 
     # 情况2：空列表
     if not conditions:
-        return df.copy()
+        return _filter_result(df, None, result)
 
     # 判断列表中的元素类型
     first_item = conditions[0]
@@ -90,16 +191,16 @@ def pd_filter(
     # 情况3：掩码Series列表
     if isinstance(first_item, pd.Series):
         mask = combine_masks(conditions, logic=logic)  # type: ignore[arg-type]
-        return df[mask].copy()
+        return _filter_result(df, mask, result)
 
-    # 情况4：条件元组列表
-    if isinstance(first_item, tuple):
+    # 情况4：条件元组列表（可包含嵌套分组）
+    if isinstance(first_item, (tuple, dict)):
         mask = build_base_mask(df, conditions, logic=logic)  # type: ignore[arg-type]
-        return df[mask].copy()
+        return _filter_result(df, mask, result)
 
     raise ValueError(
         f"不支持的条件类型: {type(first_item)}。"
-        "请使用 Tuple（单个条件）、List[Tuple]（多个条件）或 List[pd.Series]（掩码列表）"
+        "请使用 Tuple（单个条件）、List[Tuple]（多个条件）、Dict（嵌套表达式）或 List[pd.Series]（掩码列表）"
     )
 
 
@@ -122,6 +223,7 @@ def pd_select_columns(
 
     返回：
     - pd.DataFrame: 仅保留指定列的新DataFrame
+        写时复制模式下（pandas 3.0 起始终启用）与原DataFrame共享数据，首次写入时才复制
 
     示例：
     # 使用列名列表
@@ -135,7 +237,7 @@ def pd_select_columns(
 
     """
     if df.empty:
-        return df.copy()
+        return df.copy(deep=False) if _copy_on_write() else df.copy()
 
     # 处理txt文件路径
     if isinstance(retain_columns, list):
@@ -156,4 +258,4 @@ def pd_select_columns(
             raise ValueError(f"DataFrame中不存在以下列: {missing_cols}")
         column_list = [col for col in column_list if col in df.columns]
 
-    return df[column_list].copy()
+    return _detach(df[column_list])
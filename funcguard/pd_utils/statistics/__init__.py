@@ -5,6 +5,11 @@ from .mask_utils import (
     build_base_mask as pd_build_masks,
     combine_masks as pd_combine_masks,
 )
+from .mask_compiler import compile_conditions as pd_compile_conditions
+from .expr_utils import build_expression_mask as pd_build_expr_mask
+from .planner import ConditionPlanner, explain as pd_explain
+from .packed_mask import PackedMask
+from .column_index import ColumnIndex, SortedIndex
 from .agg_utils import group_agg as pd_group_agg
 
 __all__ = [
@@ -12,6 +17,13 @@ __all__ = [
     "pd_build_mask",
     "pd_build_masks",
     "pd_combine_masks",
+    "pd_compile_conditions",
+    "pd_build_expr_mask",
+    "pd_explain",
+    "ConditionPlanner",
+    "PackedMask",
+    "ColumnIndex",
+    "SortedIndex",
     # 统计函数
     "pd_count",
     "pd_value_counts",
@@ -1,49 +1,262 @@
 """
 聚合(aggregation)操作工具模块。
 
-提供DataFrame分组聚合统计功能，支持按指定列分组后对另一列进行
-sum、mean、max、min、count、median、std、var等聚合计算。
+提供DataFrame分组聚合统计功能，支持按一列或多列分组后对一列或多列进行
+sum、mean、max、min、count、median、std、var等聚合计算（一次分组完成多个聚合）。
+sum、count、mean、min、max 对数值列使用 numpy 快速路径：分组键编码后按编码直接累加，
+不经过通用的 groupby(...).agg(str)。
 """
 
+import math
+import numpy as np
 import pandas as pd
 from typing import Any, Literal
 from .mask_utils import build_single_mask, build_base_mask
 from ..convert_utils import convert_series
 
 
+# 支持的聚合函数
+VALID_AGG_FUNCS = ("sum", "mean", "max", "min", "count", "median", "std", "var")
+
+# 可走 numpy 快速路径的聚合函数
+FAST_AGG_FUNCS = ("sum", "count", "mean", "min", "max")
+
+
+def _as_list(value) -> list:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _named_aggs(agg_col, agg_func, aggs: dict | None) -> dict:
+    """
+    规范化聚合配置为 {输出名: (聚合列, 聚合函数)}：
+    - aggs 直接指定输出名：{"total": ("amount", "sum"), "orders": ("order_id", "count")}
+    - 否则为 agg_col × agg_func 的组合：只有一个聚合函数时输出名为列名，否则为 "列名_函数名"
+    """
+    if aggs is not None:
+        if agg_col is not None:
+            raise ValueError("agg_col 与 aggs 不能同时指定")
+        if not aggs:
+            raise ValueError("aggs 不能为空")
+        named = {}
+        for name, spec in aggs.items():
+            if not isinstance(spec, tuple) or len(spec) != 2:
+                raise ValueError(f"aggs 的值必须是 (聚合列, 聚合函数) 元组，当前 {name!r} 为: {spec!r}")
+            named[name] = spec
+    else:
+        if agg_col is None:
+            raise ValueError("缺少 agg_col 参数（或使用 aggs 指定聚合）")
+        columns, funcs = _as_list(agg_col), _as_list(agg_func)
+        if not columns or not funcs:
+            raise ValueError("agg_col 和 agg_func 不能为空")
+        named = {
+            (col if len(funcs) == 1 else f"{col}_{func}"): (col, func)
+            for col in columns for func in funcs
+        }
+    for _, func in named.values():
+        if func not in VALID_AGG_FUNCS:
+            raise ValueError(f"agg_func 参数必须是 {VALID_AGG_FUNCS} 之一，当前值: {func}")
+    return named
+
+
+def _group_codes(df: pd.DataFrame, keys: list) -> tuple[np.ndarray, pd.Index] | None:
+    """
+    将分组键编码为 0..G-1 的整数（空值为 -1），返回 (编码, 分组索引)；
+    分组按键值排序，分类列只包含出现过的类别（observed=True）。无法编码时返回 None
+    """
+    codes_list, uniques_list = [], []
+    try:
+        for key in keys:
+            codes, uniques = pd.factorize(df[key], sort=True)
+            codes_list.append(codes)
+            uniques_list.append(uniques)
+    except TypeError:
+        return None  # 无法排序的混合类型等，交给 groupby
+
+    if len(keys) == 1:
+        return codes_list[0], pd.Index(uniques_list[0], name=keys[0])
+
+    sizes = [len(uniques) for uniques in uniques_list]
+    total = math.prod(sizes)
+    if total >= np.iinfo(np.int64).max:
+        return None
+    valid = np.logical_and.reduce([codes >= 0 for codes in codes_list])
+    combined = np.ravel_multi_index([codes[valid] for codes in codes_list], sizes)
+    if total <= 4 * len(combined) + 1024:
+        # 组合数不大时用 bincount 找出出现过的组合，O(n)，无需对 combined 排序
+        observed = np.flatnonzero(np.bincount(combined, minlength=total))
+        lookup = np.empty(total, dtype=np.intp)
+        lookup[observed] = np.arange(len(observed))
+        inverse = lookup[combined]
+    else:
+        observed, inverse = np.unique(combined, return_inverse=True)
+    group = np.full(len(df), -1, dtype=np.intp)
+    group[valid] = inverse
+    parts = np.unravel_index(observed, sizes)
+    index = pd.MultiIndex.from_arrays(
+        [uniques.take(part) for uniques, part in zip(uniques_list, parts)], names=keys
+    )
+    return group, index
+
+
+def _integer_sum(values: np.ndarray, codes: np.ndarray, size: int) -> np.ndarray:
+    """整数列按分组求和（精确），结果类型规则与 pandas 一致"""
+    if not len(values):
+        return np.zeros(size, dtype=values.dtype)
+    # 与 pandas 一致：无符号整数累加为 uint64，有符号整数累加为 int64
+    wide = np.uint64 if values.dtype.kind == "u" else np.int64
+    low, high = int(values.min()), int(values.max())
+    if max(abs(low), abs(high)) * len(values) < 2 ** 53:
+        # 累加结果不超过 2^53 时 float64 精确，bincount 远快于 np.add.at
+        out = np.bincount(codes, weights=values, minlength=size).astype(wide)
+    else:
+        out = np.zeros(size, dtype=wide)
+        np.add.at(out, codes, values)
+    # 结果在原类型范围内时转回原类型，否则保留 64 位
+    limits = np.iinfo(values.dtype)
+    if out.min() >= limits.min and out.max() <= limits.max:
+        out = out.astype(values.dtype)
+    return out
+
+
+def _fast_aggregate(df: pd.DataFrame, keys: list, named: dict) -> pd.DataFrame | None:
+    """numpy 快速路径：按分组编码用 bincount / ufunc.at 累加，结果与 groupby(...).agg 一致"""
+    if any(func not in FAST_AGG_FUNCS for _, func in named.values()):
+        return None
+    columns = list(dict.fromkeys(col for col, _ in named.values()))
+    for col in columns:
+        dtype = df[col].dtype
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "iuf":
+            return None
+
+    grouping = _group_codes(df, keys)
+    if grouping is None:
+        return None
+    group, index = grouping
+    size = len(index)
+    keep = group >= 0
+    if not keep.all():
+        group = group[keep]
+
+    # 每列只取一次非空值及其分组编码；同一列的 count / sum 只计算一次，mean 复用
+    prepared: dict = {}
+    partials: dict = {}
+
+    def _prepare(col) -> tuple[np.ndarray, np.ndarray]:
+        if col not in prepared:
+            values, codes = df[col].to_numpy(), group
+            if not keep.all():
+                values = values[keep]
+            if values.dtype.kind == "f":
+                valid = ~np.isnan(values)
+                if not valid.all():
+                    values, codes = values[valid], codes[valid]
+            prepared[col] = (values, codes)
+        return prepared[col]
+
+    def _partial(col, func) -> np.ndarray:
+        if (col, func) in partials:
+            return partials[(col, func)]
+        values, codes = _prepare(col)
+        if func == "count":
+            out = np.bincount(codes, minlength=size).astype(np.int64)
+        elif func == "sum":
+            if values.dtype.kind == "f":
+                out = np.bincount(codes, weights=values, minlength=size).astype(values.dtype)
+            else:
+                out = _integer_sum(values, codes, size)
+        elif func == "mean":
+            # 与 pandas 一致按 float64 累加（整数列的整数和可能溢出回绕）
+            total = np.bincount(codes, weights=values, minlength=size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out = total / _partial(col, "count")
+            if values.dtype.kind == "f":
+                out = out.astype(values.dtype)
+        else:
+            if values.dtype.kind == "f":
+                start = np.inf if func == "min" else -np.inf
+            else:
+                limits = np.iinfo(values.dtype)
+                start = limits.max if func == "min" else limits.min
+            out = np.full(size, start, dtype=values.dtype)
+            (np.minimum if func == "min" else np.maximum).at(out, codes, values)
+            if values.dtype.kind == "f":
+                # 全为空值的分组结果为 NaN
+                out[_partial(col, "count") == 0] = np.nan
+        partials[(col, func)] = out
+        return out
+
+    return pd.DataFrame({name: _partial(col, func) for name, (col, func) in named.items()}, index=index)
+
+
+def aggregate(df: pd.DataFrame, group_col: str | list[str], named: dict) -> pd.DataFrame:
+    """
+    一次分组完成多个聚合，返回以分组键为索引、输出名为列的 DataFrame
+
+    参数：
+    - df (pd.DataFrame)：输入的DataFrame
+    - group_col (str | List[str])：分组列名，多列时结果索引为 MultiIndex
+    - named (Dict)：{输出名: (聚合列, 聚合函数)}
+
+    说明：
+    - 分组按键值排序，分组键为空值的行不参与统计，分类列只输出出现过的类别（observed=True）
+    - 全部为 sum/count/mean/min/max 且聚合列均为 numpy 数值类型时走 numpy 快速路径，
+      否则使用 groupby(...).agg(**named)
+    """
+    keys = _as_list(group_col)
+    result = _fast_aggregate(df, keys, named)
+    if result is not None:
+        return result
+    by = keys[0] if len(keys) == 1 else keys
+    return df.groupby(by, observed=True, sort=True).agg(
+        **{name: pd.NamedAgg(column=col, aggfunc=func) for name, (col, func) in named.items()}
+    )
+
+
 def group_agg(
     df: pd.DataFrame,
-    group_col: str,
-    agg_col: str,
-    agg_func: str = "sum",
+    group_col: str | list[str],
+    agg_col: str | list[str] | None = None,
+    agg_func: str | list[str] = "sum",
     sort: str | None = None,
-    conditions: tuple | list[tuple] | None = None,
+    conditions: tuple | list[tuple] | dict | None = None,
     logic: str = "and",
     true_mask: pd.Series | None = None,
     false_mask: pd.Series | None = None,
-    return_type: Literal["dict", "df", "series"] = "dict"
-) -> dict[Any, int | float] | pd.DataFrame | pd.Series:
+    return_type: Literal["dict", "df", "series"] = "dict",
+    planner=None,
+    aggs: dict[str, tuple[str, str]] | None = None,
+) -> dict[Any, Any] | pd.DataFrame | pd.Series:
     """
-    按指定列分组，对另一列进行聚合统计。
+    按指定列分组，对另一列（或多列）进行聚合统计。
 
     参数：
     - df (pd.DataFrame)：输入的DataFrame。
-    - group_col (str)：分组列名（如A列）。
-    - agg_col (str)：聚合列名（如B列）。
-    - agg_func (str)：聚合函数，支持 "sum"、"mean"、"max"、"min"、"count"、"median"、"std"、"var"，
-        默认为 "sum"。
+    - group_col (Union[str, List[str]])：分组列名（如A列）；多列时分组键为元组。
+    - agg_col (Union[str, List[str]])：聚合列名（如B列），可以是多列。
+    - agg_func (Union[str, List[str]])：聚合函数，支持 "sum"、"mean"、"max"、"min"、"count"、"median"、"std"、"var"，
+        默认为 "sum"；可以是多个函数，与 agg_col 两两组合。
     - sort (Optional[str])：排序方式，"asc" 表示升序，"desc" 表示降序，
-        默认为None表示按分组列的原始顺序。
-    - conditions (Optional[Union[Tuple, List[Tuple]]])：可选的过滤条件，
+        默认为None表示按分组列的原始顺序；多个聚合结果时按第一个结果排序。
+    - conditions (Optional[Union[Tuple, List[Tuple], Dict]])：可选的过滤条件（支持嵌套表达式），
         格式与count函数相同。如果提供，则只统计符合条件的行。
     - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"。
     - true_mask (pd.Series)：初始True掩码，默认为None。
     - false_mask (pd.Series)：初始False掩码，默认为None。
     - return_type (str)：返回类型，支持 "dict"（字典）、"df"（DataFrame）和 "series"（Series），
         默认为 "dict"。
+    - planner (ConditionPlanner)：查询计划器，默认为None（使用新的计划器）。
+    - aggs (Dict[str, Tuple[str, str]])：命名聚合 {输出名: (聚合列, 聚合函数)}，与 agg_col 二选一。
 
     返回：
-    - Union[Dict[Any, Union[int, float]], pd.Series]：以分组值为键，聚合结果为值的字典或Series。
+    - 单个聚合（一个 agg_col、一个 agg_func）：以分组值为键，聚合结果为值的字典、DataFrame或Series。
+    - 多个聚合：return_type="dict" 时为 {分组值: {输出名: 聚合结果}}，"df" 时为以分组值为索引、
+        输出名为列的DataFrame（不支持 "series"）。输出名：只有一个聚合函数时为列名，
+        否则为 "列名_函数名"；使用 aggs 时为指定的输出名。
+
+    说明：
+    - 所有聚合在一次分组中完成；sum、count、mean、min、max 对数值列走 numpy 快速路径
+      （分组键编码后用 bincount / ufunc.at 累加）。
+    - 分组键为空值的行不参与统计；分类列只输出出现过的类别，不展开未出现的类别。
 
     示例：
         >>> group_agg(df, "category", "amount", "sum")
@@ -54,33 +267,42 @@ def group_agg(
         {'B': 2000, 'C': 1500, 'A': 1000}
         >>> group_agg(df, "category", "amount", "sum", conditions=[("status", "==", "active")])
         {'A': 800, 'B': 1500}
+        >>> group_agg(df, ["region", "category"], aggs={"total": ("amount", "sum"), "orders": ("amount", "count")})
+        {('north', 'A'): {'total': 600, 'orders': 6}, ('south', 'A'): {'total': 400, 'orders': 4}, ...}
     """
     # 参数校验
-    valid_agg_funcs = ("sum", "mean", "max", "min", "count", "median", "std", "var")
-    if agg_func not in valid_agg_funcs:
-        raise ValueError(f"agg_func 参数必须是 {valid_agg_funcs} 之一，当前值: {agg_func}")
+    named = _named_aggs(agg_col, agg_func, aggs)
     if sort is not None and sort not in ("asc", "desc"):
         raise ValueError(f"sort 参数必须是 'asc'、'desc' 或 None，当前值: {sort}")
+    single = aggs is None and len(named) == 1 and not isinstance(agg_col, (list, tuple)) \
+        and not isinstance(agg_func, (list, tuple))
+    if not single and return_type == "series":
+        raise ValueError("多个聚合结果不支持 return_type='series'，请使用 'dict' 或 'df'")
 
     # 如果有过滤条件，先应用条件筛选
     if conditions is not None:
         if isinstance(conditions, tuple):
             mask = build_single_mask(df, conditions)
         else:
-            mask = build_base_mask(df, conditions, logic, true_mask, false_mask)
+            mask = build_base_mask(df, conditions, logic, true_mask, false_mask, planner)
         filtered_df = df[mask]
     else:
         filtered_df = df
 
-    # 使用pandas的groupby进行聚合
-    grouped = filtered_df.groupby(group_col)[agg_col]
-    result_series = grouped.agg(agg_func)
+    return format_agg_result(aggregate(filtered_df, group_col, named), single, sort, return_type)
 
-    # 排序处理
-    if sort == "asc":
-        result_series = result_series.sort_values(ascending=True)
-    elif sort == "desc":
-        result_series = result_series.sort_values(ascending=False)
 
-    # 格式化并返回结果
-    return convert_series(result_series, return_type)
+def format_agg_result(
+    frame: pd.DataFrame,
+    single: bool,
+    sort: str | None,
+    return_type: Literal["dict", "df", "series"],
+) -> dict[Any, Any] | pd.DataFrame | pd.Series:
+    """排序并按 return_type 格式化 aggregate 的结果（单个聚合时按 Series 处理）"""
+    if sort is not None:
+        frame = frame.sort_values(frame.columns[0], ascending=sort == "asc", kind="stable")
+    if single:
+        return convert_series(frame.iloc[:, 0], return_type)
+    if return_type == "dict":
+        return frame.to_dict(orient="index")
+    return frame
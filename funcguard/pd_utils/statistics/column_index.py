@@ -0,0 +1,266 @@
+import numpy as np
+import pandas as pd
+
+from .mask_utils import STRING_OPS, _string_predicate
+
+
+# 可由倒排索引回答的运算符（字符串匹配在去重取值上求值）
+INDEX_OPS = ("==", "!=", "in", "not in") + STRING_OPS
+
+# 取补集的运算符：空值行也满足条件
+_NEGATED_OPS = ("!=", "not in", "not contains")
+
+
+def _is_lookup_scalar(value) -> bool:
+    """可在索引中查找的标量：可哈希、非空值、非布尔（布尔与 1/0 的比较语义因列类型而异）"""
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    try:
+        hash(value)
+        return not pd.isna(value)
+    except (TypeError, ValueError):
+        return False
+
+
+class ColumnIndex:
+    """
+    单列的倒排索引：值 → 行位置。
+
+    - 构建：pd.factorize 得到每行的编码，按编码稳定排序得到各值的行位置（升序），
+      并记录每个值的行数
+    - ==、in：只需取出匹配值的行位置，成本与匹配行数成正比，无需扫描整列
+    - !=、not in：取补集
+    - contains、startswith、endswith、regex：只在去重后的取值上求值，再取匹配值的行位置；
+      not contains 取补集
+    - count：直接由各值的行数相加得到
+
+    支持 numpy 数值/日期时间/object 列、分类列和 NaN 语义的字符串列（pandas 默认的 str 类型），
+    结果与 build_single_mask 完全一致；其他情况（可空扩展类型、布尔值比较、in 中包含空值等）
+    相关方法返回 None，由调用方回退为整列扫描。
+    """
+
+    __slots__ = ("_length", "_uniques", "_order", "_offsets", "_sizes", "_kind")
+
+    def __init__(self, series: pd.Series):
+        """
+        参数：
+        - series (pd.Series)：要建立索引的列
+
+        异常：
+        - TypeError：列类型不支持，或列中包含不可哈希的值（如列表）
+        """
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            kind = "category"
+        elif isinstance(dtype, pd.StringDtype) and dtype.na_value is np.nan:
+            kind = "str"
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iufmMO":
+            kind = dtype.kind
+        else:
+            raise TypeError(f"列 {series.name!r} 的类型 {dtype} 不支持建立倒排索引")
+
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self._length = len(series)
+        self._kind = kind
+        self._uniques = pd.Index(uniques) if not isinstance(uniques, pd.Index) else uniques
+        # 编码 -1（空值）排在最前，各值的行位置为 order[offsets[c + 1]:offsets[c + 2]]
+        # 编码范围较小时转为 int16，numpy 的稳定排序对 16 位以内的整数使用基数排序（O(n)）
+        sort_codes = codes.astype(np.int16) if len(self._uniques) < np.iinfo(np.int16).max else codes
+        self._order = np.argsort(sort_codes, kind="stable")
+        counts = np.bincount(codes + 1, minlength=len(self._uniques) + 1)
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._sizes = counts[1:]
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def cardinality(self) -> int:
+        """不同取值（不含空值）的数量"""
+        return len(self._uniques)
+
+    def _lookup(self, op: str, value) -> np.ndarray | None:
+        """返回匹配值（== / in 的值）的编码，无法保证结果一致时返回 None"""
+        if op in STRING_OPS:
+            if self._kind not in ("O", "str", "category"):
+                return None  # 非字符串列交给 .str 报错
+            base_op = "contains" if op == "not contains" else op
+            matched = _string_predicate(pd.Series(self._uniques), base_op, value).to_numpy(dtype=bool)
+            return np.flatnonzero(matched)
+        if op in ("==", "!="):
+            values = [value]
+        elif op in ("in", "not in"):
+            if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+                return None
+            values = list(value)
+        else:
+            return None
+
+        for v in values:
+            if not _is_lookup_scalar(v):
+                return None
+            # 日期时间列与字符串比较时 pandas 会解析字符串，不走索引
+            if self._kind in ("m", "M") and isinstance(v, str):
+                return None
+        if not values:
+            return np.empty(0, dtype=np.intp)
+        codes = self._uniques.get_indexer(values)
+        return np.unique(codes[codes >= 0])
+
+    def positions(self, op: str, value) -> np.ndarray | None:
+        """
+        返回满足条件的行位置（升序）
+
+        参数：
+        - op (str)：运算符，支持 "=="、"!="、"in"、"not in" 及字符串匹配运算符
+        - value：比较值（in / not in 为可迭代对象）
+
+        返回：
+        - np.ndarray | None：行位置数组；无法由索引回答时返回 None
+        """
+        codes = self._lookup(op, value)
+        if codes is None:
+            return None
+        chunks = [self._order[self._offsets[c + 1]:self._offsets[c + 2]] for c in codes]
+        if not chunks:
+            matched = np.empty(0, dtype=np.intp)
+        elif len(chunks) == 1:
+            matched = chunks[0]
+        else:
+            matched = np.sort(np.concatenate(chunks))
+        if op in _NEGATED_OPS:
+            keep = np.ones(self._length, dtype=bool)
+            keep[matched] = False
+            return np.flatnonzero(keep)
+        return matched
+
+    def mask(self, op: str, value) -> np.ndarray | None:
+        """返回满足条件的布尔数组；无法由索引回答时返回 None"""
+        codes = self._lookup(op, value)
+        if codes is None:
+            return None
+        result = np.zeros(self._length, dtype=bool)
+        for c in codes:
+            result[self._order[self._offsets[c + 1]:self._offsets[c + 2]]] = True
+        if op in _NEGATED_OPS:
+            np.logical_not(result, out=result)
+        return result
+
+    def count(self, op: str, value) -> int | None:
+        """由各值的行数直接得到满足条件的行数；无法由索引回答时返回 None"""
+        codes = self._lookup(op, value)
+        if codes is None:
+            return None
+        matched = int(self._sizes[codes].sum())
+        return self._length - matched if op in _NEGATED_OPS else matched
+
+
+# 可由有序索引回答的运算符
+RANGE_OPS = (">", ">=", "<", "<=")
+
+
+class SortedIndex:
+    """
+    单列的有序索引：按值稳定排序（argsort）后的行位置。
+
+    - 构建：去掉空值（NaN/NaT）后稳定排序一次
+    - >、>=、<、<=：用 searchsorted 定位排序后的一段连续区间，count 只需 O(log n)，无需构建掩码
+    - 同一列上的多个范围条件（如时间窗口 start <= t < end）可合并为一个区间
+
+    支持 numpy 数值列（不含布尔）和 datetime64 / timedelta64 列，结果与 build_single_mask 完全一致；
+    比较值类型不匹配（如布尔值、带时区的时间与无时区的列比较）时相关方法返回 None，由调用方回退为整列扫描。
+    """
+
+    __slots__ = ("_length", "_order", "_sorted", "_kind")
+
+    def __init__(self, series: pd.Series):
+        """
+        参数：
+        - series (pd.Series)：要建立索引的列
+
+        异常：
+        - TypeError：列类型不支持
+        """
+        dtype = series.dtype
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "iufmM":
+            raise TypeError(f"列 {series.name!r} 的类型 {dtype} 不支持建立有序索引")
+
+        values = series.to_numpy()
+        valid = np.flatnonzero(~np.isnan(values)) if dtype.kind in "fmM" else np.arange(len(values))
+        self._length = len(values)
+        self._kind = dtype.kind
+        self._order = valid[np.argsort(values[valid], kind="stable")]
+        self._sorted = values[self._order]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _convert(self, value):
+        """将比较值转换为可用于 searchsorted 的标量，类型不匹配时返回 None"""
+        if isinstance(value, (bool, np.bool_)) or not _is_lookup_scalar(value):
+            return None
+        if self._kind in "iuf":
+            return value if isinstance(value, (int, float, np.integer, np.floating)) else None
+        try:
+            if self._kind == "M":
+                if not isinstance(value, (str, np.datetime64, pd.Timestamp)) and not hasattr(value, "tzinfo"):
+                    return None
+                converted = pd.Timestamp(value)
+                if converted.tzinfo is not None:
+                    return None
+                return converted.to_datetime64()
+            if not isinstance(value, (str, np.timedelta64, pd.Timedelta)) and not hasattr(value, "total_seconds"):
+                return None
+            return pd.Timedelta(value).to_timedelta64()
+        except (TypeError, ValueError):
+            return None
+
+    def bounds(self, op: str, value) -> tuple[int, int] | None:
+        """
+        返回满足条件的行在排序后数组中的区间 [start, stop)
+
+        参数：
+        - op (str)：运算符，支持 ">"、">="、"<"、"<="
+        - value：比较值
+
+        返回：
+        - tuple[int, int] | None：区间；无法由索引回答时返回 None
+        """
+        if op not in RANGE_OPS:
+            return None
+        converted = self._convert(value)
+        if converted is None:
+            return None
+        try:
+            if op == ">":
+                return int(np.searchsorted(self._sorted, converted, side="right")), len(self._sorted)
+            if op == ">=":
+                return int(np.searchsorted(self._sorted, converted, side="left")), len(self._sorted)
+            if op == "<":
+                return 0, int(np.searchsorted(self._sorted, converted, side="left"))
+            return 0, int(np.searchsorted(self._sorted, converted, side="right"))
+        except (TypeError, OverflowError):
+            return None
+
+    def positions_between(self, start: int, stop: int) -> np.ndarray:
+        """返回排序后区间 [start, stop) 对应的行位置（升序）"""
+        return np.sort(self._order[start:max(start, stop)])
+
+    def positions(self, op: str, value) -> np.ndarray | None:
+        """返回满足条件的行位置（升序）；无法由索引回答时返回 None"""
+        bounds = self.bounds(op, value)
+        return None if bounds is None else self.positions_between(*bounds)
+
+    def mask(self, op: str, value) -> np.ndarray | None:
+        """返回满足条件的布尔数组；无法由索引回答时返回 None"""
+        bounds = self.bounds(op, value)
+        if bounds is None:
+            return None
+        result = np.zeros(self._length, dtype=bool)
+        result[self._order[bounds[0]:max(bounds)]] = True
+        return result
+
+    def count(self, op: str, value) -> int | None:
+        """满足条件的行数（O(log n)）；无法由索引回答时返回 None"""
+        bounds = self.bounds(op, value)
+        return None if bounds is None else max(0, bounds[1] - bounds[0])
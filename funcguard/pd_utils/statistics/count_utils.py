@@ -2,6 +2,7 @@ import pandas as pd
 from collections.abc import Mapping
 from typing import Any, Literal
 from .mask_utils import build_single_mask, build_base_mask
+from .parallel import parallel_count
 from ..convert_utils import convert_series
 
 
@@ -11,11 +12,12 @@ def value_counts(
     mode: str = "count",
     sort: str | None = None,
     dropna: bool = True,
-    conditions: tuple | list[tuple] | None = None,
+    conditions: tuple | list[tuple] | dict | None = None,
     logic: str = "and",
     true_mask: pd.Series | None = None,
     false_mask: pd.Series | None = None,
-    return_type: Literal["dict", "df", "series"] = "dict"
+    return_type: Literal["dict", "df", "series"] = "dict",
+    planner=None,
 ) -> Mapping[Any, int | float] | pd.DataFrame | pd.Series:
     """
     统计DataFrame指定列中不同值的计数数据。
@@ -27,13 +29,14 @@ def value_counts(
     - sort (Optional[str])：排序方式，"asc" 表示升序，"desc" 表示降序，
         默认为None表示不排序。
     - dropna (bool)：是否排除空值，默认为True。
-    - conditions (Optional[Union[Tuple, List[Tuple]]])：可选的过滤条件，
+    - conditions (Optional[Union[Tuple, List[Tuple], Dict]])：可选的过滤条件（支持嵌套表达式），
         格式与count函数相同。如果提供，则只统计符合条件的行。
     - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"。
     - true_mask (pd.Series)：初始True掩码，默认为None。
     - false_mask (pd.Series)：初始False掩码，默认为None。
     - return_type (str)：返回类型，支持 "dict"（字典）、"df"（DataFrame）和 "series"（Series），
         默认为 "dict"。
+    - planner (ConditionPlanner)：查询计划器，默认为None（使用新的计划器）。
 
     返回：
     - Union[Mapping[Any, Union[int, float]], pd.Series]：以值为键，计数/百分比为值的字典或Series。
@@ -61,7 +64,7 @@ def value_counts(
         if isinstance(conditions, tuple):
             mask = build_single_mask(df, conditions)
         else:
-            mask = build_base_mask(df, conditions, logic, true_mask, false_mask)
+            mask = build_base_mask(df, conditions, logic, true_mask, false_mask, planner)
         filtered_df = df[mask]
     else:
         filtered_df = df
@@ -85,10 +88,12 @@ def value_counts(
 
 def count(
     df: pd.DataFrame,
-    conditions: tuple | list[tuple],
+    conditions: tuple | list[tuple] | dict,
     logic: str = "and",
     true_mask: pd.Series | None = None,
-    false_mask: pd.Series | None = None
+    false_mask: pd.Series | None = None,
+    planner=None,
+    parallel: int | None = None,
 ) -> int:
     """
     使用int sum 方法，统计DataFrame中符合条件的非空值数量。
@@ -101,21 +106,31 @@ def count(
         每个元组包含三部分：列名、运算符（例如 ">"、"<"、"=="、"!=" ）和值。 示例：
         示例1：元组 ("column", ">", 0)
         示例2：列表 [("column", ">", 0), ("column2", "==", "value")]。
+        示例3：嵌套表达式 {"or": [("column", ">", 0), {"and": [("column2", "==", "value"), ("column3", "not empty")]}]}，
+            详见 build_expression_mask（短路求值）。
 
     - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
     - true_mask (pd.Series)：初始True掩码，默认为None
     - false_mask (pd.Series)：初始False掩码，默认为None
+    - planner (ConditionPlanner)：查询计划器，默认为None（使用新的计划器）
+    - parallel (int)：并行求值的进程数，-1 表示使用全部 CPU 核心，默认为None（串行）；
+        各进程只返回分区内的行数再求和，行数少于 200000 或提供了 true_mask / false_mask 时串行求值
 
     返回：
     - int：符合条件的数量。
     """
+    if parallel is not None and true_mask is None and false_mask is None:
+        matched = parallel_count(df, conditions, logic, parallel)
+        if matched is not None:
+            return matched
+
     # 单一条件
     if isinstance(conditions, tuple):
         mask = build_single_mask(df, conditions)
         return int(mask.sum())
 
     # 使用独立的函数构建查询条件掩码
-    mask = build_base_mask(df, conditions, logic, true_mask, false_mask)
+    mask = build_base_mask(df, conditions, logic, true_mask, false_mask, planner)
 
     # 使用sum方法计算True的数量（True被视为1，False被视为0）
     return int(mask.sum())
@@ -1,11 +1,147 @@
+import copy
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from collections.abc import Mapping
 from typing import Any, Literal
-from .mask_utils import build_single_mask as _original_build_single_mask, build_base_mask as _original_build_base_mask, combine_masks
+from .mask_utils import (
+    build_single_mask as _original_build_single_mask,
+    build_base_mask as _original_build_base_mask,
+    combine_masks,
+    _normalize_condition,
+    _is_low_cardinality,
+    STRING_OPS,
+)
+from .expr_utils import _evaluate, _condition_columns
 from .count_utils import count as _original_count, value_counts as _original_value_counts
-from .agg_utils import group_agg as _original_group_agg
+from .agg_utils import (
+    group_agg as _original_group_agg,
+    aggregate as _aggregate,
+    format_agg_result as _format_agg_result,
+    _named_aggs,
+)
+from ..convert_utils import convert_series
+from .planner import ConditionPlanner
+from .packed_mask import PackedMask
+from .column_index import ColumnIndex, SortedIndex, INDEX_OPS, RANGE_OPS
+from .parallel import parallel_mask, _resolve_workers
 
 
+# create_index 支持的索引类型
+_INDEX_TYPES = {"value": ColumnIndex, "sorted": SortedIndex}
+
+# 严格校验（strict_check=True）时每列抽样比较取值的行数
+_FINGERPRINT_SAMPLE_ROWS = 32
+
+# 可增量维护的分组聚合函数（可由各批次的部分结果合并得到）
+_MAINTAINED_AGG_FUNCS = ("sum", "count", "mean", "min", "max")
+
+# 分组聚合的部分结果在批次之间的合并方式
+_PART_MERGE = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def _freeze_value(value):
+    """将条件值转换为可哈希的缓存键（列表、集合、数组等按元素转换）"""
+    if isinstance(value, (str, bytes)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return (type(value).__name__, frozenset(_freeze_value(v) for v in value))
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return (type(value).__name__, tuple(_freeze_value(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value).__name__, repr(value))
+    # 区分 1 / 1.0 / True：三者哈希相同，但在 object 列上的比较结果可能不同
+    return (type(value).__name__, value)
+
+
+def _condition_key(conditions, logic: str) -> tuple:
+    """将条件（元组、条件列表或嵌套表达式）规范化为掩码缓存键"""
+    def _freeze(expression):
+        if isinstance(expression, tuple):
+            column, op, value = _normalize_condition(expression)
+            return ("leaf", column, op, _freeze_value(value))
+        if isinstance(expression, dict):
+            return ("group",) + tuple((key, _freeze(payload)) for key, payload in expression.items())
+        if isinstance(expression, list):
+            return ("list",) + tuple(_freeze(item) for item in expression)
+        return ("value", _freeze_value(expression))
+
+    return _freeze(conditions), logic
+
+
+def _query_columns(conditions) -> list | None:
+    """条件引用的列名；无法解析（如条件中直接传入掩码）时返回 None，表示可能依赖任意列"""
+    if conditions is None:
+        return []
+    try:
+        return _condition_columns(conditions)
+    except (TypeError, ValueError):
+        return None
+
+
+def _union_columns(column_lists) -> list | None:
+    """合并多组列名（保持首次出现的顺序），其中任意一组为 None 时返回 None"""
+    merged: list = []
+    for columns in column_lists:
+        if columns is None:
+            return None
+        merged.extend(column for column in columns if column not in merged)
+    return merged
+
+
+def _buffer_owner(array: np.ndarray) -> np.ndarray:
+    """数据缓冲区的最终持有者：视图沿 base 向上查找到最外层的 numpy 数组"""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _column_token(series: pd.Series, strict: bool = False) -> tuple:
+    """
+    列的版本标记：类型、长度、底层数据缓冲区地址及其持有者的弱引用，不读取数据，开销与行数无关。
+
+    整列替换、类型变化都会改变标记（旧缓冲区被释放后弱引用失效，地址被复用也不会误判）；
+    strict 为 True 时额外比较抽样行的取值，可以检测到抽样行上的原地修改。
+    """
+    values = series.array
+    buffers = [getattr(values, name, None) for name in ("_ndarray", "_data", "_mask")]
+    refs = tuple(
+        (buffer.__array_interface__["data"][0], weakref.ref(_buffer_owner(buffer)))
+        for buffer in buffers if isinstance(buffer, np.ndarray)
+    ) or (weakref.ref(values),)
+    token = (series.dtype, len(series), refs)
+    if strict:
+        length = len(series)
+        sample_rows = min(length, _FINGERPRINT_SAMPLE_ROWS)
+        positions = np.unique(np.linspace(0, length - 1, sample_rows).astype(np.int64)) if sample_rows else []
+        token += (hash(repr(series.iloc[positions].to_numpy(dtype=object).tolist())),)
+    return token
+
+
+def _row_mask(mask: PackedMask | pd.Series) -> np.ndarray | pd.Series:
+    """缓存的掩码用于取行时还原为布尔数组"""
+    return mask.to_numpy() if isinstance(mask, PackedMask) else mask
+
+
+def _append_mask(mask: PackedMask | pd.Series, new: PackedMask | pd.Series, index: pd.Index) -> PackedMask | pd.Series:
+    """将新批次的掩码追加到缓存的掩码末尾（index 为追加后 DataFrame 的索引）"""
+    if isinstance(mask, PackedMask):
+        return mask.append(new, index=index)
+    if isinstance(new, PackedMask):
+        new = new.to_series()
+    return pd.concat([mask, new])
+
+
+def _merge_counts(old: pd.Series, new: pd.Series) -> pd.Series:
+    """合并两个批次的 value_counts 计数：已有的值保持原顺序，新出现的值按出现顺序追加在后面"""
+    added = new.index[~new.index.isin(old.index)]
+    index = old.index.append(added) if len(added) else old.index
+    return old.reindex(index, fill_value=0) + new.reindex(index, fill_value=0)
+
 
 class DataFrameStatistics:
     """
@@ -15,35 +151,401 @@ class DataFrameStatistics:
     1. 缓存基础掩码，避免重复创建pd.Series([True] * len(df))
     2. 复用相同DataFrame的索引，减少内存分配
     3. 提供批量统计功能，减少函数调用开销
+    4. 复用查询计划器，多次查询时不再重复抽样估算条件选择率
+    5. 按条件缓存掩码（LRU），相同条件的 count / value_counts / group_agg 不再重复求值；
+       缓存的布尔掩码按位压缩存储（PackedMask），内存约为布尔 Series 的 1/8，count 直接按位统计
+    6. 可选的列索引（create_index）：倒排索引按匹配行取位置回答 ==、!=、in、not in，
+       有序索引用 searchsorted 回答 >、>=、<、<=，count 直接由各值行数或排序区间得到
+    7. 可选的多进程求值（parallel）：缓存未命中且无法由索引回答时，按行分区在多个进程中构建掩码
+    8. 追加数据（append）：缓存的掩码和登记的统计查询（maintain）只在新增的行上求值后合并，
+       新增的行暂存为批次，首次需要全部行时才拼接，每批的计算量与批次大小有关，与总行数无关
+
+    每次查询前只校验该查询引用的列：增删行列、替换索引时清空全部缓存；
+    某列被整列替换或类型变化（按列的数据缓冲区地址、长度和类型判断，不读取数据）时，只清除依赖该列的缓存。
+    原地修改少数行（如 df.loc[1, "dept"] = "Ops"）不会改变缓冲区，默认无法检测，修改数据后请调用 invalidate()，
+    或启用 strict_check 额外比较抽样行的取值。
     """
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cache_size: int = 128, parallel: int | None = None,
+                 strict_check: bool = False):
         """
         初始化统计分析器
 
         参数：
         - df (pd.DataFrame): 要统计的DataFrame
+        - cache_size (int): 最多缓存的条件掩码数量，默认 128；为 0 时不缓存
+        - parallel (int): 构建掩码的进程数，-1 表示使用全部 CPU 核心，默认为None（串行）；
+            行数少于 200000 时仍串行求值
+        - strict_check (bool): 校验缓存时是否额外比较查询列上 32 行抽样的取值，默认 False；
+            可以检测到抽样行上的原地修改，但每次查询都需要读取抽样行
         """
-        self._df = df
+        if cache_size < 0:
+            raise ValueError(f"cache_size 不能为负数，当前值: {cache_size}")
+        _resolve_workers(parallel)  # 提前校验参数
+        self._parallel = parallel
+        self._strict_check = strict_check
+        # append 的批次先暂存在 _chunks 中，首次需要全部行时才拼接到 _frame（见 _df）
+        self._frame = df
+        self._chunks: list = []
         self._index = df.index
         self._length = len(df)
 
-        # 缓存基础掩码，避免重复创建
-        self._true_mask = None
-        self._false_mask = None
+        # 缓存基础掩码（全True、全False），首次使用时创建，避免重复创建
+        self._base_masks = None
+        self._planner = ConditionPlanner()
+
+        # 条件掩码缓存：键为规范化后的 (条件, logic)，按最近使用顺序淘汰
+        self._cache_size = cache_size
+        self._mask_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        # 列索引：create_index 登记的 (列名, 索引类型)，索引在首次使用时构建，数据变化后重新构建
+        self._indexed_columns: list = []
+        self._column_indexes: dict = {}
+
+        # 缓存键对应的原始条件（append 时在新增行上重新求值）、引用的列，以及 maintain 登记的统计查询
+        self._cache_conditions: dict = {}
+        self._cache_columns: dict = {}
+        self._maintained: dict = {}
+        # 版本标记：行数、索引和列名对象决定整体是否变化，各列的标记在查询引用该列时登记和比较
+        self._frame_token = (len(df), df.index, df.columns)
+        self._column_tokens: dict = {}
         self._reset_base_masks()
 
 
+    @property
+    def _df(self) -> pd.DataFrame:
+        """统计的全部行：有 append 暂存的批次时先拼接（只在首次需要全部行时发生一次）"""
+        if self._chunks:
+            self._materialize()
+        return self._frame
+
+    def _materialize(self) -> None:
+        """将暂存的批次拼接到末尾；拼接前后数据相同，缓存保持有效，只把版本标记更新为拼接后的结果"""
+        combined = pd.concat([self._frame, *self._chunks])
+        self._chunks = []
+        self._frame = combined
+        self._index = combined.index
+        self._base_masks = None
+        self._frame_token = (len(combined), combined.index, combined.columns)
+        for column in list(self._column_tokens):
+            self._column_tokens[column] = _column_token(combined[column], self._strict_check)
+
+    @property
+    def _true_mask(self) -> pd.Series:
+        return self._get_base_masks()[0]
+
+    @property
+    def _false_mask(self) -> pd.Series:
+        return self._get_base_masks()[1]
+
+    def _get_base_masks(self) -> tuple[pd.Series, pd.Series]:
+        df = self._df
+        if self._base_masks is None:
+            self._base_masks = (
+                pd.Series(np.ones(len(df), dtype=bool), index=df.index),
+                pd.Series(np.zeros(len(df), dtype=bool), index=df.index),
+            )
+        return self._base_masks
+
     # 重置 true_mask 和 false_mask
     def _reset_base_masks(self):
-        """重置基础掩码为全True和全False"""
-        self._true_mask = pd.Series([True] * len(self._df), index=self._df.index)
-        self._false_mask = pd.Series([False] * len(self._df), index=self._df.index)
+        """重置基础掩码为全True和全False（下次使用时重新创建）"""
+        self._base_masks = None
+        self._planner.clear_cache()
+        with self._cache_lock:
+            self._mask_cache.clear()
+            self._cache_conditions.clear()
+            self._cache_columns.clear()
+            self._column_indexes.clear()
+            self._column_tokens.clear()
+        # 数据被原地修改或替换后，登记的统计查询在全部行上重新计算
+        for query in self._maintained.values():
+            query["state"] = self._query_state(self._df, None, query)
 
-    def _ensure_masks_valid(self):
-        """如果 DataFrame 发生变化，重新生成基础掩码"""
-        if self._true_mask is not None and len(self._true_mask) != len(self._df):
+    def _ensure_masks_valid(self, columns: list | None = None):
+        """
+        校验缓存是否仍然有效：行数、索引或列名变化时重新生成基础掩码并清空全部缓存；
+        否则只比较 columns 中各列的版本标记，清除依赖已变化列的缓存
+
+        参数：
+        - columns (list)：本次查询引用的列，默认为None（校验全部列）
+
+        append 暂存的批次不参与校验（由 append 复制，外部无法修改），校验不会触发拼接
+        """
+        df = self._frame
+        length, index, df_columns = self._frame_token
+        if len(df) != length or df.index is not index or df.columns is not df_columns:
+            self._frame_token = (len(df), df.index, df.columns)
+            self._length = len(df)
             self._reset_base_masks()
+            # 继续登记本次查询引用列的版本标记，之后整列替换仍可检测
+
+        changed = set()
+        for column in (df.columns if columns is None else columns):
+            if column not in df.columns:
+                continue  # 由查询本身报告缺失的列
+            token = _column_token(df[column], self._strict_check)
+            previous = self._column_tokens.get(column)
+            if previous is not None and previous != token:
+                changed.add(column)
+            self._column_tokens[column] = token
+        if changed:
+            self._invalidate_columns(changed)
+
+    def _invalidate_columns(self, changed: set) -> None:
+        """清除依赖已变化列的掩码缓存、列索引和计划器估算，并重新计算引用这些列的 maintain 查询"""
+        with self._cache_lock:
+            for key, columns in list(self._cache_columns.items()):
+                if columns is None or changed.intersection(columns):
+                    self._mask_cache.pop(key, None)
+                    self._cache_conditions.pop(key, None)
+                    del self._cache_columns[key]
+            for spec in list(self._column_indexes):
+                if spec[0] in changed:
+                    del self._column_indexes[spec]
+        self._planner.clear_cache()
+        for query in self._maintained.values():
+            if query["columns"] is None or changed.intersection(query["columns"]):
+                query["state"] = self._query_state(self._df, None, query)
+
+    def invalidate(self) -> None:
+        """清空掩码缓存和计划器缓存（原地修改了 DataFrame 的少数行后调用）"""
+        self._frame_token = (len(self._df), self._df.index, self._df.columns)
+        self._length = len(self._df)
+        self._reset_base_masks()
+
+    def cache_info(self) -> dict[str, int]:
+        """返回掩码缓存的命中次数、未命中次数、当前大小和容量"""
+        with self._cache_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._mask_cache),
+                "max_size": self._cache_size,
+            }
+
+    def create_index(self, *columns, kind: Literal["value", "sorted"] = "value") -> None:
+        """
+        为指定列建立索引
+
+        参数：
+        - columns：列名
+        - kind (str)：索引类型，默认为 "value"
+            - "value"：倒排索引（值 → 行位置），适用于被反复按 ==、!=、in、not in 过滤的低基数列
+            - "sorted"：有序索引（稳定排序后的行位置），适用于数值/日期时间列上的 >、>=、<、<= 范围条件
+
+        异常：
+        - TypeError：列类型不支持，或列中包含不可哈希的值
+        """
+        if kind not in _INDEX_TYPES:
+            raise ValueError(f"kind 参数必须是 'value' 或 'sorted'，当前值: {kind}")
+        self._ensure_masks_valid(list(columns))
+        for column in columns:
+            index = _INDEX_TYPES[kind](self._df[column])
+            with self._cache_lock:
+                self._column_indexes[(column, kind)] = index
+                if (column, kind) not in self._indexed_columns:
+                    self._indexed_columns.append((column, kind))
+
+    def drop_index(self, *columns, kind: Literal["value", "sorted"] | None = None) -> None:
+        """删除指定列的索引（kind 为 None 时删除两种索引），不传列名时删除全部"""
+        with self._cache_lock:
+            for spec in list(self._indexed_columns):
+                if (not columns or spec[0] in columns) and (kind is None or spec[1] == kind):
+                    self._indexed_columns.remove(spec)
+                    self._column_indexes.pop(spec, None)
+
+    def _column_index(self, column, kind: str) -> ColumnIndex | SortedIndex | None:
+        """返回列的索引（未建立该类型的索引时返回 None），数据变化后在此重新构建"""
+        if (column, kind) not in self._indexed_columns:
+            return None
+        with self._cache_lock:
+            index = self._column_indexes.get((column, kind))
+        if index is None:
+            index = _INDEX_TYPES[kind](self._df[column])
+            with self._cache_lock:
+                self._column_indexes[(column, kind)] = index
+        return index
+
+    def _string_dictionary(self, column) -> ColumnIndex | None:
+        """
+        字符串匹配条件使用的列字典：未建立倒排索引的低基数 object / 字符串 / 分类列自动 factorize 一次并缓存，
+        数据变化后重新构建；高基数或不支持的列返回 None
+        """
+        with self._cache_lock:
+            index = self._column_indexes.get((column, "dictionary"))
+        if index is None:
+            series = self._df[column]
+            index = False
+            if isinstance(series, pd.Series) and (
+                isinstance(series.dtype, pd.CategoricalDtype) or _is_low_cardinality(series)
+            ):
+                try:
+                    index = ColumnIndex(series)
+                except TypeError:
+                    pass
+            with self._cache_lock:
+                self._column_indexes[(column, "dictionary")] = index
+        return index or None
+
+    def _index_conditions(self, conditions, logic: str) -> tuple[list, list] | None:
+        """
+        将条件元组或条件列表拆分为 ([(索引, 运算符, 值), ...], [其余条件, ...])：
+        前者可由索引回答；or 条件必须全部可由索引回答。没有可由索引回答的条件时返回 None
+        """
+        if isinstance(conditions, tuple):
+            conditions = [conditions]
+        elif not isinstance(conditions, list) or not conditions or logic not in ("and", "or"):
+            return None
+
+        resolved, remaining = [], []
+        for condition in conditions:
+            if not isinstance(condition, tuple):
+                return None
+            column, op, value = _normalize_condition(condition)
+            index = None
+            if op in INDEX_OPS:
+                index = self._column_index(column, "value")
+                if index is None and op in STRING_OPS:
+                    index = self._string_dictionary(column)
+            elif op in RANGE_OPS:
+                index = self._column_index(column, "sorted")
+            if index is None:
+                if logic == "or":
+                    return None
+                remaining.append(condition)
+            else:
+                resolved.append((index, op, value))
+        return (resolved, remaining) if resolved else None
+
+    @staticmethod
+    def _merge_ranges(resolved: list) -> list | None:
+        """and 条件中同一有序索引上的范围条件合并为一个区间：返回 [(索引, (start, stop)) 或 (索引, 运算符, 值)]"""
+        merged, bounds = [], {}
+        for index, op, value in resolved:
+            if not isinstance(index, SortedIndex):
+                merged.append((index, op, value))
+                continue
+            current = index.bounds(op, value)
+            if current is None:
+                return None
+            if id(index) in bounds:
+                start, stop = bounds[id(index)][1]
+                bounds[id(index)] = (index, (max(start, current[0]), min(stop, current[1])))
+            else:
+                bounds[id(index)] = (index, current)
+        return merged + list(bounds.values())
+
+    def _index_positions(self, conditions, logic: str) -> np.ndarray | None:
+        """
+        条件可由索引回答时，返回满足条件的行位置（升序），否则返回 None；
+        and 条件中只有部分可由索引回答时，其余条件只在索引匹配的行上求值（空值结果视为 False）
+        """
+        split = self._index_conditions(conditions, logic)
+        if split is None:
+            return None
+        resolved, remaining = split
+        if logic == "and":
+            resolved = self._merge_ranges(resolved)
+            if resolved is None:
+                return None
+
+        result = None
+        for item in resolved:
+            if len(item) == 2:
+                positions = item[0].positions_between(*item[1])
+            else:
+                positions = item[0].positions(item[1], item[2])
+            if positions is None:
+                return None
+            if result is None:
+                result = positions
+            elif logic == "and":
+                result = np.intersect1d(result, positions, assume_unique=True)
+            else:
+                result = np.union1d(result, positions)
+
+        if remaining and result is not None and result.size:
+            result = result[_evaluate(self._df, {"and": remaining}, result)]
+        return result
+
+    def _index_count(self, conditions, logic: str) -> int | None:
+        """
+        不构建掩码直接计数：单个条件由索引的各值行数或排序区间得到；
+        and 条件均为同一有序索引上的范围条件（如时间窗口）时，由合并后的区间长度得到
+        """
+        split = self._index_conditions(conditions, logic)
+        if split is None or split[1]:
+            return None
+        resolved = split[0]
+        if len(resolved) == 1:
+            index, op, value = resolved[0]
+            return index.count(op, value)
+        if logic == "and" and all(item[0] is resolved[0][0] for item in resolved):
+            merged = self._merge_ranges(resolved)
+            if merged is not None and len(merged) == 1 and len(merged[0]) == 2:
+                start, stop = merged[0][1]
+                return max(0, stop - start)
+        return None
+
+    def _cached_mask(self, conditions, logic: str) -> PackedMask | pd.Series:
+        """
+        返回条件的掩码（优先从缓存读取）：numpy 布尔掩码压缩为 PackedMask，
+        可空布尔等其他结果保持 Series 原样缓存；调用方不得原地修改返回值
+        """
+        try:
+            key = _condition_key(conditions, logic)
+        except TypeError:
+            key = None  # 无法规范化的条件不缓存，交给掩码构建函数报错或求值
+
+        if key is not None and self._cache_size:
+            with self._cache_lock:
+                mask = self._mask_cache.get(key)
+                if mask is not None:
+                    self._mask_cache.move_to_end(key)
+                    self._hits += 1
+                    return mask
+                self._misses += 1
+
+        positions = self._index_positions(conditions, logic)
+        if positions is not None:
+            values = np.zeros(len(self._df), dtype=bool)
+            values[positions] = True
+            mask = PackedMask.from_mask(values, index=self._df.index)
+        elif (values := parallel_mask(self._df, conditions, logic, self._parallel)) is not None:
+            mask = PackedMask.from_mask(values, index=self._df.index)
+        else:
+            if isinstance(conditions, tuple):
+                mask = _original_build_single_mask(self._df, conditions)
+            else:
+                mask = _original_build_base_mask(
+                    self._df, conditions, logic, self._true_mask, self._false_mask, planner=self._planner
+                )
+            if mask.dtype == np.bool_:
+                mask = PackedMask.from_mask(mask)
+
+        if key is not None and self._cache_size:
+            with self._cache_lock:
+                self._mask_cache[key] = mask
+                self._cache_conditions[key] = (copy.deepcopy(conditions), logic)
+                self._cache_columns[key] = _query_columns(conditions)
+                self._mask_cache.move_to_end(key)
+                while len(self._mask_cache) > self._cache_size:
+                    evicted, _ = self._mask_cache.popitem(last=False)
+                    self._cache_conditions.pop(evicted, None)
+                    self._cache_columns.pop(evicted, None)
+        return mask
+
+    def _evaluate_mask(self, frame: pd.DataFrame, conditions, logic: str) -> PackedMask | pd.Series:
+        """在指定的 DataFrame（如新追加的行）上求值条件，不使用缓存和索引"""
+        if isinstance(conditions, tuple):
+            mask = _original_build_single_mask(frame, conditions)
+        else:
+            mask = _original_build_base_mask(frame, conditions, logic)
+        return PackedMask.from_mask(mask) if mask.dtype == np.bool_ else mask
 
     def combine_masks(self, masks: list[pd.Series], logic: str = "and") -> pd.Series:
         """
@@ -52,28 +554,63 @@ class DataFrameStatistics:
         return combine_masks(masks, logic)
 
 
-    def build_base_mask(self, conditions: list[tuple], logic: str = "and",
+    def build_base_mask(self, conditions: list[tuple] | dict, logic: str = "and",
                        true_mask: pd.Series | None = None,
                        false_mask: pd.Series | None = None) -> pd.Series:
         """
         构建基础查询条件掩码，自动使用内部掩码参数
         
         参数：
-        - conditions (List[Tuple])：条件列表，每个元组包含(列名, 运算符, 值)
+        - conditions (List[Tuple] | Dict)：条件列表，每个元组包含(列名, 运算符, 值)；支持嵌套分组表达式
         - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
         - true_mask (pd.Series)：初始True掩码，默认为None（使用内部缓存）
         - false_mask (pd.Series)：初始False掩码，默认为None（使用内部缓存）
 
         返回：
-        - pd.Series：布尔掩码，True表示符合条件的行
+        - pd.Series：布尔掩码，True表示符合条件的行（未提供外部掩码时返回缓存掩码的副本）
         """
-        self._ensure_masks_valid()
+        self._ensure_masks_valid(_query_columns(conditions))
+        if true_mask is None and false_mask is None:
+            mask = self._cached_mask(conditions, logic)
+            return mask.to_series() if isinstance(mask, PackedMask) else mask.copy()
         # 如果没有提供外部掩码，使用内部缓存的掩码
         if true_mask is None:
             true_mask = self._true_mask
         if false_mask is None:
             false_mask = self._false_mask
-        return _original_build_base_mask(self._df, conditions, logic, true_mask, false_mask)
+        return _original_build_base_mask(
+            self._df, conditions, logic, true_mask, false_mask, planner=self._planner
+        )
+
+
+    def build_packed_mask(self, conditions: tuple | list[tuple] | dict, logic: str = "and") -> PackedMask:
+        """
+        构建按位压缩的条件掩码，可用 &、|、~ 组合后再 count() 或还原为 Series
+
+        参数：
+        - conditions (Union[Tuple, List[Tuple], Dict])：条件元组、条件列表或嵌套表达式
+        - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+
+        返回：
+        - PackedMask：压缩掩码（可空布尔结果中的 NA 视为 False）
+        """
+        self._ensure_masks_valid(_query_columns(conditions))
+        mask = self._cached_mask(conditions, logic)
+        return mask if isinstance(mask, PackedMask) else PackedMask.from_mask(mask)
+
+
+    def explain(self, conditions: list[tuple] | dict, logic: str = "and") -> str:
+        """
+        返回条件的执行计划说明（调整后的求值顺序、估算成本与选择率）
+
+        参数：
+        - conditions (List[Tuple] | Dict)：条件列表或嵌套表达式
+        - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+
+        返回：
+        - str：执行计划文本
+        """
+        return self._planner.plan(self._df, conditions, logic).explain()
 
 
     def build_single_mask(self, condition: tuple) -> pd.Series:
@@ -91,14 +628,14 @@ class DataFrameStatistics:
         return _original_build_single_mask(self._df, condition)
 
 
-    def count(self, conditions: tuple | list[tuple], logic: str = "and",
+    def count(self, conditions: tuple | list[tuple] | dict, logic: str = "and",
              true_mask: pd.Series | None = None,
              false_mask: pd.Series | None = None) -> int:
         """
         统计DataFrame中符合条件的非空值数量，自动使用内部掩码参数
 
         参数：
-        - conditions (Union[Tuple, List[Tuple]])：符合条件的表达式
+        - conditions (Union[Tuple, List[Tuple], Dict])：符合条件的表达式（支持嵌套分组表达式）
         - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
         - true_mask (pd.Series)：初始True掩码，默认为None（使用内部缓存）
         - false_mask (pd.Series)：初始False掩码，默认为None（使用内部缓存）
@@ -106,13 +643,20 @@ class DataFrameStatistics:
         返回：
         - int：符合条件的数量
         """
-        self._ensure_masks_valid()
+        self._ensure_masks_valid(_query_columns(conditions))
+        if true_mask is None and false_mask is None:
+            # 可由索引的各值行数或排序区间直接得到时，无需构建掩码
+            matched = self._index_count(conditions, logic)
+            if matched is not None:
+                return matched
+            mask = self._cached_mask(conditions, logic)
+            return mask.count() if isinstance(mask, PackedMask) else int(mask.sum())
         # 如果没有提供外部掩码，使用内部缓存的掩码
         if true_mask is None:
             true_mask = self._true_mask
         if false_mask is None:
             false_mask = self._false_mask
-        return _original_count(self._df, conditions, logic, true_mask, false_mask)
+        return _original_count(self._df, conditions, logic, true_mask, false_mask, self._planner)
 
 
     def value_counts(
@@ -121,7 +665,7 @@ class DataFrameStatistics:
         mode: str = "count",
         sort: str | None = None,
         dropna: bool = True,
-        conditions: tuple | list[tuple] | None = None,
+        conditions: tuple | list[tuple] | dict | None = None,
         logic: str = "and",
         true_mask: pd.Series | None = None,
         false_mask: pd.Series | None = None,
@@ -136,7 +680,7 @@ class DataFrameStatistics:
         - sort (Optional[str])：排序方式，"asc" 表示升序，"desc" 表示降序，
             默认为None表示不排序
         - dropna (bool)：是否排除空值，默认为True
-        - conditions (Optional[Union[Tuple, List[Tuple]]])：可选的过滤条件
+        - conditions (Optional[Union[Tuple, List[Tuple], Dict]])：可选的过滤条件（支持嵌套表达式）
         - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
         - true_mask (pd.Series)：初始True掩码，默认为None（使用内部缓存）
         - false_mask (pd.Series)：初始False掩码，默认为None（使用内部缓存）
@@ -158,7 +702,12 @@ class DataFrameStatistics:
             >>> stats.value_counts("status", conditions=[("age", ">", 18)])
             {'active': 120, 'inactive': 30}
         """
-        self._ensure_masks_valid()
+        self._ensure_masks_valid(_query_columns(conditions))
+        if conditions is not None and true_mask is None and false_mask is None:
+            mask = self._cached_mask(conditions, logic)
+            return _original_value_counts(
+                self._df[_row_mask(mask)], column, mode, sort, dropna, return_type=return_type
+            )
         # 如果没有提供外部掩码，使用内部缓存的掩码
         if true_mask is None:
             true_mask = self._true_mask
@@ -166,41 +715,44 @@ class DataFrameStatistics:
             false_mask = self._false_mask
         return _original_value_counts(
             self._df, column, mode, sort, dropna,
-            conditions, logic, true_mask, false_mask, return_type
+            conditions, logic, true_mask, false_mask, return_type, self._planner
         )
 
 
     def group_agg(
         self,
-        group_col: str,
-        agg_col: str,
-        agg_func: str = "sum",
+        group_col: str | list[str],
+        agg_col: str | list[str] | None = None,
+        agg_func: str | list[str] = "sum",
         sort: str | None = None,
-        conditions: tuple | list[tuple] | None = None,
+        conditions: tuple | list[tuple] | dict | None = None,
         logic: str = "and",
         true_mask: pd.Series | None = None,
         false_mask: pd.Series | None = None,
-        return_type: Literal["dict", "df", "series"] = "dict"
-    ) -> dict[Any, int | float] | pd.DataFrame | pd.Series:
+        return_type: Literal["dict", "df", "series"] = "dict",
+        aggs: dict[str, tuple[str, str]] | None = None,
+    ) -> dict[Any, Any] | pd.DataFrame | pd.Series:
         """
         按指定列分组，对另一列进行聚合统计，自动使用内部掩码参数
 
         参数：
-        - group_col (str)：分组列名（如A列）
-        - agg_col (str)：聚合列名（如B列）
-        - agg_func (str)：聚合函数，支持 "sum"、"mean"、"max"、"min"、"count"、"median"、"std"、"var"，
-            默认为 "sum"
+        - group_col (Union[str, List[str]])：分组列名（如A列），可以是多列
+        - agg_col (Union[str, List[str]])：聚合列名（如B列），可以是多列
+        - agg_func (Union[str, List[str]])：聚合函数，支持 "sum"、"mean"、"max"、"min"、"count"、"median"、"std"、"var"，
+            默认为 "sum"；可以是多个函数
         - sort (Optional[str])：排序方式，"asc" 表示升序，"desc" 表示降序，
             默认为None表示按分组列的原始顺序
-        - conditions (Optional[Union[Tuple, List[Tuple]]])：可选的过滤条件
+        - conditions (Optional[Union[Tuple, List[Tuple], Dict]])：可选的过滤条件（支持嵌套表达式）
         - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
         - true_mask (pd.Series)：初始True掩码，默认为None（使用内部缓存）
         - false_mask (pd.Series)：初始False掩码，默认为None（使用内部缓存）
         - return_type (str)：返回类型，支持 "dict"（字典）、"df"（DataFrame）和 "series"（Series），
             默认为 "dict"。
+        - aggs (Dict[str, Tuple[str, str]])：命名聚合 {输出名: (聚合列, 聚合函数)}，与 agg_col 二选一
 
         返回：
-        - Union[Dict[Any, Union[int, float]], pd.DataFrame, pd.Series]：以分组值为键，聚合结果为值的字典、DataFrame或Series
+        - Union[Dict[Any, Union[int, float]], pd.DataFrame, pd.Series]：以分组值为键，聚合结果为值的字典、DataFrame或Series；
+            多个聚合时的格式见 pd_group_agg
 
         示例：
             >>> stats.group_agg("category", "amount", "sum")
@@ -210,7 +762,13 @@ class DataFrameStatistics:
             >>> stats.group_agg("category", "amount", "sum", sort="desc")
             {'B': 2000, 'C': 1500, 'A': 1000}
         """
-        self._ensure_masks_valid()
+        self._ensure_masks_valid(_query_columns(conditions))
+        if conditions is not None and true_mask is None and false_mask is None:
+            mask = self._cached_mask(conditions, logic)
+            return _original_group_agg(
+                self._df[_row_mask(mask)], group_col, agg_col, agg_func, sort,
+                return_type=return_type, aggs=aggs
+            )
         # 如果没有提供外部掩码，使用内部缓存的掩码
         if true_mask is None:
             true_mask = self._true_mask
@@ -218,10 +776,429 @@ class DataFrameStatistics:
             false_mask = self._false_mask
         return _original_group_agg(
             self._df, group_col, agg_col, agg_func, sort,
-            conditions, logic, true_mask, false_mask, return_type
+            conditions, logic, true_mask, false_mask, return_type, self._planner, aggs
         )
 
 
+    def run_batch(self, queries: Mapping[Any, dict] | list[dict]) -> dict[Any, Any]:
+        """
+        批量执行多个统计查询，一次性完成：
+
+        - 相同的过滤条件只构建一次掩码（同时写入掩码缓存）
+        - 相同过滤条件的 value_counts / group_agg 共用同一份筛选结果（只取用到的列）
+        - 相同过滤条件、相同分组列的 group_agg 合并为一次 groupby 多列聚合
+
+        参数：
+        - queries：查询字典 {查询ID: 查询配置}，或查询配置列表（查询ID 取配置中的 "id"，缺省为列表下标）。
+            查询配置为字典，"type" 指定查询类型，其余键与对应方法的参数相同（不支持 true_mask/false_mask）：
+            - {"type": "count", "conditions": ..., "logic": "and"}
+            - {"type": "value_counts", "column": ..., "mode", "sort", "dropna", "conditions", "logic", "return_type"}
+            - {"type": "group_agg", "group_col": ..., "agg_col"/"aggs", "agg_func", "sort", "conditions", "logic", "return_type"}
+              （group_col、agg_col、agg_func 可以是列表，与 group_agg 相同）
+
+        返回：
+        - Dict[Any, Any]：以查询ID为键、查询结果为值的字典，结果与单独调用对应方法一致
+
+        示例：
+            >>> stats.run_batch({
+            ...     "adults": {"type": "count", "conditions": [("age", ">=", 18)]},
+            ...     "by_dept": {"type": "value_counts", "column": "dept", "conditions": [("age", ">=", 18)]},
+            ...     "salary": {"type": "group_agg", "group_col": "dept", "agg_col": "salary",
+            ...                "agg_func": "mean", "conditions": [("age", ">=", 18)]},
+            ... })
+            {'adults': 120, 'by_dept': {'IT': 70, 'HR': 50}, 'salary': {'HR': 5200.0, 'IT': 8100.0}}
+        """
+        if isinstance(queries, Mapping):
+            items = list(queries.items())
+        else:
+            items = [(spec.get("id", position), spec) for position, spec in enumerate(queries)]
+
+        # 1. 解析查询配置，按过滤条件分组
+        parsed = []
+        for query_id, spec in items:
+            spec = dict(spec)
+            query_type = spec.pop("type", None)
+            spec.pop("id", None)
+            if query_type not in ("count", "value_counts", "group_agg"):
+                raise ValueError(
+                    f"查询 {query_id!r} 的类型不支持: {query_type!r}，支持 'count'、'value_counts' 或 'group_agg'"
+                )
+            conditions = spec.pop("conditions", None)
+            logic = spec.pop("logic", "and")
+            if query_type == "count" and conditions is None:
+                raise ValueError(f"查询 {query_id!r} 缺少 conditions 参数")
+            if query_type == "value_counts" and "column" not in spec:
+                raise ValueError(f"查询 {query_id!r} 缺少 column 参数")
+            if query_type == "group_agg":
+                # 与 group_agg 相同的规范化：{输出名: (聚合列, 聚合函数)}
+                if "group_col" not in spec:
+                    raise ValueError(f"查询 {query_id!r} 缺少 group_col 参数")
+                agg_col, agg_func, aggs = spec.get("agg_col"), spec.get("agg_func", "sum"), spec.get("aggs")
+                named = _named_aggs(agg_col, agg_func, aggs)
+                if spec.get("sort") not in (None, "asc", "desc"):
+                    raise ValueError(f"sort 参数必须是 'asc'、'desc' 或 None，当前值: {spec['sort']}")
+                single = aggs is None and len(named) == 1 and not isinstance(agg_col, (list, tuple)) \
+                    and not isinstance(agg_func, (list, tuple))
+                if not single and spec.get("return_type", "dict") == "series":
+                    raise ValueError("多个聚合结果不支持 return_type='series'，请使用 'dict' 或 'df'")
+                spec.update(named=named, single=single)
+            key = None if conditions is None else _condition_key(conditions, logic)
+            parsed.append((query_id, query_type, key, conditions, logic, spec))
+        self._ensure_masks_valid(_union_columns(_query_columns(item[3]) for item in parsed))
+
+        # 2. 每个不同的过滤条件只构建一次掩码
+        masks: dict = {}
+        for _, _, key, conditions, logic, _ in parsed:
+            if key is not None and key not in masks:
+                masks[key] = self._cached_mask(conditions, logic)
+
+        # 3. 相同过滤条件共用筛选结果，只保留查询用到的列
+        needed_columns: dict = {}
+        for _, query_type, key, _, _, spec in parsed:
+            if query_type == "value_counts":
+                needed_columns.setdefault(key, []).append(spec["column"])
+            elif query_type == "group_agg":
+                group_col = spec["group_col"]
+                group_keys = list(group_col) if isinstance(group_col, (list, tuple)) else [group_col]
+                needed_columns.setdefault(key, []).extend(group_keys + [col for col, _ in spec["named"].values()])
+        subsets = {}
+        for key, columns in needed_columns.items():
+            columns = list(dict.fromkeys(columns))
+            if key is None:
+                subsets[key] = self._df[columns]
+            else:
+                subsets[key] = self._df.loc[_row_mask(masks[key]), columns]
+
+        # 4. 相同过滤条件、相同分组列的聚合合并为一次分组
+        grouped_results: dict = {}
+        agg_groups: dict = {}
+        for position, (_, query_type, key, _, _, spec) in enumerate(parsed):
+            if query_type == "group_agg":
+                group_col = spec["group_col"]
+                group_key = tuple(group_col) if isinstance(group_col, (list, tuple)) else group_col
+                agg_groups.setdefault((key, group_key), []).append(position)
+        for (key, _), positions in agg_groups.items():
+            # 每个 (聚合列, 聚合函数) 只计算一次，各查询按自己的输出名取用
+            internal = {}
+            for position in positions:
+                for col_func in parsed[position][5]["named"].values():
+                    internal.setdefault(col_func, f"_agg{len(internal)}")
+            frame = _aggregate(
+                subsets[key], parsed[positions[0]][5]["group_col"],
+                {name: col_func for col_func, name in internal.items()},
+            )
+            for position in positions:
+                named = parsed[position][5]["named"]
+                part = frame[[internal[col_func] for col_func in named.values()]]
+                part.columns = list(named)
+                grouped_results[position] = part
+
+        # 5. 按查询ID返回结果
+        results = {}
+        for position, (query_id, query_type, key, _, _, spec) in enumerate(parsed):
+            if query_type == "count":
+                mask = masks[key]
+                results[query_id] = mask.count() if isinstance(mask, PackedMask) else int(mask.sum())
+            elif query_type == "value_counts":
+                results[query_id] = _original_value_counts(subsets[key], **spec)
+            else:
+                results[query_id] = _format_agg_result(
+                    grouped_results[position], spec["single"], spec.get("sort"), spec.get("return_type", "dict")
+                )
+        return results
+
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """当前统计的 DataFrame（append 之后为追加了新行的 DataFrame，首次访问时拼接暂存的批次）"""
+        return self._df
+
+
+    def maintain(self, queries: Mapping[Any, dict] | list[dict]) -> None:
+        """
+        登记需要随 append 增量维护的统计查询，登记时在全部行上计算一次，
+        之后每次 append 只在新增的行上计算部分结果再合并
+
+        参数：
+        - queries：查询字典 {查询ID: 查询配置}，或查询配置列表（查询ID 取配置中的 "id"，缺省为列表下标），
+            查询配置与 run_batch 相同：
+            - {"type": "count", "conditions": ..., "logic": "and"}
+            - {"type": "value_counts", "column": ..., "mode", "sort", "dropna", "conditions", "logic", "return_type"}
+            - {"type": "group_agg", "group_col": ..., "agg_col"/"aggs", "agg_func", "sort", "conditions", "logic", "return_type"}
+              （聚合函数仅支持 "sum"、"count"、"mean"、"min"、"max"）
+
+        示例：
+            >>> stats.maintain({
+            ...     "paid": {"type": "count", "conditions": ("status", "==", "paid")},
+            ...     "by_region": {"type": "group_agg", "group_col": "region",
+            ...                   "aggs": {"total": ("amount", "sum"), "avg": ("amount", "mean")}},
+            ... })
+            >>> stats.append(batch)
+            >>> stats.maintained_results()
+            {'paid': 1250, 'by_region': {'north': {'total': 8200.0, 'avg': 41.0}, ...}}
+        """
+        if isinstance(queries, Mapping):
+            items = list(queries.items())
+        else:
+            items = [(spec.get("id", position), spec) for position, spec in enumerate(queries)]
+
+        parsed = {query_id: self._parse_maintained(query_id, spec) for query_id, spec in items}
+        self._ensure_masks_valid(_union_columns(query["columns"] for query in parsed.values()))
+        for query in parsed.values():
+            query["state"] = self._query_state(self._df, None, query)
+        self._maintained.update(parsed)
+
+    def _parse_maintained(self, query_id, spec: dict) -> dict:
+        """校验并规范化 maintain 的查询配置"""
+        spec = dict(spec)
+        query_type = spec.pop("type", None)
+        spec.pop("id", None)
+        conditions = spec.pop("conditions", None)
+        logic = spec.pop("logic", "and")
+        query = {"type": query_type, "conditions": conditions, "logic": logic}
+
+        if query_type == "count":
+            if conditions is None:
+                raise ValueError(f"查询 {query_id!r} 缺少 conditions 参数")
+        elif query_type == "value_counts":
+            if "column" not in spec:
+                raise ValueError(f"查询 {query_id!r} 缺少 column 参数")
+            if spec.get("mode", "count") not in ("count", "percent"):
+                raise ValueError(f"mode 参数必须是 'count' 或 'percent'，当前值: {spec['mode']}")
+        elif query_type == "group_agg":
+            if "group_col" not in spec:
+                raise ValueError(f"查询 {query_id!r} 缺少 group_col 参数")
+            agg_col, agg_func, aggs = spec.get("agg_col"), spec.get("agg_func", "sum"), spec.get("aggs")
+            named = _named_aggs(agg_col, agg_func, aggs)
+            for _, func in named.values():
+                if func not in _MAINTAINED_AGG_FUNCS:
+                    raise ValueError(
+                        f"查询 {query_id!r} 的聚合函数 {func!r} 无法增量维护，支持 {_MAINTAINED_AGG_FUNCS}"
+                    )
+            single = aggs is None and len(named) == 1 and not isinstance(agg_col, (list, tuple)) \
+                and not isinstance(agg_func, (list, tuple))
+            if not single and spec.get("return_type", "dict") == "series":
+                raise ValueError("多个聚合结果不支持 return_type='series'，请使用 'dict' 或 'df'")
+            # 每个 (列, 部分结果) 只维护一份，mean 由 sum / count 得到
+            parts: dict = {}
+            for col, func in named.values():
+                for part in (("sum", "count") if func == "mean" else (func,)):
+                    parts.setdefault((col, part), f"_part{len(parts)}")
+            query.update(named=named, single=single, parts=parts)
+        else:
+            raise ValueError(
+                f"查询 {query_id!r} 的类型不支持: {query_type!r}，支持 'count'、'value_counts' 或 'group_agg'"
+            )
+        if spec.get("sort") not in (None, "asc", "desc"):
+            raise ValueError(f"sort 参数必须是 'asc'、'desc' 或 None，当前值: {spec['sort']}")
+        query["spec"] = spec
+        # 查询依赖的列：这些列变化时重新计算
+        referenced = [spec["column"]] if query_type == "value_counts" else []
+        if query_type == "group_agg":
+            group_col = spec["group_col"]
+            referenced = (list(group_col) if isinstance(group_col, (list, tuple)) else [group_col]) \
+                + [col for col, _ in query["named"].values()]
+        query["columns"] = _union_columns([_query_columns(conditions), referenced])
+        return query
+
+    def _query_state(self, frame: pd.DataFrame, mask, query: dict):
+        """
+        计算查询在 frame 上的部分结果：count 为行数，value_counts 为含空值的计数，
+        group_agg 为各分组的 sum / count / min / max。mask 为 None 时使用缓存的掩码（frame 为全部行）
+        """
+        conditions = query["conditions"]
+        if conditions is not None:
+            if mask is None:
+                mask = self._cached_mask(conditions, query["logic"])
+            if query["type"] == "count":
+                return mask.count() if isinstance(mask, PackedMask) else int(mask.sum())
+            frame = frame[_row_mask(mask)]
+
+        spec = query["spec"]
+        if query["type"] == "value_counts":
+            return frame[spec["column"]].value_counts(sort=False, dropna=False)
+
+        state = _aggregate(frame, spec["group_col"], {name: col_part for col_part, name in query["parts"].items()})
+        # 统一为 64 位，避免批次合并时小整数类型溢出
+        for name in state.columns:
+            kind = state[name].dtype.kind
+            if kind in "iu":
+                state[name] = state[name].astype(np.uint64 if kind == "u" else np.int64)
+            elif kind == "f":
+                state[name] = state[name].astype(np.float64)
+        return state
+
+    @staticmethod
+    def _merge_state(query: dict, old, new):
+        """合并两个批次的部分结果"""
+        if query["type"] == "count":
+            return old + new
+        if query["type"] == "value_counts":
+            return _merge_counts(old, new)
+        if new.empty:
+            return old
+        if old.empty:
+            return new
+        how = {name: _PART_MERGE[part] for (_, part), name in query["parts"].items()}
+        return pd.concat([old, new]).groupby(
+            level=list(range(old.index.nlevels)), observed=True, sort=True
+        ).agg(how)
+
+    def _column_dtype(self, column):
+        """列在拼接全部行（含暂存的批次）后的类型，不触发拼接"""
+        parts = [self._frame[column], *(chunk[column] for chunk in self._chunks)]
+        dtypes = {part.dtype for part in parts}
+        if len(dtypes) == 1:
+            return dtypes.pop()
+        return pd.concat([part.iloc[:1] for part in parts]).dtype
+
+    @staticmethod
+    def _restore_dtype(values: pd.Series, func: str, dtype) -> pd.Series:
+        """
+        部分结果按 64 位合并，读取时转回 group_agg 在全部行上的结果类型：
+        浮点列的结果与列类型相同；整数列的 min / max 为列类型，sum 在列类型范围内时为列类型，否则保持 64 位
+        """
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "iuf" or func == "count":
+            return values
+        if dtype.kind == "f":
+            return values.astype(dtype)
+        if func == "mean":
+            return values
+        if func == "sum" and not values.empty:
+            limits = np.iinfo(dtype)
+            if values.min() < limits.min or values.max() > limits.max:
+                return values
+        return values.astype(dtype)
+
+    def _format_maintained(self, query: dict):
+        """将维护的部分结果格式化为与 count / value_counts / group_agg 相同的返回值"""
+        state, spec = query["state"], query["spec"]
+        if query["type"] == "count":
+            return state
+
+        if query["type"] == "value_counts":
+            counts = state
+            if spec.get("dropna", True):
+                counts = counts[counts.index.notna()]
+            if spec.get("mode", "count") == "percent":
+                counts = (counts / counts.sum()).rename("proportion")
+            else:
+                counts = counts.rename("count")
+            counts.index.name = spec["column"]
+            sort = spec.get("sort")
+            if sort is not None:
+                counts = counts.sort_values(ascending=sort == "asc", kind="stable")
+            return convert_series(counts, spec.get("return_type", "dict"))
+
+        parts = query["parts"]
+        columns = {}
+        for name, (col, func) in query["named"].items():
+            if func == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    columns[name] = state[parts[(col, "sum")]] / state[parts[(col, "count")]]
+            else:
+                columns[name] = state[parts[(col, func)]]
+            columns[name] = self._restore_dtype(columns[name], func, self._column_dtype(col))
+        frame = pd.DataFrame(columns, index=state.index)
+        return _format_agg_result(frame, query["single"], spec.get("sort"), spec.get("return_type", "dict"))
+
+    def maintained_results(self, *query_ids) -> dict[Any, Any]:
+        """
+        返回 maintain 登记的查询的当前结果，格式与单独调用对应方法一致
+
+        参数：
+        - query_ids：要返回的查询ID，默认为全部
+
+        返回：
+        - Dict[Any, Any]：以查询ID为键、查询结果为值的字典
+        """
+        self._ensure_masks_valid(_union_columns(query["columns"] for query in self._maintained.values()))
+        ids = query_ids or tuple(self._maintained)
+        missing = [query_id for query_id in ids if query_id not in self._maintained]
+        if missing:
+            raise KeyError(f"未登记的查询: {missing}")
+        return {query_id: self._format_maintained(self._maintained[query_id]) for query_id in ids}
+
+    def append(self, new_rows: pd.DataFrame) -> None:
+        """
+        追加新的行（仅追加的数据，如每分钟一批的事件），增量更新缓存的掩码和 maintain 登记的查询
+
+        - 新增的行作为批次暂存，不拼接已有的行；首次需要全部行时（stats.df、缓存未命中的查询、
+          value_counts / group_agg 取行等）才一次性拼接
+        - 缓存的条件掩码只在新增的行上求值后追加到末尾（已有部分按字节复制，不重新求值）
+        - count 累加、value_counts 合并计数、group_agg 合并各分组的 sum / count / min / max
+        - 列索引（create_index）在下次使用时重新构建
+
+        因此连续 append 后只读取 maintained_results() 或缓存命中的 count 时，每批的开销只与批次大小有关，
+        不随总行数增长（掩码按字节复制的部分每行 1 bit；索引不是连续的 RangeIndex 时需要拼接索引）。
+
+        参数：
+        - new_rows (pd.DataFrame)：新增的行，列必须与当前 DataFrame 相同（顺序可以不同）
+
+        说明：
+        - 追加后的数据通过 pd.concat 生成新的 DataFrame（可通过 stats.df 获取），
+          调用方持有的原 DataFrame 和 new_rows 不会改变，之后对它们的修改也不影响统计
+        """
+        if not isinstance(new_rows, pd.DataFrame):
+            raise TypeError(f"new_rows 必须是 DataFrame，当前类型: {type(new_rows).__name__}")
+        columns = self._frame.columns
+        if set(new_rows.columns) != set(columns) or not new_rows.columns.is_unique:
+            raise ValueError(
+                f"追加数据的列与当前 DataFrame 不一致：缺少 {list(columns.difference(new_rows.columns))}，"
+                f"多出 {list(new_rows.columns.difference(columns))}"
+            )
+        with self._cache_lock:
+            cached_columns = list(self._cache_columns.values())
+        self._ensure_masks_valid(_union_columns(
+            cached_columns + [query["columns"] for query in self._maintained.values()]
+        ))
+        if new_rows.empty:
+            return
+
+        batch = new_rows[list(columns)].copy(deep=False)
+        index = self._index.append(batch.index)
+
+        # 相同的条件在新增行上只求值一次；先计算全部结果，出错时保持原状态
+        batch_masks: dict = {}
+
+        def _batch_mask(conditions, logic):
+            key = _condition_key(conditions, logic)
+            if key not in batch_masks:
+                batch_masks[key] = self._evaluate_mask(batch, conditions, logic)
+            return batch_masks[key]
+
+        with self._cache_lock:
+            cached = list(self._mask_cache.items())
+            conditions_by_key = dict(self._cache_conditions)
+        masks = {
+            key: _append_mask(mask, _batch_mask(*conditions_by_key[key]), index)
+            for key, mask in cached
+        }
+        states = {}
+        for query_id, query in self._maintained.items():
+            conditions = query["conditions"]
+            mask = None if conditions is None else _batch_mask(conditions, query["logic"])
+            states[query_id] = self._merge_state(query, query["state"], self._query_state(batch, mask, query))
+
+        if not self._chunks:
+            # 首次暂存批次时改用浅复制，调用方之后修改原 DataFrame 不会影响尚未拼接的统计数据
+            self._frame = self._frame.copy(deep=False)
+            self._frame_token = (len(self._frame), self._frame.index, self._frame.columns)
+            for column in list(self._column_tokens):
+                self._column_tokens[column] = _column_token(self._frame[column], self._strict_check)
+        self._chunks.append(batch)
+        self._index = index
+        self._length = len(index)
+        self._base_masks = None
+        with self._cache_lock:
+            for key, mask in masks.items():
+                if key in self._mask_cache:
+                    self._mask_cache[key] = mask
+            self._column_indexes.clear()
+        for query_id, state in states.items():
+            self._maintained[query_id]["state"] = state
+
+
     def dataframe_info(self) -> dict[str, Any]:
         """获取DataFrame的基本信息"""
         return {
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from .mask_utils import _normalize_condition, _subset_mask
+
+
+def _parse_node(expression) -> tuple[str, object]:
+    """解析表达式节点，返回 (节点类型, 内容)，节点类型为 "leaf"、"and"、"or" 或 "not" """
+    if isinstance(expression, tuple):
+        return "leaf", expression
+
+    if isinstance(expression, dict):
+        if len(expression) != 1:
+            raise ValueError(
+                f"表达式分组只能包含一个键（'and'、'or' 或 'not'），当前为: {list(expression)}"
+            )
+        key, payload = next(iter(expression.items()))
+        if key in ("and", "or"):
+            if not isinstance(payload, list):
+                raise ValueError(f"'{key}' 分组的值必须是列表，当前为: {type(payload).__name__}")
+            return key, payload
+        if key == "not":
+            return key, payload
+        raise ValueError(f"不支持的表达式分组: {key!r}，支持 'and'、'or' 或 'not'")
+
+    raise ValueError(
+        f"不支持的表达式类型: {type(expression).__name__}，"
+        "请使用条件元组或 {'and': [...]}、{'or': [...]}、{'not': ...} 分组"
+    )
+
+
+def _condition_columns(conditions) -> list:
+    """收集条件（条件元组、条件列表或嵌套表达式）中引用的列名，按首次出现的顺序"""
+    columns: list = []
+
+    def _collect(expression) -> None:
+        kind, payload = _parse_node(expression)
+        if kind == "leaf":
+            column = _normalize_condition(payload)[0]  # pyright: ignore[reportArgumentType]
+            if column not in columns:
+                columns.append(column)
+        elif kind == "not":
+            _collect(payload)
+        else:
+            for child in payload:  # pyright: ignore[reportGeneralTypeIssues]
+                _collect(child)
+
+    for expression in conditions if isinstance(conditions, list) else [conditions]:
+        _collect(expression)
+    return columns
+
+
+def _evaluate(df: pd.DataFrame, expression, rows: np.ndarray | None) -> np.ndarray:
+    """
+    在指定行（位置索引，None 表示全部行）上求值表达式，返回与这些行等长的布尔数组
+    （结果未知的行与布尔索引筛选一致，视为 False）。
+
+    and 分组：后面的条件只在前面条件不为 False 的行上求值；
+    or 分组：后面的条件只在前面条件均不为 True 的行上求值。
+    """
+    return _evaluate_nullable(df, expression, rows)[0]
+
+
+def _evaluate_nullable(df: pd.DataFrame, expression, rows: np.ndarray | None) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    按三值逻辑求值，返回 (结果为 True 的行, 结果未知的行)，没有未知结果时后者为 None。
+
+    可空类型的条件结果中的 NA 为未知：NOT 未知仍为未知，False AND 未知为 False，True OR 未知为 True，
+    与 pandas 的 ~、&、| 一致；只在最外层把未知视为 False。
+    """
+    kind, payload = _parse_node(expression)
+
+    if kind == "leaf":
+        column, op, value = _normalize_condition(payload)  # pyright: ignore[reportArgumentType]
+        mask = _subset_mask(df[column], rows, op, value)
+        values = mask.to_numpy(dtype=bool, na_value=False)
+        if mask.dtype == np.bool_:
+            return values, None
+        unknown = mask.isna().to_numpy()
+        return values, unknown if unknown.any() else None
+
+    if kind == "not":
+        values, unknown = _evaluate_nullable(df, payload, rows)
+        result = ~values
+        if unknown is not None:
+            result &= ~unknown
+        return result, unknown
+
+    length = len(df) if rows is None else len(rows)
+    unknown: np.ndarray | None = None
+    # remaining：仍需继续求值的行（相对于 rows 的位置），None 表示全部行
+    remaining: np.ndarray | None = None
+    if kind == "and":
+        for child in payload:  # pyright: ignore[reportGeneralTypeIssues]
+            child_mask, child_unknown = _evaluate_nullable(df, child, _sub_rows(rows, remaining))
+            if child_unknown is not None:
+                if unknown is None:
+                    unknown = np.zeros(length, dtype=bool)
+                unknown[np.flatnonzero(child_unknown) if remaining is None else remaining[child_unknown]] = True
+                child_mask = child_mask | child_unknown  # 未知的行仍可能被后面的条件判为 False
+            remaining = np.flatnonzero(child_mask) if remaining is None else remaining[child_mask]
+            if remaining.size == 0:
+                break
+        if remaining is None:
+            return np.ones(length, dtype=bool), None  # 空的 and 分组恒为 True
+        result = np.zeros(length, dtype=bool)
+        result[remaining] = True
+        if unknown is None:
+            return result, None
+        unknown &= result
+        result &= ~unknown
+        return result, unknown if unknown.any() else None
+
+    result = np.zeros(length, dtype=bool)
+    for child in payload:  # pyright: ignore[reportGeneralTypeIssues]
+        child_mask, child_unknown = _evaluate_nullable(df, child, _sub_rows(rows, remaining))
+        if child_unknown is not None:
+            if unknown is None:
+                unknown = np.zeros(length, dtype=bool)
+            unknown[np.flatnonzero(child_unknown) if remaining is None else remaining[child_unknown]] = True
+        if remaining is None:
+            result |= child_mask
+            remaining = np.flatnonzero(~child_mask)
+        else:
+            result[remaining[child_mask]] = True
+            remaining = remaining[~child_mask]
+        if remaining.size == 0:
+            break
+    if unknown is None:
+        return result, None
+    unknown &= ~result
+    return result, unknown if unknown.any() else None
+
+
+def _sub_rows(rows: np.ndarray | None, remaining: np.ndarray | None) -> np.ndarray | None:
+    """将相对于 rows 的位置转换为相对于整个 DataFrame 的位置"""
+    if remaining is None:
+        return rows
+    return remaining if rows is None else rows[remaining]
+
+
+def build_expression_mask(df: pd.DataFrame, expression: dict | tuple, planner=None) -> pd.Series:
+    """
+    构建嵌套逻辑表达式的掩码，支持 AND/OR/NOT 任意嵌套，并短路求值
+
+    参数：
+    - df (pd.DataFrame)：输入的DataFrame
+    - expression：表达式，由条件元组和分组组成：
+        - 条件元组：(列名, 运算符, 值)，格式与 build_single_mask 相同
+        - {"and": [表达式, ...]}：所有子表达式均满足
+        - {"or": [表达式, ...]}：任一子表达式满足
+        - {"not": 表达式}：子表达式不满足
+    - planner (ConditionPlanner)：查询计划器，默认为None（使用新的计划器）
+
+    返回：
+    - pd.Series：布尔掩码，True表示符合条件的行
+        **注意**：and 分组中后面的条件只在仍满足前面条件的行上求值，
+        or 分组中后面的条件只在尚未匹配的行上求值。
+        求值前由 ConditionPlanner 按成本与抽样选择率调整各分组内的条件顺序，
+        代价高的条件（字符串匹配、empty 等）通常只需计算一小部分行。
+
+    示例：
+    # (age > 18 AND score >= 60) OR (status == "special" AND NOT name contains "test")
+        mask = build_expression_mask(df, {"or": [
+            {"and": [("age", ">", 18), ("score", ">=", 60)]},
+            {"and": [("status", "==", "special"), {"not": ("name", "contains", "test")}]},
+        ]})
+    """
+    # 延迟导入，避免与 planner 循环导入
+    from .planner import ConditionPlanner
+
+    if isinstance(expression, dict):
+        expression = (planner or ConditionPlanner()).plan(df, expression).expression()
+    return pd.Series(_evaluate(df, expression, None), index=df.index)
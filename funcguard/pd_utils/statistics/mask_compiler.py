@@ -0,0 +1,222 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from .mask_utils import _normalize_condition, _subset_mask
+from .planner import ConditionPlanner
+
+try:
+    import numexpr
+except ImportError:  # numexpr 为可选依赖，未安装时使用 numpy 原地运算
+    numexpr = None
+
+
+# 比较运算符对应的 numpy ufunc，均支持 out= 参数原地写入
+_COMPARE_UFUNCS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+# numexpr 支持的数值类型（不支持 uint64 等无符号类型）
+_NUMEXPR_DTYPES = {np.dtype(t) for t in ("bool", "int32", "int64", "float32", "float64")}
+
+# 少于该行数时，融合求值的收益不足以抵消额外开销
+_NUMEXPR_MIN_ROWS = 100_000
+
+
+def _is_real_scalar(value) -> bool:
+    """是否为普通数值标量（不含 bool，bool 仅用于布尔列的 ==/!=）"""
+    return isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_))
+
+
+def _numeric_values(df: pd.DataFrame, column) -> np.ndarray | None:
+    """返回 numpy 原生数值/布尔列的底层数组，其他类型（可空扩展类型、object、datetime 等）返回 None"""
+    series = df[column]
+    if not isinstance(series, pd.Series):
+        return None  # 重复列名时 df[column] 返回 DataFrame，交给原始实现处理
+    dtype = series.dtype
+    if not isinstance(dtype, np.dtype) or dtype.kind not in "biuf":
+        return None
+    return series.to_numpy(copy=False)
+
+
+class CompiledConditions:
+    """
+    编译后的条件列表：一次融合求值得到组合掩码。
+
+    - numpy 原生数值列的比较（>, >=, <, <=, ==, !=）、null/not null、in/not in
+      直接在底层数组上计算，结果通过 out= 写入预分配的缓冲区，再原地 &=/|= 合并
+    - 安装了 numexpr 且数据量较大时，多个数值比较合并为一个 numexpr 表达式一次求值
+    - 包含非数值条件时，按 ConditionPlanner 估算的顺序求值（可用 explain() 查看）；
+      非数值条件（字符串匹配、object 列、可空类型等）短路求值：
+      and 只在仍为 True 的行上计算，or 只在仍为 False 的行上计算；
+      结果为 numpy bool 时写回缓冲区，否则返回 None，由调用方回退为逐条件组合，
+      保证结果与逐条件组合完全一致
+    """
+
+    def __init__(self, conditions: list[tuple], logic: str = "and"):
+        if logic not in ("and", "or"):
+            raise ValueError(f"不支持的逻辑操作类型: {logic}，支持 'and' 或 'or'")
+        self.conditions = [_normalize_condition(condition) for condition in conditions]
+        self.logic = logic
+
+    def __call__(
+        self,
+        df: pd.DataFrame,
+        seed: pd.Series | None = None,
+        planner: ConditionPlanner | None = None,
+    ) -> pd.Series | None:
+        """
+        对 df 求值。
+
+        参数：
+        - df (pd.DataFrame)：输入的DataFrame
+        - seed (pd.Series)：初始掩码（and 时对应 true_mask，or 时对应 false_mask），默认为None
+        - planner (ConditionPlanner)：用于排序非数值条件的计划器，默认为None（使用新的计划器）
+
+        返回：
+        - pd.Series | None：组合后的布尔掩码；无法保证结果完全一致时返回 None
+        """
+        length = len(df)
+        if seed is None:
+            buffer = np.ones(length, dtype=bool) if self.logic == "and" else np.zeros(length, dtype=bool)
+        else:
+            if (
+                seed.dtype != np.bool_
+                or seed.name is not None
+                or len(seed) != length
+                or not seed.index.equals(df.index)
+            ):
+                return None
+            buffer = seed.to_numpy(dtype=bool, copy=True)
+
+        combine = np.logical_and if self.logic == "and" else np.logical_or
+        scratch = np.empty(length, dtype=bool)
+
+        pending = list(self.conditions)
+        if numexpr is not None and length >= _NUMEXPR_MIN_ROWS:
+            pending = self._evaluate_numexpr(df, pending, buffer, scratch, combine)
+
+        # 全部为数值列时求值顺序不影响成本，无需抽样排序
+        if len(pending) > 1 and any(_numeric_values(df, column) is None for column, _, _ in pending):
+            pending = (planner or ConditionPlanner()).order(df, pending, self.logic)
+
+        for column, op, value in pending:
+            condition_mask = self._evaluate_numpy(df, column, op, value, scratch)
+            if condition_mask is not None:
+                combine(buffer, condition_mask, out=buffer)
+                continue
+
+            # and 只需在仍为 True 的行上求值，or 只需在仍为 False 的行上求值
+            rows = np.flatnonzero(buffer) if self.logic == "and" else np.flatnonzero(~buffer)
+            series = df[column]
+            if not isinstance(series, pd.Series):
+                return None
+            series_mask = _subset_mask(series, rows, op, value)
+            if not isinstance(series_mask, pd.Series) or series_mask.dtype != np.bool_:
+                return None
+            buffer[rows] = series_mask.to_numpy(copy=False)
+
+        return pd.Series(buffer, index=df.index)
+
+    @staticmethod
+    def _evaluate_numpy(df: pd.DataFrame, column, op: str, value, out: np.ndarray) -> np.ndarray | None:
+        """在 numpy 原生数值列上计算单个条件，写入 out 并返回；不适用时返回 None"""
+        values = _numeric_values(df, column)
+        if values is None:
+            return None
+
+        if op in _COMPARE_UFUNCS:
+            if values.dtype.kind == "b":
+                if op not in ("==", "!=") or not isinstance(value, (bool, np.bool_)):
+                    return None
+            elif not _is_real_scalar(value):
+                return None
+            try:
+                return _COMPARE_UFUNCS[op](values, value, out=out)
+            except (TypeError, OverflowError):
+                return None  # 如 uint 列与负数比较，交给 pandas 处理
+
+        if op in ("null", "not null"):
+            if values.dtype.kind == "f":
+                np.isnan(values, out=out)
+            else:
+                out.fill(False)  # 整数/布尔列不可能为空
+            if op == "not null":
+                np.logical_not(out, out=out)
+            return out
+
+        if op in ("in", "not in"):
+            if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+                return None
+            candidates = list(value)
+            # pandas 的 isin 会把 NaN 视为相等，numpy 不会，此时交给 pandas 处理
+            if not all(_is_real_scalar(v) and v == v for v in candidates):
+                return None
+            out[:] = np.isin(values, candidates)
+            if op == "not in":
+                np.logical_not(out, out=out)
+            return out
+
+        return None
+
+    @staticmethod
+    def _evaluate_numexpr(df, conditions, buffer, scratch, combine) -> list[tuple]:
+        """将可由 numexpr 计算的数值比较合并为一个表达式求值，返回剩余的条件"""
+        terms, local_dict, remaining = [], {}, []
+        for column, op, value in conditions:
+            values = _numeric_values(df, column) if op in _COMPARE_UFUNCS else None
+            if (
+                values is None
+                or values.dtype not in _NUMEXPR_DTYPES
+                or values.dtype.kind == "b"
+                or not _is_real_scalar(value)
+            ):
+                remaining.append((column, op, value))
+                continue
+            index = len(terms)
+            local_dict[f"c{index}"] = values
+            local_dict[f"v{index}"] = value
+            terms.append(f"(c{index} {op} v{index})")
+
+        if len(terms) < 2:
+            return conditions
+
+        joiner = " & " if combine is np.logical_and else " | "
+        numexpr.evaluate(joiner.join(terms), local_dict=local_dict, out=scratch)
+        combine(buffer, scratch, out=buffer)
+        return remaining
+
+
+def compile_conditions(conditions: list[tuple], logic: str = "and") -> CompiledConditions:
+    """
+    将条件列表编译为融合求值对象，可对多个 DataFrame 重复使用
+
+    参数：
+    - conditions (List[Tuple])：条件列表，每个元组包含(列名, 运算符, 值)
+    - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+
+    返回：
+    - CompiledConditions：调用 compiled(df) 返回布尔掩码（无法融合求值时返回 None）
+
+    示例：
+        compiled = compile_conditions([("age", ">", 18), ("score", ">=", 60)])
+        mask = compiled(df)
+    """
+    return CompiledConditions(conditions, logic)
+
+
+def fused_base_mask(
+    df: pd.DataFrame,
+    conditions: list[tuple],
+    logic: str = "and",
+    seed: pd.Series | None = None,
+    planner: ConditionPlanner | None = None,
+) -> pd.Series | None:
+    """融合求值条件列表，无法保证与逐条件组合结果完全一致时返回 None"""
+    return CompiledConditions(conditions, logic)(df, seed, planner)
@@ -38,24 +38,144 @@ def _is_not_empty(x):
     return True
 
 
-def build_single_mask(df: pd.DataFrame, condition: tuple) -> pd.Series:
+# _is_empty 中按长度判断的容器类型；类型完全一致时可直接取 len，无需逐个 isinstance / pd.isna
+_SIZED_TYPES = (str, list, tuple, dict, set)
+# 需要交给 _is_empty 逐个判断的类型（含上述类型的子类）
+_CONTAINER_TYPES = (np.ndarray, pd.Series, str, list, tuple, dict, set)
+
+
+def _object_empty(values: np.ndarray) -> np.ndarray:
+    """object 数组的 empty 判断，结果与逐个调用 _is_empty 一致"""
+    sized = frozenset(_SIZED_TYPES)
+    # 一次遍历取长度：类型恰好为 str/list/tuple/dict/set 的元素记录长度，其余记为 -1
+    lengths = np.fromiter(
+        (len(x) if type(x) in sized else -1 for x in values), dtype=np.int64, count=len(values)
+    )
+    result = lengths == 0
+    others = np.flatnonzero(lengths < 0)
+    if others.size:
+        other_values = values[others]
+        is_na = pd.isna(other_values)
+        result[others] = is_na
+        # 非空值中只有数组和容器子类需要逐个判断，其他标量一律视为非空
+        for position, x in zip(others[~is_na], other_values[~is_na]):
+            if isinstance(x, _CONTAINER_TYPES):
+                result[position] = _is_empty(x)
+    return result
+
+
+def _empty_mask(series: pd.Series) -> pd.Series:
     """
-    构建单个掩码，用于简单条件判断
+    向量化的 empty 判断，按列类型选择实现，结果与 series.apply(_is_empty) 一致：
+    - 数值、布尔、日期时间等类型：元素不可能是容器，等价于 isna
+    - 字符串类型：isna 或长度为 0
+    - 分类类型：只对类别判断一次，再按编码映射
+    - object 类型：一次遍历取容器长度，其余元素向量化判断 NaN/None
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        category_empty = _object_empty(np.asarray(dtype.categories, dtype=object))
+        result = np.where(codes < 0, True, category_empty[codes])
+    elif isinstance(dtype, pd.StringDtype):
+        lengths = series.str.len().to_numpy(dtype=float, na_value=np.nan)
+        result = np.isnan(lengths) | (lengths == 0)
+    elif isinstance(dtype, np.dtype) and dtype.kind == "O":
+        result = _object_empty(series.to_numpy())
+    elif (
+        (isinstance(dtype, np.dtype) and dtype.kind in "biufcmM")
+        or pd.api.types.is_numeric_dtype(dtype)
+        or isinstance(dtype, (pd.DatetimeTZDtype, pd.PeriodDtype, pd.IntervalDtype))
+    ):
+        result = series.isna().to_numpy()
+    else:
+        return series.apply(_is_empty).astype(bool)  # 其他扩展类型逐个判断
+    return pd.Series(result, index=series.index, name=series.name)
 
-    参数：
-    - df (pd.DataFrame)：输入的DataFrame
-    - condition (Tuple)：条件元组，包含(列名, 运算符, 值)
-        **注意**：null, not null, empty, not empty
-            # null/not null：仅判断 NaN/None
-            # empty/not empty：同时覆盖 NaN/None 和空字符串 ""
 
-    返回：
-    - pd.Series：布尔掩码，True表示符合条件的行
-        **注意**：此Series是通过原生pandas表达式(df[col] > value)直接返回，
-        无额外内存分配和位运算，性能最优。适用于简单单一条件场景。
+_NULL_OPS = {"null", "not null", "empty", "not empty"}
+
+# 字符串匹配运算符（按 .str 方法逐行求值，可改为在去重后的取值上求值）
+STRING_OPS = ("contains", "not contains", "startswith", "endswith", "regex")
+
+# 少于该行数时直接逐行求值；抽样（至少 1 万行或 1% 的行）去重比例高于阈值时视为高基数列，去重收益不足
+_DICTIONARY_MIN_ROWS = 10_000
+_DICTIONARY_SAMPLE_ROWS = 10_000
+_DICTIONARY_MAX_RATIO = 0.5
+
+
+def _string_predicate(series: pd.Series, op: str, value) -> pd.Series:
+    """逐行计算字符串匹配条件（空值视为不匹配）"""
+    if op == "contains":
+        return series.str.contains(value, na=False)
+    elif op == "not contains":
+        return ~series.str.contains(value, na=False)
+    elif op == "startswith":
+        return series.str.startswith(value, na=False)
+    elif op == "endswith":
+        return series.str.endswith(value, na=False)
+    elif op == "regex":
+        # value 可为正则字符串或预编译的 re.Pattern（保留其 flags），按 re.search 语义匹配
+        return series.str.contains(value, regex=True, na=False)
+    raise ValueError(f"不支持的运算符: {op}")
+
+
+def _supports_dictionary(dtype) -> bool:
+    """可在去重取值上求值的列类型：分类、object、NaN 语义的字符串类型（结果均为 numpy bool）"""
+    return (
+        isinstance(dtype, pd.CategoricalDtype)
+        or (isinstance(dtype, pd.StringDtype) and dtype.na_value is np.nan)
+        or (isinstance(dtype, np.dtype) and dtype.kind == "O")
+    )
+
+
+def _dictionary_values_mask(uniques, codes: np.ndarray, op: str, value) -> np.ndarray:
+    """在去重取值上计算条件，再按编码映射回每一行（编码 -1 为空值）"""
+    matched = _string_predicate(pd.Series(uniques), op, value).to_numpy(dtype=bool)
+    # 空值行：not contains 为 True，其余为 False，与逐行求值一致
+    na_result = op == "not contains"
+    return np.where(codes < 0, na_result, matched[codes])
+
+
+def _string_mask(series: pd.Series, op: str, value) -> pd.Series:
+    """
+    字符串匹配条件的掩码：
+    - 分类列：只在类别上求值，再按编码映射
+    - 低基数的 object / 字符串列：factorize 后只在去重取值上求值，再按编码映射
+    - 其他情况逐行求值
     """
-    _NULL_OPS = {"null", "not null", "empty", "not empty"}
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        result = _dictionary_values_mask(dtype.categories, series.cat.codes.to_numpy(), op, value)
+        return pd.Series(result, index=series.index, name=series.name)
+
+    if len(series) >= _DICTIONARY_MIN_ROWS and _is_low_cardinality(series):
+        try:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        except TypeError:
+            pass  # 包含列表等不可哈希的值
+        else:
+            result = _dictionary_values_mask(uniques, codes, op, value)
+            return pd.Series(result, index=series.index, name=series.name)
+
+    return _string_predicate(series, op, value)
 
+
+def _is_low_cardinality(series: pd.Series) -> bool:
+    """抽样判断 object / 字符串列是否为低基数列（适合在去重取值上求值）"""
+    if not _supports_dictionary(series.dtype):
+        return False
+    sample_rows = max(_DICTIONARY_SAMPLE_ROWS, len(series) // 100)
+    step = max(1, len(series) // sample_rows)
+    sample = series.iloc[::step]
+    try:
+        return sample.nunique(dropna=False) <= len(sample) * _DICTIONARY_MAX_RATIO
+    except TypeError:
+        return False  # 包含列表等不可哈希的值
+
+
+def _normalize_condition(condition: tuple) -> tuple:
+    """将 2元组/3元组条件统一为 (列名, 运算符, 值)"""
     if len(condition) == 2:
         column, op = condition
         if op in _NULL_OPS:
@@ -65,7 +185,7 @@ def build_single_mask(df: pd.DataFrame, condition: tuple) -> pd.Series:
             # 例如 ('status', 'active') => ('status', '==', 'active')
             value = op
             op = "=="
-            
+
     elif len(condition) == 3:
         column, op, value = condition
     else:
@@ -73,56 +193,94 @@ def build_single_mask(df: pd.DataFrame, condition: tuple) -> pd.Series:
             f"条件元组长度不合法: {len(condition)}，"
             "支持 2元组 (列名, 值) 或 (列名, null运算符)，3元组 (列名, 运算符, 值)"
         )
+    return column, op, value
+
+
+def build_single_mask(df: pd.DataFrame, condition: tuple) -> pd.Series:
+    """
+    构建单个掩码，用于简单条件判断
+
+    参数：
+    - df (pd.DataFrame)：输入的DataFrame
+    - condition (Tuple)：条件元组，包含(列名, 运算符, 值)
+        **注意**：null, not null, empty, not empty
+            # null/not null：仅判断 NaN/None
+            # empty/not empty：同时覆盖 NaN/None 和空字符串 ""
+        **注意**：contains, not contains, startswith, endswith, regex
+            # 低基数的字符串列只在去重后的取值上求值，再按编码映射回每一行
+            # regex：value 为正则字符串或预编译的 re.Pattern，按 re.search 语义匹配
+
+    返回：
+    - pd.Series：布尔掩码，True表示符合条件的行
+        **注意**：此Series是通过原生pandas表达式(df[col] > value)直接返回，
+        无额外内存分配和位运算，性能最优。适用于简单单一条件场景。
+    """
+    column, op, value = _normalize_condition(condition)
+    return _series_mask(df[column], op, value)
+
 
+def _series_mask(series: pd.Series, op: str, value) -> pd.Series:
+    """对单列计算条件掩码（build_single_mask 及嵌套表达式按行子集求值时共用）"""
     if op == ">":
-        return df[column] > value
+        return series > value
     elif op == ">=":
-        return df[column] >= value
+        return series >= value
 
     elif op == "<":
-        return df[column] < value
+        return series < value
     elif op == "<=":
-        return df[column] <= value
+        return series <= value
 
     elif op == "==":
-        return df[column] == value
+        return series == value
     elif op == "!=":
-        return df[column] != value
+        return series != value
 
     elif op == "in":
-        return df[column].isin(value)
+        return series.isin(value)
     elif op == "not in":
-        return ~df[column].isin(value)
+        return ~series.isin(value)
 
     elif op == "null":
-        return df[column].isnull()
+        return series.isnull()
     elif op == "not null":
-        return df[column].notnull()
+        return series.notnull()
 
     elif op == "empty":
-        return df[column].apply(_is_empty)
+        return _empty_mask(series)
     elif op == "not empty":
-        return df[column].apply(_is_not_empty)
+        return ~_empty_mask(series)
 
-    elif op == "contains":
-        return df[column].str.contains(value, na=False)
-    elif op == "not contains":
-        return ~df[column].str.contains(value, na=False)
-
-    elif op == "startswith":
-        return df[column].str.startswith(value, na=False)
-    elif op == "endswith":
-        return df[column].str.endswith(value, na=False)
+    elif op in STRING_OPS:
+        return _string_mask(series, op, value)
     else:
         raise ValueError(f"不支持的运算符: {op}")
 
 
+def _subset_mask(series: pd.Series, rows: np.ndarray | None, op: str, value) -> pd.Series:
+    """
+    在行子集（位置索引，None 表示全部行）上计算单列条件掩码，短路求值时共用。
+
+    object 列的 .str 按取值推断类型，子集中只有数字等非字符串值时会报错，
+    而整列求值时这些行视为不匹配；此时改为整列求值后再取子集，结果与整列求值一致
+    """
+    if rows is None or len(rows) == len(series):
+        return _series_mask(series, op, value)
+    try:
+        return _series_mask(series.iloc[rows], op, value)
+    except (AttributeError, TypeError):
+        if op not in STRING_OPS:
+            raise
+        return _series_mask(series, op, value).iloc[rows]
+
+
 def build_base_mask(
     df: pd.DataFrame,
-    conditions: list[tuple],
+    conditions: list[tuple | dict] | dict,
     logic: str = "and",
     true_mask: pd.Series | None = None,
     false_mask: pd.Series | None = None,
+    planner=None,
 ) -> pd.Series:
     """
     构建基础查询条件掩码
@@ -130,19 +288,59 @@ def build_base_mask(
     参数：
     - df (pd.DataFrame)：输入的DataFrame
     - conditions (List[Tuple])：条件列表，每个元组包含(列名, 运算符, 值)
+        也可以是嵌套逻辑表达式：列表中包含 {"and": [...]}、{"or": [...]}、{"not": ...} 分组，
+        或直接传入一个分组字典，详见 build_expression_mask
     - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
     - true_mask (pd.Series)：初始True掩码，默认为None
     - false_mask (pd.Series)：初始False掩码，默认为None
+    - planner (ConditionPlanner)：查询计划器，用于按成本和选择率调整条件求值顺序，
+        默认为None（使用新的计划器）；重复查询同一DataFrame时传入同一个计划器可复用抽样结果
 
     返回：
     - pd.Series：布尔掩码，True表示符合条件的行
-        **注意**：此Series是通过pd.Series([True/False] * len(df))创建的新对象，
-        并经过多个条件组合的位运算(&/|)生成，适用于复杂多条件场景，
-        存在内存分配，会占用一定内存，相比原生pandas表达式有一定性能开销。
+        **注意**：此Series为新创建的对象，所有条件在同一块预分配的缓冲区中原地组合(&/|)，
+        每个条件不再单独分配完整的布尔Series，适用于复杂多条件场景。
 
     说明：
-    - 如需复杂的嵌套逻辑组合，请使用 combine_masks 方法。
+    - 包含嵌套分组时按表达式树短路求值（见 build_expression_mask）。
+    - 求值顺序由 ConditionPlanner 决定，可用 explain() 查看执行计划。
+    - 优先使用 mask_compiler 的融合求值：所有条件写入同一块预分配的 numpy 缓冲区，
+      不再为每个条件分配完整的布尔 Series；无法保证结果与逐条件组合完全一致时
+      （如可空布尔类型的条件结果），自动回退为逐条件组合。
     """
+    # 延迟导入，避免与 mask_compiler / expr_utils 循环导入
+    from .mask_compiler import fused_base_mask
+    from .expr_utils import build_expression_mask
+
+    if logic not in ("and", "or"):
+        raise ValueError(f"不支持的逻辑操作类型: {logic}，支持 'and' 或 'or'")
+
+    if isinstance(conditions, dict) or any(isinstance(c, dict) for c in conditions):
+        expression = conditions if isinstance(conditions, dict) else {logic: conditions}
+        mask = build_expression_mask(df, expression, planner)
+        if logic == "and" and true_mask is not None:
+            mask = true_mask & mask
+        elif logic == "or" and false_mask is not None:
+            mask = false_mask | mask
+        return mask
+
+    if conditions:
+        seed = true_mask if logic == "and" else false_mask
+        mask = fused_base_mask(df, conditions, logic, seed, planner)  # pyright: ignore[reportArgumentType]
+        if mask is not None:
+            return mask
+
+    return _combine_condition_masks(df, conditions, logic, true_mask, false_mask)
+
+
+def _combine_condition_masks(
+    df: pd.DataFrame,
+    conditions: list[tuple],
+    logic: str = "and",
+    true_mask: pd.Series | None = None,
+    false_mask: pd.Series | None = None,
+) -> pd.Series:
+    """逐条件构建掩码并用 &/| 组合（build_base_mask 的回退实现）"""
     def _and_mask(m, c):
         return m & c
 
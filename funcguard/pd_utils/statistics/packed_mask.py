@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+else:  # numpy < 2.0 没有 bitwise_count，按字节查表
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class PackedMask:
+    """
+    按位压缩的布尔掩码：每 8 行占 1 字节（numpy.packbits），内存约为布尔 Series 的 1/8。
+
+    - 位数据按 64 位字存储，&、|、^、~ 直接在字上计算
+    - count() 通过 popcount 统计 True 的数量，无需还原为布尔数组
+    - 只在需要取行时通过 to_numpy() / to_series() / positions() 还原
+    - 对象不可变，运算均返回新的 PackedMask，可安全地缓存和共享
+    """
+
+    __slots__ = ("_words", "_length", "_index")
+
+    def __init__(self, words: np.ndarray, length: int, index: pd.Index | None = None):
+        """
+        一般通过 PackedMask.from_mask() 创建
+
+        参数：
+        - words (np.ndarray)：uint64 位数据，末尾多余的位必须为 0
+        - length (int)：行数
+        - index (pd.Index)：还原为 Series 时使用的索引，默认为None（RangeIndex）
+        """
+        words.flags.writeable = False
+        self._words = words
+        self._length = length
+        self._index = index
+
+    @classmethod
+    def from_mask(cls, mask: pd.Series | np.ndarray, index: pd.Index | None = None) -> "PackedMask":
+        """
+        将布尔掩码压缩为 PackedMask
+
+        参数：
+        - mask (pd.Series | np.ndarray)：布尔掩码，可空布尔类型中的 NA 视为 False
+        - index (pd.Index)：索引，默认为None（mask 为 Series 时使用其索引）
+
+        返回：
+        - PackedMask：压缩后的掩码
+        """
+        if isinstance(mask, pd.Series):
+            if index is None:
+                index = mask.index
+            values = mask.to_numpy(dtype=bool, na_value=False)
+        else:
+            values = np.asarray(mask, dtype=bool)
+        if values.ndim != 1:
+            raise ValueError(f"掩码必须是一维的，当前维度: {values.ndim}")
+
+        packed = np.packbits(values, bitorder="little")
+        # 补齐到 8 字节的整数倍，按 64 位字存储
+        words = np.zeros(-(-packed.size // 8), dtype=np.uint64)
+        words.view(np.uint8)[: packed.size] = packed
+        return cls(words, len(values), index)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def index(self) -> pd.Index:
+        return self._index if self._index is not None else pd.RangeIndex(self._length)
+
+    @property
+    def nbytes(self) -> int:
+        """位数据占用的字节数"""
+        return self._words.nbytes
+
+    def count(self) -> int:
+        """True 的数量"""
+        return _popcount(self._words)
+
+    def any(self) -> bool:
+        return bool(self._words.any())
+
+    def all(self) -> bool:
+        return self.count() == self._length
+
+    def to_numpy(self) -> np.ndarray:
+        """还原为 numpy 布尔数组"""
+        bits = np.unpackbits(self._words.view(np.uint8), count=self._length, bitorder="little")
+        return bits.view(bool)
+
+    def to_series(self) -> pd.Series:
+        """还原为布尔 Series（使用压缩时的索引）"""
+        return pd.Series(self.to_numpy(), index=self.index)
+
+    def positions(self) -> np.ndarray:
+        """True 所在的位置索引"""
+        return np.flatnonzero(self.to_numpy())
+
+    def append(self, mask: "PackedMask | pd.Series | np.ndarray", index: pd.Index | None = None) -> "PackedMask":
+        """
+        在末尾追加行，返回新的 PackedMask
+
+        已有的位数据只按字节复制，只有新增的行需要压缩，适合按批追加数据后更新缓存的掩码
+
+        参数：
+        - mask (PackedMask | pd.Series | np.ndarray)：追加行的掩码，可空布尔类型中的 NA 视为 False
+        - index (pd.Index)：追加后的完整索引，默认为None（拼接两者的索引）；
+            已有追加后的索引时传入，避免每个掩码都拼接一次索引
+
+        返回：
+        - PackedMask：追加后的掩码
+        """
+        if isinstance(mask, PackedMask):
+            values, new_index = mask.to_numpy(), mask._index
+        elif isinstance(mask, pd.Series):
+            values, new_index = mask.to_numpy(dtype=bool, na_value=False), mask.index
+        else:
+            values, new_index = np.asarray(mask, dtype=bool), None
+        if values.ndim != 1:
+            raise ValueError(f"掩码必须是一维的，当前维度: {values.ndim}")
+
+        length = self._length + len(values)
+        if index is not None:
+            if len(index) != length:
+                raise ValueError(f"索引长度 {len(index)} 与追加后的行数 {length} 不一致")
+        elif self._index is not None or new_index is not None:
+            if new_index is None:
+                new_index = pd.RangeIndex(self._length, length)
+            index = self.index.append(new_index)
+
+        used = -(-self._length // 8)
+        data = self._words.view(np.uint8)[:used].copy()
+        # 先填满最后一个不完整的字节，其余新行按字节对齐压缩后拼接
+        offset = self._length % 8
+        head = min(len(values), (8 - offset) % 8)
+        if head:
+            shifted = values[:head].astype(np.uint8) << np.arange(offset, offset + head, dtype=np.uint8)
+            data[-1] |= np.bitwise_or.reduce(shifted)
+        packed = np.concatenate([data, np.packbits(values[head:], bitorder="little")])
+
+        words = np.zeros(-(-packed.size // 8), dtype=np.uint64)
+        words.view(np.uint8)[: packed.size] = packed
+        return PackedMask(words, length, index)
+
+    def _check_other(self, other: "PackedMask") -> None:
+        if len(other) != self._length:
+            raise ValueError(f"掩码长度不一致: {self._length} 与 {len(other)}")
+
+    def __and__(self, other: "PackedMask") -> "PackedMask":
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        self._check_other(other)
+        return PackedMask(self._words & other._words, self._length, self._index)
+
+    def __or__(self, other: "PackedMask") -> "PackedMask":
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        self._check_other(other)
+        return PackedMask(self._words | other._words, self._length, self._index)
+
+    def __xor__(self, other: "PackedMask") -> "PackedMask":
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        self._check_other(other)
+        return PackedMask(self._words ^ other._words, self._length, self._index)
+
+    def __invert__(self) -> "PackedMask":
+        words = ~self._words
+        # 清除末尾超出行数的位，保证 count() 正确
+        tail = words.view(np.uint8)
+        full_bytes, rest_bits = divmod(self._length, 8)
+        if rest_bits:
+            tail[full_bytes] &= (1 << rest_bits) - 1
+            full_bytes += 1
+        tail[full_bytes:] = 0
+        return PackedMask(words, self._length, self._index)
+
+    def __repr__(self) -> str:
+        return f"PackedMask(rows={self._length}, true={self.count()}, nbytes={self.nbytes})"
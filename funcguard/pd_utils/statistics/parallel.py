@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .mask_utils import build_single_mask, build_base_mask
+from .expr_utils import _condition_columns
+
+
+# 行数少于该值时不启用多进程（进程启动和数据传输的开销高于并行收益）
+PARALLEL_MIN_ROWS = 200_000
+
+
+def _resolve_workers(parallel: int | None) -> int:
+    """parallel 为 None 或 1 时串行；为 -1 时使用全部 CPU 核心"""
+    if parallel is None:
+        return 1
+    if parallel == -1:
+        return os.cpu_count() or 1
+    if parallel < 1:
+        raise ValueError(f"parallel 必须为正整数或 -1（使用全部 CPU 核心），当前值: {parallel}")
+    return parallel
+
+
+def _partition_bounds(length: int, partitions: int) -> list[tuple[int, int]]:
+    """将 [0, length) 均分为若干段，段边界对齐到 8 行（按位压缩后可直接拼接）"""
+    step = -(-length // partitions)
+    step = -(-step // 8) * 8
+    return [(start, min(start + step, length)) for start in range(0, length, step)]
+
+
+def _share_column(series: pd.Series, blocks: list) -> tuple:
+    """
+    返回列在子进程中的重建方式：
+    - numpy 数值/布尔/日期时间列、分类列的编码：写入共享内存，子进程按名称映射，不经过序列化
+    - 其他列（object、字符串、可空扩展类型等）：每个分区只序列化自身的切片
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        values, kind = series.cat.codes.to_numpy(), "category"
+    elif isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        values, kind = series.to_numpy(), "shared"
+    else:
+        return ("pickled", series)
+
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    return (kind, block.name, values.dtype, len(values), dtype)
+
+
+def _partition_frame(columns: list, start: int, stop: int, blocks: list) -> pd.DataFrame:
+    """在子进程中按 [start, stop) 重建分区 DataFrame，共享内存中的列为零拷贝视图"""
+    data = {}
+    for name, spec in columns:
+        if spec[0] == "pickled":
+            data[name] = spec[1]
+            continue
+        kind, block_name, values_dtype, length, dtype = spec
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        values = np.ndarray((length,), dtype=values_dtype, buffer=block.buf)[start:stop]
+        if kind == "category":
+            values = pd.Categorical.from_codes(values, dtype=dtype)
+        data[name] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def _evaluate_partition(columns: list, start: int, stop: int, conditions, logic: str,
+                        reduce: bool, blocks: list) -> np.ndarray | int:
+    df = _partition_frame(columns, start, stop, blocks)
+    if isinstance(conditions, tuple):
+        mask = build_single_mask(df, conditions)
+    else:
+        mask = build_base_mask(df, conditions, logic)
+    # 可空布尔结果中的 NA 与 pd_filter / pd_count 的语义一致，视为 False
+    values = mask.to_numpy(dtype=bool, na_value=False)
+    if reduce:
+        return int(np.count_nonzero(values))
+    return np.packbits(values, bitorder="little")
+
+
+def _partition_task(columns: list, start: int, stop: int, conditions, logic: str, reduce: bool):
+    """子进程任务：在一个分区上求值条件，返回按位压缩的掩码或满足条件的行数"""
+    blocks: list = []
+    try:
+        return _evaluate_partition(columns, start, stop, conditions, logic, reduce, blocks)
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # 异常回溯仍引用共享内存视图，映射随进程回收
+
+
+def _run_partitions(df: pd.DataFrame, conditions, logic: str, parallel: int | None, reduce: bool):
+    """分区并行求值，不满足并行条件时返回 None（由调用方串行求值）"""
+    workers = _resolve_workers(parallel)
+    if workers <= 1 or len(df) < PARALLEL_MIN_ROWS or not df.columns.is_unique:
+        return None
+
+    names = _condition_columns(conditions)
+    if not names:
+        return None
+    missing = [name for name in names if name not in df.columns]
+    if missing:
+        raise KeyError(missing[0])
+
+    bounds = _partition_bounds(len(df), workers)
+    blocks: list = []
+    try:
+        shared = [(name, _share_column(df[name], blocks)) for name in names]
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as executor:
+            futures = []
+            for start, stop in bounds:
+                # 序列化的列只传入当前分区的切片
+                columns = [
+                    (name, ("pickled", spec[1].iloc[start:stop].reset_index(drop=True)))
+                    if spec[0] == "pickled" else (name, spec)
+                    for name, spec in shared
+                ]
+                futures.append(executor.submit(_partition_task, columns, start, stop, conditions, logic, reduce))
+            try:
+                results = [future.result() for future in futures]
+            except (AttributeError, TypeError):
+                # 分区按自身的取值推断类型，如 object 列的某个分区中只有整数时 .str 无法使用，
+                # 而整列求值时这些行视为不匹配；此时由调用方串行求值，保证结果与串行一致
+                return None
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    if reduce:
+        return sum(results)
+    packed = np.concatenate(results)
+    return np.unpackbits(packed, count=len(df), bitorder="little").view(bool)
+
+
+def parallel_mask(df: pd.DataFrame, conditions, logic: str = "and", parallel: int | None = None) -> np.ndarray | None:
+    """
+    按行分区，在多个进程中并行构建条件掩码
+
+    参数：
+    - df (pd.DataFrame)：输入的DataFrame
+    - conditions：条件元组、条件列表或嵌套表达式
+    - logic (str)：逻辑操作类型，"and" 或 "or"，默认为 "and"
+    - parallel (int)：进程数，-1 表示使用全部 CPU 核心；None 或 1 时不并行
+
+    返回：
+    - np.ndarray | None：布尔数组（可空布尔结果中的 NA 为 False）；
+        进程数为 1、行数少于 PARALLEL_MIN_ROWS、列名重复或某个分区无法单独求值时返回 None，由调用方串行求值
+    """
+    return _run_partitions(df, conditions, logic, parallel, reduce=False)
+
+
+def parallel_count(df: pd.DataFrame, conditions, logic: str = "and", parallel: int | None = None) -> int | None:
+    """
+    按行分区并行统计满足条件的行数，各进程只返回行数，不传回掩码
+
+    返回：
+    - int | None：满足条件的行数；不满足并行条件时返回 None，由调用方串行求值
+    """
+    return _run_partitions(df, conditions, logic, parallel, reduce=True)
@@ -0,0 +1,248 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from .mask_utils import _normalize_condition, _series_mask
+from .expr_utils import _parse_node, _evaluate
+
+
+# 各运算符每行的相对计算成本（以 numpy 数值比较为 1）
+_OP_COST = {
+    ">": 1.0, ">=": 1.0, "<": 1.0, "<=": 1.0, "==": 1.0, "!=": 1.0,
+    "null": 1.0, "not null": 1.0,
+    "in": 3.0, "not in": 3.0,
+    "startswith": 15.0, "endswith": 15.0,
+    "contains": 30.0, "not contains": 30.0, "regex": 30.0,
+    "empty": 5.0, "not empty": 5.0,  # object 列需一次 Python 遍历取长度（再乘列类型系数）
+}
+
+# 未抽样时（数据量较小）使用的默认选择率
+_DEFAULT_SELECTIVITY = 0.5
+
+
+def _dtype_factor(dtype) -> float:
+    """列类型对成本的放大系数：numpy 原生类型最快，object 列需要逐个 Python 对象比较"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 1.0
+    if isinstance(dtype, np.dtype):
+        return 8.0 if dtype.kind == "O" else 1.0
+    if isinstance(dtype, pd.StringDtype):
+        return 3.0
+    return 2.0  # 其他扩展类型（可空整数等）
+
+
+def estimate_cost(df: pd.DataFrame, condition: tuple) -> float:
+    """按运算符和列类型估算单个条件每行的相对成本"""
+    column, op, _ = _normalize_condition(condition)
+    series = df[column]
+    dtype = series.dtype if isinstance(series, pd.Series) else np.dtype(object)
+    return _OP_COST.get(op, 10.0) * _dtype_factor(dtype)
+
+
+class PlanNode:
+    """执行计划节点：条件（leaf）或 and/or/not 分组，记录估算的成本与选择率"""
+
+    __slots__ = ("kind", "condition", "children", "cost", "selectivity")
+
+    def __init__(self, kind: str, condition=None, children=None, cost: float = 0.0, selectivity: float = 1.0):
+        self.kind = kind
+        self.condition = condition
+        self.children: list[PlanNode] = children or []
+        self.cost = cost  # 对每一行输入的期望成本
+        self.selectivity = selectivity  # 满足条件的行占比
+
+    def expression(self):
+        """还原为（调整顺序后的）表达式"""
+        if self.kind == "leaf":
+            return self.condition
+        if self.kind == "not":
+            return {"not": self.children[0].expression()}
+        return {self.kind: [child.expression() for child in self.children]}
+
+
+class QueryPlan:
+    """
+    条件执行计划：调整后的求值顺序及每一步估算的成本、选择率。
+
+    - order：顶层分组调整后的条件顺序
+    - expression()：调整顺序后的表达式，可直接传给 pd_filter / build_base_mask
+    - explain()：返回执行计划的文本说明
+    """
+
+    def __init__(self, root: PlanNode, rows: int, sample_rows: int):
+        self.root = root
+        self.rows = rows
+        self.sample_rows = sample_rows
+
+    @property
+    def order(self) -> list:
+        if self.root.kind in ("and", "or"):
+            return [child.expression() for child in self.root.children]
+        return [self.root.expression()]
+
+    def expression(self):
+        return self.root.expression()
+
+    def explain(self) -> str:
+        if self.sample_rows:
+            source = f"抽样 {self.sample_rows} 行估算选择率"
+        else:
+            source = f"数据量较小，按默认选择率 {_DEFAULT_SELECTIVITY} 估算"
+        lines = [f"执行计划（共 {self.rows} 行，{source}）"]
+        self._explain_node(self.root, 0, "", lines)
+        return "\n".join(lines)
+
+    def _explain_node(self, node: PlanNode, depth: int, prefix: str, lines: list[str]) -> None:
+        indent = "  " * (depth + 1)
+        stats = f"成本 {node.cost:.2f}  选择率 {node.selectivity:.2%}"
+        if node.kind == "leaf":
+            lines.append(f"{indent}{prefix}{node.condition!r}  {stats}")
+            return
+        if node.kind == "not":
+            lines.append(f"{indent}{prefix}NOT  {stats}")
+            self._explain_node(node.children[0], depth + 1, "", lines)
+            return
+        rest = "仍满足前面条件的行" if node.kind == "and" else "尚未匹配的行"
+        lines.append(f"{indent}{prefix}{node.kind.upper()}（后续条件只在{rest}上求值）  {stats}")
+        for step, child in enumerate(node.children, 1):
+            self._explain_node(child, depth + 1, f"{step}. ", lines)
+
+
+class ConditionPlanner:
+    """
+    条件查询计划器：根据成本和选择率调整 and/or 分组中条件的求值顺序。
+
+    - 成本：按运算符类型和列类型估算（字符串匹配、empty 判断、object 列较贵）
+    - 选择率：在抽样的行上实际求值得到，结果按 (列名, 运算符, 值) 缓存，同一计划器重复使用时不再抽样
+    - and 分组按 成本 / (1 - 选择率) 升序排列：便宜且能过滤掉大部分行的条件先求值
+    - or 分组按 成本 / 选择率 升序排列：便宜且能匹配大部分行的条件先求值
+    """
+
+    def __init__(self, sample_size: int = 1000, random_state: int = 0):
+        """
+        :param sample_size: 抽样行数，默认 1000；数据量小于 2 倍抽样行数时不抽样，按默认选择率估算
+        :param random_state: 抽样随机种子，默认 0
+        """
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self._selectivity_cache: dict = {}
+
+    def clear_cache(self) -> None:
+        """清空选择率缓存（DataFrame 数据变化后调用）"""
+        self._selectivity_cache.clear()
+
+    def plan(self, df: pd.DataFrame, conditions: list | dict, logic: str = "and") -> QueryPlan:
+        """
+        生成执行计划
+
+        参数：
+        - df (pd.DataFrame)：输入的DataFrame
+        - conditions：条件列表或嵌套表达式（格式同 build_base_mask）
+        - logic (str)：条件列表的逻辑操作类型，"and" 或 "or"，默认为 "and"
+
+        返回：
+        - QueryPlan：执行计划
+        """
+        if logic not in ("and", "or"):
+            raise ValueError(f"不支持的逻辑操作类型: {logic}，支持 'and' 或 'or'")
+        expression = conditions if isinstance(conditions, dict) else {logic: list(conditions)}
+        positions = self._sample_positions(len(df))
+        root = self._plan_node(df, expression, positions)
+        return QueryPlan(root, len(df), 0 if positions is None else len(positions))
+
+    def order(self, df: pd.DataFrame, conditions: list[tuple], logic: str = "and") -> list[tuple]:
+        """返回调整顺序后的条件列表"""
+        return self.plan(df, conditions, logic).order
+
+    def _sample_positions(self, length: int) -> np.ndarray | None:
+        if length < 2 * self.sample_size:
+            return None
+        rng = np.random.default_rng(self.random_state)
+        return np.sort(rng.choice(length, self.sample_size, replace=False))
+
+    def _plan_node(self, df: pd.DataFrame, expression, positions: np.ndarray | None) -> PlanNode:
+        kind, payload = _parse_node(expression)
+
+        if kind == "leaf":
+            return PlanNode(
+                "leaf",
+                condition=payload,
+                cost=estimate_cost(df, payload),  # pyright: ignore[reportArgumentType]
+                selectivity=self._leaf_selectivity(df, payload, positions),
+            )
+
+        if kind == "not":
+            child = self._plan_node(df, payload, positions)
+            return PlanNode("not", children=[child], cost=child.cost, selectivity=1 - child.selectivity)
+
+        children = [self._plan_node(df, child, positions) for child in payload]  # pyright: ignore[reportGeneralTypeIssues]
+        if positions is not None:
+            # 选择率按组合求值估算（子条件之间可能相关），而不是简单相乘
+            try:
+                group_selectivity = float(_evaluate(df, expression, positions).mean())
+            except (AttributeError, TypeError):
+                group_selectivity = None  # 抽样行上无法求值时按子条件的估算组合
+        else:
+            group_selectivity = None
+
+        if kind == "and":
+            children.sort(key=lambda c: _rank(c.cost, 1 - c.selectivity))
+            cost, alive = 0.0, 1.0
+            for child in children:
+                cost += child.cost * alive
+                alive *= child.selectivity
+            selectivity = alive
+        else:
+            children.sort(key=lambda c: _rank(c.cost, c.selectivity))
+            cost, pending = 0.0, 1.0
+            for child in children:
+                cost += child.cost * pending
+                pending *= 1 - child.selectivity
+            selectivity = 1 - pending
+
+        if group_selectivity is not None:
+            selectivity = group_selectivity
+        return PlanNode(kind, children=children, cost=cost, selectivity=selectivity)
+
+    def _leaf_selectivity(self, df: pd.DataFrame, condition, positions: np.ndarray | None) -> float:
+        if positions is None:
+            return _DEFAULT_SELECTIVITY
+        column, op, value = _normalize_condition(condition)
+        key = (column, op, repr(value), len(df))
+        cached = self._selectivity_cache.get(key)
+        if cached is None:
+            sample = df[column].iloc[positions]
+            try:
+                mask = _series_mask(sample, op, value).to_numpy(dtype=bool, na_value=False)
+            except (AttributeError, TypeError):
+                # 如 object 列的抽样行中没有字符串，.str 无法使用，按默认选择率估算
+                cached = _DEFAULT_SELECTIVITY
+            else:
+                cached = float(mask.mean())
+            self._selectivity_cache[key] = cached
+        return cached
+
+
+def _rank(cost: float, reduction: float) -> float:
+    """排序依据：每淘汰（and）或匹配（or）一行所需的成本，越小越先求值"""
+    return cost / reduction if reduction > 0 else math.inf
+
+
+def explain(df: pd.DataFrame, conditions: list | dict, logic: str = "and", planner: ConditionPlanner | None = None) -> str:
+    """
+    返回条件列表或嵌套表达式的执行计划说明（调整后的求值顺序、估算成本与选择率）
+
+    参数：
+    - df (pd.DataFrame)：输入的DataFrame
+    - conditions：条件列表或嵌套表达式（格式同 build_base_mask）
+    - logic (str)：条件列表的逻辑操作类型，"and" 或 "or"，默认为 "and"
+    - planner (ConditionPlanner)：计划器，默认为None（使用新的计划器）
+
+    返回：
+    - str：执行计划文本
+
+    示例：
+        print(explain(df, [("name", "contains", "test"), ("dept", "==", "IT")]))
+    """
+    return (planner or ConditionPlanner()).plan(df, conditions, logic).explain()
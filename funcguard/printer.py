@@ -1,4 +1,7 @@
-from typing import Any
+import sys
+import threading
+import time
+from typing import Any, TextIO
 
 # 打印进度条
 def print_progress(idx: int, total: int, message: str = "") -> None:
@@ -72,4 +75,183 @@ def print_block(title: str, content: Any, separator_char: str = "-", separator_l
     print(content)
 
     print_line(separator_char, separator_length)
-    # print()  # 添加一个空行便于阅读
\ No newline at end of file
+    # print()  # 添加一个空行便于阅读
+
+
+class ProgressBar:
+    """
+    单个进度条，由 ProgressRenderer.add_bar 创建。
+
+    update 为无锁计数：每个线程第一次更新时分配一个只属于自己的计数单元，
+    之后只修改自己的单元；渲染线程读取时再把所有单元求和，工作线程之间互不竞争。
+    """
+
+    def __init__(self, name: str, total: int = 0, alpha: float = 0.3):
+        self.name = name
+        self.total = total
+        self.alpha = alpha
+        self.done = False
+        self._cells: list[list[int]] = []
+        self._local = threading.local()
+        self._cells_lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_count = 0
+        self._last_time = self._start
+        self._rate = 0.0
+
+    def update(self, n: int = 1) -> None:
+        """增加进度计数，可在任意线程中调用。"""
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0]
+            with self._cells_lock:  # 每个线程只在首次更新时加锁一次
+                self._cells.append(cell)
+            self._local.cell = cell
+        cell[0] += n
+
+    def close(self) -> None:
+        """标记该进度条已完成。"""
+        self.done = True
+
+    @property
+    def count(self) -> int:
+        """当前完成数量（所有线程计数之和）。"""
+        return sum(cell[0] for cell in list(self._cells))
+
+    def _sample(self, now: float) -> tuple[int, float]:
+        """采样当前计数并用指数加权移动平均平滑速率，返回 (计数, 每秒速率)。"""
+        count = self.count
+        elapsed = now - self._last_time
+        if elapsed > 0:
+            instant = (count - self._last_count) / elapsed
+            if self._last_count == 0 and self._rate == 0.0:
+                self._rate = count / max(now - self._start, 1e-9)
+            else:
+                self._rate = self.alpha * instant + (1 - self.alpha) * self._rate
+            self._last_count, self._last_time = count, now
+        return count, self._rate
+
+    def _format(self, now: float, bar_width: int) -> str:
+        count, rate = self._sample(now)
+        if self.done:
+            rate = count / max(now - self._start, 1e-9)  # 完成后显示平均速率
+        elapsed = _format_seconds(now - self._start)
+        if self.total > 0:
+            ratio = min(count / self.total, 1.0)
+            filled = int(ratio * bar_width)
+            bar = "█" * filled + "-" * (bar_width - filled)
+            if self.done or count >= self.total:
+                tail = f"用时 {elapsed}"
+            elif rate > 0:
+                tail = f"ETA {_format_seconds((self.total - count) / rate)}"
+            else:
+                tail = "ETA --:--:--"
+            return f"{self.name} |{bar}| {ratio:4.0%} {count}/{self.total} {rate:.1f}/s {tail}"
+        tail = f"用时 {elapsed}" if self.done else f"已运行 {elapsed}"
+        return f"{self.name} {count} {rate:.1f}/s {tail}"
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressRenderer:
+    """
+    线程安全的多进度条渲染器：多个工作线程同时更新各自的进度条，由一个后台线程统一重绘。
+
+    - 无论 update 调用多频繁，重绘频率都不超过 refresh_rate 次/秒
+    - 每个进度条显示速率（指数加权平滑）与预计剩余时间
+    - 输出不是终端（如 CI 日志、重定向到文件）时，改为每 plain_interval 秒输出一次纯文本行，
+      不使用 \r 和光标控制符
+
+    示例：
+        with ProgressRenderer() as renderer:
+            bars = [renderer.add_bar(f"worker-{i}", total=1000) for i in range(4)]
+            # 在各工作线程中调用 bars[i].update()
+    """
+
+    def __init__(
+        self,
+        refresh_rate: float = 10.0,
+        stream: TextIO | None = None,
+        plain_interval: float = 10.0,
+        bar_width: int = 30,
+    ):
+        """
+        :param refresh_rate: 终端模式下每秒最多重绘次数，默认 10
+        :param stream: 输出流，默认 sys.stdout
+        :param plain_interval: 非终端模式下输出纯文本行的间隔（秒），默认 10
+        :param bar_width: 进度条宽度（字符数），默认 30
+        """
+        if refresh_rate <= 0:
+            raise ValueError("refresh_rate 必须大于 0")
+        self.stream = stream or sys.stdout
+        self.refresh_interval = 1.0 / refresh_rate
+        self.plain_interval = plain_interval
+        self.bar_width = bar_width
+        isatty = getattr(self.stream, "isatty", None)
+        self.is_tty = bool(isatty and isatty())
+        self._bars: list[ProgressBar] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._drawn_lines = 0
+
+    def add_bar(self, name: str, total: int = 0) -> ProgressBar:
+        """
+        添加一个进度条。
+
+        :param name: 进度条名称（如工作线程或任务名）
+        :param total: 总数量，为 0 时只显示计数与速率
+        :return: ProgressBar，在工作线程中调用其 update 方法更新进度
+        """
+        bar = ProgressBar(name, total)
+        with self._lock:
+            self._bars.append(bar)
+        return bar
+
+    def start(self) -> "ProgressRenderer":
+        """启动后台渲染线程。"""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="funcguard-progress", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止后台渲染线程，并输出最终进度。"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._render(final=True)
+
+    def __enter__(self) -> "ProgressRenderer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        interval = self.refresh_interval if self.is_tty else self.plain_interval
+        while not self._stop_event.wait(interval):
+            self._render()
+
+    def _render(self, final: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            lines = [bar._format(now, self.bar_width) for bar in self._bars]
+        if not lines:
+            return
+
+        if self.is_tty:
+            # 光标回到上一帧的第一行，逐行清除后重绘，整帧一次写入
+            frame = f"\033[{self._drawn_lines}F" if self._drawn_lines else ""
+            frame += "".join(f"\033[2K{line}\n" for line in lines)
+            self._drawn_lines = len(lines)
+        else:
+            frame = "".join(f"{line}\n" for line in lines)
+        self.stream.write(frame)
+        self.stream.flush()
@@ -2,13 +2,19 @@
 时间工具模块，提供时间计算、日志记录和执行时间监控功能
 """
 import time
+import threading
+from functools import wraps
 from typing import Literal
 from datetime import datetime, timezone, timedelta
-from .log_utils import setup_logger, _normalize_level
+from .log_utils import setup_logger, _normalize_level, funcguard_logger
+from .monitor_utils import timing_registry, MemoryProbe, arm_slow_call_sampler, capture_slow_call, _func_name
 
 
 color_logger = setup_logger("funcguard_time_logger", message_only=True)
 
+# 北京时间（UTC+8），模块级复用，避免每次调用都重新构造 timezone 对象
+_BJ_TZ = timezone( timedelta( hours = 8 ) )
+
 
 # 打印时间
 def time_log(message, i = 0, max_num = 0, s_time = None, start_from = 0 , return_field = "progress_info", level = "") :
@@ -22,10 +28,10 @@ def time_log(message, i = 0, max_num = 0, s_time = None, start_from = 0 , return
     :param start_from: i是否从0开始，0表示从0开始，1表示从1开始
     :param return_field: 返回字段，支持以下：
         "progress_info" 表示完整进度信息，"remaining_time" 表示剩余时间，"end_time" 表示预计完成时间
-    :param level: 日志等级，支持 DEBUG/INFO/PROGRESS/SUCCESS/WARNING/WARN/ERROR/CRITICAL/FATAL。为空时仅 print。
+    :param level: 日志等级，支持 DEBUG/INFO/PROGRESS/SUCCESS/WARNING/WARN/ERROR/CRITICAL/FATAL。为空时通过 funcguard logger 输出纯文本（可用 configure_funcguard_logger 配置或静默）。
     :return: 根据 return_field 参数返回不同的信息
     """
-    now = datetime.now( timezone( timedelta( hours = 8 ) ) )
+    now = datetime.now( _BJ_TZ )
     time_str = "{:02d}:{:02d}:{:02d}".format( now.hour, now.minute, now.second )
     progress_info = eta_time_info = etr_time_info = ""
     if i < 2 or max_num < 2 :
@@ -35,7 +41,7 @@ def time_log(message, i = 0, max_num = 0, s_time = None, start_from = 0 , return
             if level:
                 color_logger.log( _normalize_level( level ), time_str + " " + message )
             else:
-                print( time_str + " " + message )
+                funcguard_logger.info( time_str + " " + message )
 
     else :
         # 根据start_from参数计算实际处理的项目数
@@ -69,10 +75,324 @@ def time_log(message, i = 0, max_num = 0, s_time = None, start_from = 0 , return
         if level:
             color_logger.log( _normalize_level( level ), time_str + " " + message + " " + progress_info )
         else:
-            print( time_str + " " + message + " " + progress_info )
+            funcguard_logger.info( time_str + " " + message + " " + progress_info )
     return progress_info
 
 
+# 低开销进度跟踪器
+class ProgressTracker:
+    """
+    低开销的进度跟踪器，用于替代紧密循环中逐次调用的 time_log
+
+    设计原理：
+    - update() 只做整数累加，仅当累计数量到达下一个检查点时才读取时钟
+    - 检查点间隔根据当前处理速率自适应调整，使时钟读取频率与循环速度无关
+    - 仅按墙钟时间间隔（interval 秒）输出一次进度，且只在输出时获取北京时间并格式化字符串
+    - 使用 EWMA（指数加权移动平均）估算处理速率，预计完成时间比累计平均值更稳定
+    - eta() / etr() 返回与 time_log 相同格式的 "eta ..." / "etr ..." 字符串
+
+    示例：
+        tracker = ProgressTracker(len(items), "处理中", interval=5, level="progress")
+        for item in items:
+            process(item)
+            tracker.update()
+    """
+
+    def __init__(self, max_num, message = "", interval = 5.0, level = "", alpha = 0.3):
+        """
+        :param max_num: 总进度数量
+        :param message: 每次输出时的日志消息
+        :param interval: 输出间隔（秒），默认 5 秒；为 0 时每次检查都输出
+        :param level: 日志等级，同 time_log；为空时仅 print
+        :param alpha: EWMA 平滑系数（0~1），越大越偏向最近的速率，默认 0.3
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError( "alpha must be in (0, 1]" )
+        self.max_num = max_num
+        self.message = message
+        self.interval = interval
+        self.level = _normalize_level( level ) if level else None
+        self.alpha = alpha
+        self.count = 0
+        self.rate = None  # 每秒处理数量（EWMA）
+
+        now = time.perf_counter()
+        self._start = now
+        self._last_time = now
+        self._last_count = 0
+        self._last_emit = now
+        self._next_check = 1
+
+    def update(self, n = 1):
+        """
+        累加已处理数量，仅在到达检查点时才读取时钟并按间隔输出进度
+
+        :param n: 本次新增的处理数量，默认为 1
+        """
+        self.count += n
+        if self.count >= self._next_check:
+            self._check()
+
+    def _check(self):
+        """读取时钟，更新速率估计，并在到达输出间隔或完成时输出进度"""
+        now = time.perf_counter()
+        elapsed = now - self._last_time
+        instant_rate = None
+        if elapsed > 0:
+            instant_rate = ( self.count - self._last_count ) / elapsed
+            if self.rate is None:
+                self.rate = instant_rate
+            else:
+                self.rate = self.alpha * instant_rate + ( 1 - self.alpha ) * self.rate
+            self._last_time = now
+            self._last_count = self.count
+
+        finished = self.max_num > 0 and self.count >= self.max_num
+        if finished or now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self.log()
+
+        # 按当前速率计算下一个检查点，约每 1/4 个输出间隔读取一次时钟；
+        # 速率下降时 EWMA 滞后，取较小的瞬时速率，并且不超过距下次输出剩余的时间，避免输出间隔被拉长
+        rate = self.rate or 0
+        if instant_rate is not None:
+            rate = min( rate, instant_rate )
+        horizon = min( self.interval / 4, max( self.interval - ( now - self._last_emit ), 0 ) )
+        stride = max( 1, int( rate * horizon ) )
+        self._next_check = self.count + stride
+        if self.max_num > 0 and not finished:
+            self._next_check = min( self._next_check, self.max_num )
+
+    def _time_left(self):
+        """根据 EWMA 速率估算剩余秒数，无法估算时返回 None"""
+        if not self.rate or self.max_num <= 0 or self.count >= self.max_num:
+            return None
+        return ( self.max_num - self.count ) / self.rate
+
+    def eta(self):
+        """Estimated Time of Arrival（预计完成时间），格式同 time_log，无法估算时返回空字符串"""
+        time_left = self._time_left()
+        if time_left is None:
+            return ""
+        end_time = datetime.now( _BJ_TZ ) + timedelta( seconds = time_left )
+        return f"eta {end_time.strftime( '%Y-%m-%d %H:%M' )}"
+
+    def etr(self):
+        """Estimated Time Remaining（预计剩余时间），格式同 time_log，无法估算时返回空字符串"""
+        time_left = self._time_left()
+        if time_left is None:
+            return ""
+        return f"etr {timedelta( seconds = int( time_left ) )}"
+
+    def progress_info(self):
+        """返回与 time_log 相同格式的进度信息，例如 "30/100 ( eta 2024-01-01 12:00 | etr 0:01:10 )" """
+        progress_info = "{}/{}".format( self.count, self.max_num )
+        eta_time_info = self.eta()
+        if eta_time_info:
+            progress_info = progress_info + f" ( {eta_time_info} | {self.etr()} )"
+        return progress_info
+
+    def log(self, message = None):
+        """
+        立即输出一次带时间戳的进度信息（不受输出间隔限制）
+
+        :param message: 日志消息，默认使用初始化时的 message
+        :return: 进度信息字符串
+        """
+        now = datetime.now( _BJ_TZ )
+        time_str = "{:02d}:{:02d}:{:02d}".format( now.hour, now.minute, now.second )
+        progress_info = self.progress_info()
+        text = time_str + " " + ( self.message if message is None else message ) + " " + progress_info
+        if self.level is not None:
+            color_logger.log( self.level, text )
+        else:
+            funcguard_logger.info( text )
+        return progress_info
+
+
+# 当前线程中正在运行的计时器栈，用于 timer() 自动嵌套
+_active_stopwatches = threading.local()
+
+
+# 高精度分段计时器
+class Stopwatch:
+    """
+    基于 perf_counter_ns 的高精度分段计时器，支持命名分段（lap）和嵌套子计时器
+
+    设计原理：
+    - 只在开始/结束/分段时读取一次 perf_counter_ns，记录为整数纳秒，不做任何格式化
+    - 仅在调用 summary() / to_dict() 时才计算和格式化结果，开销极低，适合在生产流水线中常驻
+    - 作为上下文管理器使用时，会自动挂载到当前线程中外层正在运行的 Stopwatch 之下，形成树状结构
+
+    示例：
+        with timer("pipeline", summary=True) as t:
+            load()
+            t.lap("load")
+            with timer("transform"):
+                transform()
+            save()
+            t.lap("save")
+        # pipeline: 1.234567s
+        # ├─ load: 0.500000s (40.5%)
+        # ├─ transform: 0.600000s (48.6%)
+        # └─ save: 0.134567s (10.9%)
+    """
+
+    __slots__ = ("name", "start_ns", "end_ns", "items", "_lap_ns", "_parent", "_summary", "_level")
+
+    def __init__(self, name = "stopwatch", summary = False, level = "info"):
+        """
+        :param name: 计时器名称
+        :param summary: 作为最外层上下文管理器退出时，是否自动通过 color_logger 打印树状汇总，默认 False
+        :param level: 打印汇总时使用的日志等级，默认 "info"
+        """
+        self.name = name
+        self.start_ns = None
+        self.end_ns = None
+        self.items = []  # 按时间顺序记录的分段 (名称, 纳秒) 和子计时器
+        self._lap_ns = None
+        self._parent = None
+        self._summary = summary
+        self._level = level
+
+    def start(self):
+        """开始计时，返回自身以便链式调用"""
+        self.start_ns = self._lap_ns = time.perf_counter_ns()
+        self.end_ns = None
+        return self
+
+    def stop(self):
+        """结束计时，返回总耗时（秒）"""
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+            # 子计时器的耗时已单独记录，父计时器的下一个分段从子计时器结束时开始，避免重复计算
+            if self._parent is not None:
+                self._parent._lap_ns = self.end_ns
+        return self.elapsed
+
+    def lap(self, name):
+        """
+        记录一个命名分段：自上一个分段、子计时器结束或开始计时以来的耗时
+
+        :param name: 分段名称
+        :return: 本分段耗时（秒）
+        """
+        now = time.perf_counter_ns()
+        if self._lap_ns is None:
+            raise RuntimeError(f"Stopwatch '{self.name}' 尚未开始计时")
+        elapsed_ns = now - self._lap_ns
+        self._lap_ns = now
+        self.items.append((name, elapsed_ns))
+        return elapsed_ns / 1e9
+
+    def child(self, name):
+        """
+        创建并启动一个子计时器，挂载在当前计时器下（可用作上下文管理器）
+
+        :param name: 子计时器名称
+        :return: 子 Stopwatch
+        """
+        sub = Stopwatch(name)
+        sub._parent = self
+        self.items.append(sub)
+        return sub.start()
+
+    @property
+    def elapsed_ns(self):
+        """总耗时（纳秒），计时未结束时返回截至当前的耗时"""
+        if self.start_ns is None:
+            return 0
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return end_ns - self.start_ns
+
+    @property
+    def elapsed(self):
+        """总耗时（秒）"""
+        return self.elapsed_ns / 1e9
+
+    def __enter__(self):
+        stack = getattr(_active_stopwatches, "stack", None)
+        if stack is None:
+            stack = _active_stopwatches.stack = []
+        if stack and self._parent is None:
+            self._parent = stack[-1]
+            stack[-1].items.append(self)
+        stack.append(self)
+        if self.start_ns is None or self.end_ns is not None:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        stack = _active_stopwatches.stack
+        if stack and stack[-1] is self:
+            stack.pop()
+        if self._summary and not stack:
+            self.summary(self._level)
+        return False
+
+    def to_dict(self):
+        """
+        导出计时结果
+
+        :return: {"name": 名称, "elapsed": 秒, "laps": [{"name", "elapsed"}], "children": [子计时器字典]}
+        """
+        laps, children = [], []
+        for item in self.items:
+            if isinstance(item, Stopwatch):
+                children.append(item.to_dict())
+            else:
+                laps.append({"name": item[0], "elapsed": item[1] / 1e9})
+        return {"name": self.name, "elapsed": self.elapsed, "laps": laps, "children": children}
+
+    def _tree_lines(self, prefix = "", parent_ns = None):
+        """生成树状汇总的文本行"""
+        lines = []
+        for i, item in enumerate(self.items):
+            last = i == len(self.items) - 1
+            branch = "└─ " if last else "├─ "
+            if isinstance(item, Stopwatch):
+                name, elapsed_ns = item.name, item.elapsed_ns
+            else:
+                name, elapsed_ns = item
+            text = f"{prefix}{branch}{name}: {elapsed_ns / 1e9:.6f}s"
+            if parent_ns:
+                text += f" ({elapsed_ns / parent_ns * 100:.1f}%)"
+            lines.append(text)
+            if isinstance(item, Stopwatch):
+                lines.extend(item._tree_lines(prefix + ("   " if last else "│  "), elapsed_ns))
+        return lines
+
+    def summary(self, level = "info"):
+        """
+        通过 color_logger 打印树状汇总
+
+        :param level: 日志等级，默认 "info"
+        :return: 汇总文本
+        """
+        total_ns = self.elapsed_ns
+        text = "\n".join([f"{self.name}: {total_ns / 1e9:.6f}s"] + self._tree_lines(parent_ns = total_ns))
+        color_logger.log(_normalize_level(level), text)
+        return text
+
+
+def timer(name = "timer", summary = False, level = "info"):
+    """
+    创建一个用作上下文管理器的 Stopwatch，嵌套使用时自动挂载为外层计时器的子计时器
+
+    :param name: 计时器名称
+    :param summary: 作为最外层计时器退出时，是否自动打印树状汇总，默认 False
+    :param level: 打印汇总时使用的日志等级，默认 "info"
+    :return: Stopwatch
+
+    示例：
+        with timer("step", summary=True) as t:
+            ...
+            t.lap("phase 1")
+    """
+    return Stopwatch(name, summary, level)
+
+
 # 计算持续时间
 def time_diff(s_time = None, max_num = 0, language = "cn", return_duration = 1) :
     """
@@ -89,7 +409,7 @@ def time_diff(s_time = None, max_num = 0, language = "cn", return_duration = 1)
     :return: 如果s_time为None则返回当前时间
     """
     # 获取当前时间并转换为北京时间
-    now = datetime.now( timezone( timedelta( hours = 8 ) ) )
+    now = datetime.now( _BJ_TZ )
 
     if s_time is None :
         return now
@@ -141,35 +461,112 @@ def time_monitor(warning_threshold=None, print_mode=2, func=None, *args, **kwarg
                       2 - 仅在超时打印警告信息（默认）
     :param func: 要监控的函数
     :param args: 函数的位置参数
-    :param kwargs: 函数的关键字参数
+    :param kwargs: 函数的关键字参数（原样传给 func）；高精度计时、慢调用分析、内存跟踪请使用 time_monitored
     :return: 
         print_mode == 0: 函数的执行结果, total_seconds
         print_mode == 1: 函数的执行结果
         print_mode == 2: 函数的执行结果
     """
-    s_time = datetime.now( timezone( timedelta( hours = 8 ) ) )
-    
     if func is None:
         raise ValueError("func is None, func must be a function")
-    
-    # 执行函数并获取结果
-    result = func(*args, **kwargs)
-    
-    # 计算执行时间
-    if print_mode in [ 0, 2 ]  :  # print_mode：0 和 2 需要 time_diff 内部不执行 print 但返回 total_seconds 信息
-        return_duration = 0
 
-    elif print_mode == 1 :
-        return_duration = 2
+    return time_monitored( warning_threshold, print_mode )( func )( *args, **kwargs )
 
-    else:
+
+def time_monitored(warning_threshold=None, print_mode=2, high_resolution=False, slow_profile=None,
+                   track_memory=False, memory_threshold=None):
+    """
+    time_monitor 的装饰器形式：监控选项在装饰时设置，调用被装饰函数时的参数全部原样传给原函数
+
+    :param warning_threshold: 警告阈值（秒），同 time_monitor
+    :param print_mode: 打印模式，同 time_monitor；为 0 时被装饰函数返回 (函数的执行结果, total_seconds)
+    :param high_resolution: 是否启用高精度模式，默认 False。
+                      启用后使用 perf_counter_ns 计时，total_seconds 为精确到纳秒的 float（而非取整的秒数），
+                      并将本次耗时记录到全局注册表 timing_registry，可通过 print_timing_report() 查看统计报告
+    :param slow_profile: 慢调用分析配置（SlowCallProfile），默认 None 不分析。
+                      设置后需同时设置 warning_threshold，耗时超过阈值时将调用栈和累计耗时表保存到文件，
+                      同一函数的捕获频率受 min_interval / max_captures 限制
+    :param track_memory: 是否跟踪内存使用，默认 False。启用后测量 tracemalloc 分配峰值、RSS 增量和已分配内存块增量，
+                      连同耗时一起记录到全局注册表 timing_registry，print_timing_report() 中会显示内存列
+    :param memory_threshold: 内存警告阈值（MB），需启用 track_memory，分配峰值超过此值时打印警告（规则同 print_mode）
+    :return: 装饰器
+
+    示例：
+        @time_monitored(1.5, high_resolution=True, track_memory=True)
+        def build_report(df):
+            ...
+
+        result = build_report(df)
+    """
+    if print_mode not in [ 0, 1, 2 ]:
         raise ValueError("print_mode must be 0, 1 or 2")
 
-    total_seconds = time_diff(s_time, return_duration=return_duration) # pyright: ignore[reportGeneralTypeIssues]
-    
+    if slow_profile is not None and warning_threshold is None:
+        raise ValueError("slow_profile 需要同时设置 warning_threshold")
+
+    if memory_threshold is not None and not track_memory:
+        raise ValueError("memory_threshold 需要同时启用 track_memory")
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return _monitor_call( func, args, kwargs, warning_threshold, print_mode,
+                                  high_resolution, slow_profile, track_memory, memory_threshold )
+
+        return wrapper
+
+    return decorator
+
+
+def _monitor_call(func, args, kwargs, warning_threshold, print_mode, high_resolution, slow_profile,
+                  track_memory, memory_threshold):
+    """执行一次被监控的调用，按 print_mode 打印耗时/内存信息并返回结果"""
+    sampler = arm_slow_call_sampler(func, slow_profile) if slow_profile is not None else None
+
+    if high_resolution or track_memory:
+        result, total_seconds, usage = _call_high_resolution(func, args, kwargs, sampler, track_memory)
+        if not high_resolution:
+            total_seconds = int( total_seconds )  # 未启用高精度模式时，与默认模式一样返回整数秒
+        if print_mode == 1:
+            print(f"函数 {func.__name__} 执行耗时 {total_seconds:.6f}秒" if high_resolution
+                  else f"函数 {func.__name__} 执行耗时 {total_seconds}秒")
+    else:
+        usage = None
+        s_time = datetime.now( _BJ_TZ )
+
+        # 执行函数并获取结果
+        result = _call_with_sampler(func, args, kwargs, sampler)
+
+        # 计算执行时间
+        if print_mode in [ 0, 2 ]  :  # print_mode：0 和 2 需要 time_diff 内部不执行 print 但返回 total_seconds 信息
+            return_duration = 0
+
+        else :
+            return_duration = 2
+
+        total_seconds = time_diff(s_time, return_duration=return_duration) # pyright: ignore[reportGeneralTypeIssues]
+
     # 根据打印模式决定是否打印耗时信息
-    if print_mode == 2 and warning_threshold is not None and total_seconds > warning_threshold:
-        print(f"警告: 函数 {func.__name__} 执行耗时 {total_seconds:.2f}秒，超过阈值 {warning_threshold}秒")
+    is_slow = warning_threshold is not None and total_seconds > warning_threshold
+    if print_mode == 2 and is_slow:
+        seconds_format = ".6f" if high_resolution else ".2f"
+        print(f"警告: 函数 {func.__name__} 执行耗时 {total_seconds:{seconds_format}}秒，超过阈值 {warning_threshold}秒")
+
+    # 根据打印模式决定是否打印内存信息
+    if usage is not None and print_mode != 0:
+        peak_mb = usage["peak_bytes"] / 1024 / 1024
+        rss_text = f"{usage['rss_delta'] / 1024 / 1024:+.2f}MB" if usage["rss_delta"] is not None else "未知"
+        memory_info = f"内存峰值 {peak_mb:.2f}MB，RSS 变化 {rss_text}，内存块变化 {usage['blocks_delta']:+d}"
+        if print_mode == 1:
+            print(f"函数 {func.__name__} {memory_info}")
+        if memory_threshold is not None and peak_mb > memory_threshold:
+            print(f"警告: 函数 {func.__name__} {memory_info}，超过阈值 {memory_threshold}MB")
+
+    # 超过阈值时保存慢调用分析报告
+    if slow_profile is not None and is_slow:
+        report_path = capture_slow_call(func, args, kwargs, total_seconds, warning_threshold, slow_profile, sampler)
+        if report_path and print_mode != 0:
+            print(f"慢调用分析报告已保存至: {report_path}")
 
     if print_mode == 0:
         return result, total_seconds
@@ -177,6 +574,38 @@ def time_monitor(warning_threshold=None, print_mode=2, func=None, *args, **kwarg
     return result
 
 
+def _call_with_sampler(func, args, kwargs, sampler):
+    """执行函数，存在采样分析器时仅在函数执行期间采样"""
+    if sampler is None:
+        return func(*args, **kwargs)
+    sampler.start()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sampler.stop()
+
+
+def _call_high_resolution(func, args, kwargs, sampler, track_memory):
+    """
+    使用 perf_counter_ns 计时执行函数，并将耗时（及内存使用）记录到全局注册表
+
+    :return: (函数的执行结果, 耗时秒数 float, 内存使用字典或 None)
+    """
+    name = _func_name(func)
+    probe = MemoryProbe().start() if track_memory else None
+    usage = None
+    start = time.perf_counter_ns()
+    try:
+        result = _call_with_sampler(func, args, kwargs, sampler)
+    finally:
+        elapsed_ns = time.perf_counter_ns() - start
+        timing_registry.record(name, elapsed_ns)
+        if probe is not None:
+            usage = probe.stop()
+            timing_registry.record_memory(name, usage)
+    return result, elapsed_ns / 1e9, usage
+
+
 # 获取当前的时间
 def get_now( from_timezone: Literal[ "local", "utc", "bj", "jp" ] = "local", 
             remove_tzinfo = True, 
@@ -210,7 +639,7 @@ def get_now( from_timezone: Literal[ "local", "utc", "bj", "jp" ] = "local",
         now_time = datetime.now( timezone.utc )  # 获取当前UTC时间 (tz-aware) ，包含时区信息
 
     elif from_timezone == "bj" :   # 固定北京时间 (tz-aware) ，包含时区信息
-        now_time = datetime.now( timezone( timedelta( hours = 8 ) ) )
+        now_time = datetime.now( _BJ_TZ )
 
     elif from_timezone == "jp" :   # 固定东京时间 (tz-aware) ，包含时区信息
         now_time = datetime.now( timezone( timedelta( hours = 9 ) ) )
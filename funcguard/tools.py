@@ -7,6 +7,7 @@ from curl_cffi import requests as cffi_requests
 
 from typing import Any, Literal
 from .core import retry_function
+from .log_utils import funcguard_logger
 from .models import RequestLog
 
 # HTTP 方法类型别名
@@ -216,7 +217,7 @@ def send_request(
                     res_log[key] = value
             with open(request_log.save_path, "w", encoding="utf-8") as f:
                 json.dump(res_log, f, ensure_ascii=False, indent=4)
-            print(f"Request log saved to: {request_log.save_path}")
+            funcguard_logger.info("Request log saved to: %s", request_log.save_path)
 
     elif return_type == "response":
         return response
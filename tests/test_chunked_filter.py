@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import pd_count_chunks, pd_filter, pd_filter_chunks, pd_filter_to_file
+
+
+def _orders(n: int = 2500) -> pd.DataFrame:
+    rng = np.random.default_rng(12)
+    return pd.DataFrame(
+        {
+            "order_id": np.arange(n),
+            "status": rng.choice(["paid", "refund", "open"], n),
+            "amount": np.round(rng.random(n) * 500, 2),
+            "note": rng.choice(["", "vip", "gift"], n),
+        }
+    )
+
+
+CONDITIONS = [("status", "==", "paid"), ("amount", ">", 100)]
+
+
+def test_csv_chunks_match_in_memory_filter(tmp_path):
+    df = _orders()
+    path = tmp_path / "orders.csv"
+    df.to_csv(path, index=False)
+    expected = pd_filter(df, CONDITIONS)[["order_id", "amount"]].reset_index(drop=True)
+
+    chunks = list(pd_filter_chunks(path, CONDITIONS, columns=["order_id", "amount"], chunksize=400))
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    expression = {"or": [("status", "==", "refund"), {"not": ("amount", "<", 450)}]}
+    assert pd_count_chunks(path, expression, chunksize=300) == len(pd_filter(df, expression))
+
+    # DataFrame 分块迭代器
+    reader = pd.read_csv(path, chunksize=700)
+    assert sum(len(c) for c in pd_filter_chunks(reader, ("note", "==", "vip"))) == int((df["note"] == "vip").sum())
+
+
+def test_filter_to_csv_file(tmp_path):
+    df = _orders()
+    source, output = tmp_path / "orders.tsv", tmp_path / "paid.csv"
+    df.to_csv(source, index=False, sep="\t")
+
+    written = pd_filter_to_file(source, output, CONDITIONS, columns=["order_id", "status"], chunksize=500)
+    result = pd.read_csv(output)
+    assert written == len(result) == len(pd_filter(df, CONDITIONS))
+    assert list(result.columns) == ["order_id", "status"]
+
+    # 没有满足条件的行时只写入表头
+    assert pd_filter_to_file(source, output, ("amount", ">", 10_000), chunksize=500) == 0
+    assert list(pd.read_csv(output).columns) == list(df.columns)
+
+
+def test_parquet_row_group_pushdown(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _orders().sort_values("amount", ignore_index=True)
+    path, output = tmp_path / "orders.parquet", tmp_path / "big.parquet"
+    df.to_parquet(path, row_group_size=250, index=False)
+
+    chunks = list(pd_filter_chunks(path, [("amount", ">=", 480)], columns=["order_id"], chunksize=100))
+    assert sum(len(c) for c in chunks) == int((df["amount"] >= 480).sum())
+    assert pd_filter_to_file(path, output, [("amount", ">=", 480)]) == int((df["amount"] >= 480).sum())
+    pd.testing.assert_frame_equal(pd.read_parquet(output), pd_filter(df, [("amount", ">=", 480)]).reset_index(drop=True))
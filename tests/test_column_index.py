@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import ColumnIndex, DataFrameStatistics
+from funcguard.pd_utils.statistics.mask_utils import _series_mask
+
+
+def _frame(n: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    return pd.DataFrame(
+        {
+            "code": rng.integers(0, 6, n),
+            "score": np.where(rng.random(n) < 0.2, np.nan, rng.integers(0, 4, n)),
+            "mixed": rng.choice(np.array([1, 1.0, "1", "a", None, np.nan], dtype=object), n),
+            "city": pd.Series(rng.choice(["bj", "sh", None], n)).astype("category"),
+            "name": rng.choice(["x", "y", None], n),
+        }
+    )
+
+
+def test_index_lookups_match_column_scans():
+    df = _frame()
+    cases = [
+        ("==", 1), ("!=", 1), ("==", 1.5), ("==", "a"), ("!=", "zz"),
+        ("in", [1, "a"]), ("not in", [0, 2.0]), ("in", []), ("in", {"bj", "x"}),
+    ]
+    for column in df.columns:
+        index = ColumnIndex(df[column])
+        for op, value in cases:
+            expected = _series_mask(df[column], op, value).to_numpy(dtype=bool)
+            np.testing.assert_array_equal(index.mask(op, value), expected)
+            np.testing.assert_array_equal(index.positions(op, value), np.flatnonzero(expected))
+            assert index.count(op, value) == int(expected.sum())
+
+    # 布尔值比较、in 中包含空值时交给整列扫描
+    assert ColumnIndex(df["code"]).mask("==", True) is None
+    assert ColumnIndex(df["score"]).positions("in", [np.nan]) is None
+    with pytest.raises(TypeError):
+        ColumnIndex(pd.Series([1, None], dtype="Int64"))
+
+
+def test_statistics_uses_opt_in_indexes():
+    df = _frame()
+    stats = DataFrameStatistics(df)
+    stats.create_index("code", "city")
+    conditions = [("code", "in", [1, 2]), ("city", "!=", "bj")]
+
+    fresh = DataFrameStatistics(df, cache_size=0)
+    assert stats.count(("code", "==", 3)) == fresh.count(("code", "==", 3))
+    assert stats.count(conditions) == fresh.count(conditions)
+    assert stats.count(conditions, "or") == fresh.count(conditions, "or")
+    assert stats.value_counts("name", conditions=conditions) == fresh.value_counts("name", conditions=conditions)
+    # 条件中包含未建索引的列时回退为普通求值
+    assert stats.count(conditions + [("score", ">", 1)]) == fresh.count(conditions + [("score", ">", 1)])
+
+    # 数据变化后索引自动重建
+    df["code"] = df["code"] + 1
+    assert stats.count(("code", "==", 6)) == int((df["code"] == 6).sum())
+    stats.drop_index()
+    assert stats.count(("code", "==", 6)) == int((df["code"] == 6).sum())
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from funcguard import ConditionPlanner, DataFrameStatistics, pd_count
+from funcguard.pd_utils.statistics.mask_utils import _combine_condition_masks
+
+
+def _frame(n: int = 20000) -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    return pd.DataFrame(
+        {
+            "name": rng.choice(["alpha", "beta", "gamma_test", None], n),
+            "code": rng.integers(0, 500, n).astype(str),
+            "x": rng.random(n),
+        }
+    )
+
+
+def test_planner_puts_cheap_selective_conditions_first():
+    df = _frame()
+    conditions = [("name", "contains", "test"), ("code", "==", "7"), ("x", ">", 0.2)]
+    plan = ConditionPlanner().plan(df, conditions, "and")
+    assert plan.order[-1] == ("name", "contains", "test")
+    assert "('name', 'contains', 'test')" in plan.explain()
+
+    or_plan = ConditionPlanner().plan(df, conditions, "or")
+    assert or_plan.order[0] == ("x", ">", 0.2)
+
+
+def test_planned_evaluation_matches_loop():
+    df = _frame()
+    stats = DataFrameStatistics(df)
+    for logic in ("and", "or"):
+        conditions = [("name", "contains", "test"), ("code", "!=", "7"), ("x", "<=", 0.5), ("name", "not empty")]
+        expected = int(_combine_condition_masks(df, conditions, logic).sum())
+        assert pd_count(df, conditions, logic) == expected
+        assert stats.count(conditions, logic) == expected
+
+    expression = {"or": [("name", "endswith", "test"), {"and": [("code", "==", "7"), {"not": ("x", ">", 0.9)}]}]}
+    expected = df["name"].str.endswith("test", na=False) | ((df["code"] == "7") & ~(df["x"] > 0.9))
+    assert pd_count(df, expression) == int(expected.sum())
+    assert stats.explain(expression).startswith("执行计划")
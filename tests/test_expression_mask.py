@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from funcguard import DataFrameStatistics, pd_count, pd_filter
+from funcguard.pd_utils.statistics import mask_utils
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    n = 300
+    return pd.DataFrame(
+        {
+            "age": rng.integers(10, 60, n),
+            "dept": rng.choice(["IT", "HR", "Ops"], n),
+            "name": rng.choice(["alice", "bob", "test_user", None], n),
+            "tags": [[] if i % 4 == 0 else ["x"] for i in range(n)],
+        },
+        index=pd.RangeIndex(0, 2 * n, 2),
+    )
+
+
+EXPRESSION = {
+    "or": [
+        {"and": [("age", ">", 40), {"not": ("name", "contains", "test")}]},
+        {"and": [("dept", "==", "HR"), ("tags", "not empty")]},
+    ]
+}
+
+
+def _expected(df: pd.DataFrame) -> pd.Series:
+    name_has_test = df["name"].str.contains("test", na=False)
+    tags_not_empty = df["tags"].apply(len) > 0
+    return ((df["age"] > 40) & ~name_has_test) | ((df["dept"] == "HR") & tags_not_empty)
+
+
+def test_nested_expression_matches_manual_masks():
+    df = _frame()
+    expected = _expected(df)
+
+    pd.testing.assert_frame_equal(pd_filter(df, EXPRESSION), df[expected])
+    assert pd_count(df, EXPRESSION) == int(expected.sum())
+    assert DataFrameStatistics(df).count(EXPRESSION) == int(expected.sum())
+
+    # 列表中混合条件元组与分组，按 logic 组合
+    mixed = [("dept", "!=", "Ops"), {"or": [("age", "<", 20), ("age", ">=", 50)]}]
+    expected_mixed = (df["dept"] != "Ops") & ((df["age"] < 20) | (df["age"] >= 50))
+    pd.testing.assert_frame_equal(pd_filter(df, mixed), df[expected_mixed])
+
+
+def test_and_group_short_circuits_expensive_predicates(monkeypatch):
+    df = _frame()
+    evaluated_rows = []
+    original = mask_utils._empty_mask
+    monkeypatch.setattr(mask_utils, "_empty_mask", lambda s: evaluated_rows.append(len(s)) or original(s))
+
+    pd_count(df, {"and": [("dept", "==", "HR"), ("tags", "not empty")]})
+    assert evaluated_rows == [int((df["dept"] == "HR").sum())]
+
+    evaluated_rows.clear()
+    pd_count(df, {"or": [("dept", "!=", "HR"), ("tags", "not empty")]})
+    assert evaluated_rows == [int((df["dept"] == "HR").sum())]
+
+
+def test_mixed_object_column_in_short_circuited_groups():
+    # 仍需求值的行中 code 只有整数，.str 无法在这些行上使用，回退为整列求值
+    df = pd.DataFrame({"a": [1, 2, 3], "code": pd.Series([1, 2, "xa"], dtype=object)})
+    assert pd_filter(df, {"and": [("a", "<", 3), ("code", "contains", "x")]}).empty
+    assert pd_filter(df, {"or": [("a", "<", 3), ("code", "contains", "x")]}).index.tolist() == [0, 1, 2]
+    assert pd_filter(df, {"or": [("a", ">", 2), ("code", "contains", "x")]}).index.tolist() == [2]
+
+
+def test_not_keeps_nullable_results_unknown():
+    df = pd.DataFrame({"x": pd.array([1, None, 3], dtype="Int64"), "y": [5, 5, 0]})
+    assert pd_filter(df, {"not": ("x", ">", 1)}).index.tolist() == df[~(df.x > 1)].index.tolist() == [0]
+
+    rng = np.random.default_rng(3)
+    n = 400
+    df = pd.DataFrame({
+        "x": pd.array(np.where(rng.random(n) < 0.3, None, rng.integers(0, 10, n)), dtype="Int64"),
+        "y": rng.integers(0, 10, n),
+    })
+    x_big, x_small, y_big = df.x > 4, df.x < 3, df.y > 4
+    cases = [
+        ({"not": {"and": [("x", ">", 4), ("y", ">", 4)]}}, ~(x_big & y_big)),
+        ({"not": {"or": [("x", ">", 4), ("y", ">", 4)]}}, ~(x_big | y_big)),
+        ({"and": [{"not": ("x", ">", 4)}, ("y", ">", 4)]}, ~x_big & y_big),
+        ({"or": [{"not": ("x", "<", 3)}, {"not": ("y", ">", 4)}]}, ~x_small | ~y_big),
+        ({"not": {"or": [("x", ">", 4), ("x", "<", 3)]}}, ~(x_big | x_small)),
+        ({"not": {"not": ("x", ">", 4)}}, x_big),
+    ]
+    for expression, expected in cases:
+        pd.testing.assert_frame_equal(pd_filter(df, expression), df[expected])
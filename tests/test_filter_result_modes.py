@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import pd_filter, pd_select_columns
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "age": [22, 35, 41, 29, 53, 38],
+            "dept": ["IT", "HR", "IT", "Sales", "IT", "HR"],
+            "score": pd.array([1, None, 3, 4, None, 2], dtype="Int64"),
+        },
+        index=list("abcdef"),
+    )
+
+
+def test_positions_and_mask_results():
+    df = _frame()
+    conditions = [("dept", "==", "IT"), ("score", ">", 1)]
+    expected = pd_filter(df, conditions)
+
+    positions = pd_filter(df, conditions, result="positions")
+    np.testing.assert_array_equal(positions, [2])
+    pd.testing.assert_frame_equal(df.iloc[positions], expected)
+
+    mask = pd_filter(df, conditions, result="mask")
+    assert mask.dtype == bool and mask.index.equals(df.index)
+    pd.testing.assert_frame_equal(df[mask], expected)
+
+    assert pd_filter(df, [], result="mask").all()
+    assert len(pd_filter(df.iloc[:0], ("age", ">", 30), result="positions")) == 0
+    with pytest.raises(ValueError):
+        pd_filter(df, ("age", ">", 30), result="rows")
+
+
+def test_view_and_frame_results_are_isolated():
+    df = _frame()
+    original = df.copy()
+
+    view = pd_filter(df, ("age", ">=", 35), result="view")
+    pd.testing.assert_frame_equal(view, pd_filter(df, ("age", ">=", 35)))
+    # 连续的匹配行返回切片
+    contiguous = pd_filter(df, ("age", "in", [35, 41]), result="view")
+    assert list(contiguous.index) == ["b", "c"]
+
+    for result in (view, contiguous, pd_filter(df, ("dept", "==", "IT")), pd_select_columns(df, ["age"])):
+        result.loc[result.index[0], "age"] = -1
+    pd.testing.assert_frame_equal(df, original)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import DataFrameStatistics, pd_group_agg
+
+
+def _sales(n: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(
+        {
+            "region": rng.choice(["north", "south", None], n),
+            "dept": pd.Categorical(rng.choice(["IT", "HR"], n), categories=["IT", "HR", "Ops", "Legal"]),
+            "amount": rng.random(n) * 1000,
+            "qty": rng.integers(0, 100, n).astype("int32"),
+            "level": rng.integers(0, 5, n).astype("int8"),
+        }
+    )
+    df.loc[::13, "amount"] = np.nan
+    # 全为空值的分组：min/max/mean 为 NaN，sum 为 0
+    df.loc[(df["dept"] == "HR") & (df["level"] == 0), "amount"] = np.nan
+    return df
+
+
+NAMED = {
+    "total": ("amount", "sum"),
+    "avg": ("amount", "mean"),
+    "low": ("amount", "min"),
+    "high": ("amount", "max"),
+    "n": ("amount", "count"),
+    "qty": ("qty", "sum"),
+    "qty_avg": ("qty", "mean"),
+    "level_max": ("level", "max"),
+    "level_sum": ("level", "sum"),
+}
+
+
+@pytest.mark.parametrize("keys", ["region", "dept", ["region", "dept"], ["dept", "level"]])
+def test_fast_path_matches_groupby(keys):
+    df = _sales()
+    expected = df.groupby(keys, observed=True).agg(**NAMED)
+    result = pd_group_agg(df, keys, aggs=NAMED, return_type="df")
+    pd.testing.assert_frame_equal(result, expected, check_exact=False)
+    # 未出现的类别不展开
+    if keys == "dept":
+        assert list(result.index) == ["IT", "HR"]
+
+
+def test_multiple_columns_and_functions():
+    df = _sales()
+    result = pd_group_agg(df, "region", ["amount", "qty"], ["sum", "median"], sort="desc", return_type="df")
+    assert list(result.columns) == ["amount_sum", "amount_median", "qty_sum", "qty_median"]
+    assert result["amount_sum"].is_monotonic_decreasing
+    expected = df.groupby("region")["qty"].median()
+    pd.testing.assert_series_equal(result["qty_median"].sort_index(), expected, check_names=False)
+
+    as_dict = pd_group_agg(df, ["region", "dept"], ["qty", "level"], "max", conditions=("qty", ">", 50))
+    filtered = df[df["qty"] > 50]
+    assert as_dict == filtered.groupby(["region", "dept"], observed=True)[["qty", "level"]].max().to_dict(orient="index")
+
+    # 单个聚合保持原有的返回格式
+    assert pd_group_agg(df, "region", "qty", "sum") == df.groupby("region")["qty"].sum().to_dict()
+    stats = DataFrameStatistics(df)
+    assert stats.group_agg("region", aggs={"n": ("qty", "count")}) == {
+        region: {"n": count} for region, count in df.groupby("region")["qty"].count().items()
+    }
+
+    with pytest.raises(ValueError):
+        pd_group_agg(df, "region", ["amount", "qty"], "sum", return_type="series")
+    with pytest.raises(ValueError):
+        pd_group_agg(df, "region", "qty", aggs={"n": ("qty", "count")})
+    with pytest.raises(ValueError):
+        pd_group_agg(df, "region", aggs={"n": ("qty", "first")})
+
+
+@pytest.mark.parametrize("dtype", ["uint8", "uint16", "uint64", "int8"])
+def test_integer_sum_and_mean_dtypes_match_groupby(dtype):
+    rng = np.random.default_rng(3)
+    high = min(np.iinfo(dtype).max, 2 ** 62)
+    df = pd.DataFrame({"g": rng.integers(0, 3, 200), "v": rng.integers(0, high, 200, dtype=np.uint64).astype(dtype)})
+    named = {"total": ("v", "sum"), "avg": ("v", "mean"), "low": ("v", "min")}
+
+    result = pd_group_agg(df, "g", aggs=named, return_type="df")
+    expected = df.groupby("g").agg(**named)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False)
+    # 窄整数的和超出原类型范围时，无符号为 uint64，有符号为 int64
+    assert result["total"].dtype == (np.uint64 if dtype.startswith("u") else np.int64)
@@ -0,0 +1,33 @@
+import pytest
+
+from funcguard.ip_utils import IPRangeIndex
+
+
+def test_lookup_prefers_most_specific_overlapping_range():
+    index = IPRangeIndex(
+        ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "192.168.1.10-192.168.1.20"],
+        ["a", "b", "c", "d"],
+    )
+
+    assert index.lookup_many(
+        ["10.2.0.1", "10.1.5.5", "10.1.2.200", "10.255.255.255", "11.0.0.0", "192.168.1.20", "192.168.1.21"]
+    ) == ["a", "b", "c", "a", None, "d", None]
+    assert index.lookup(int(0x0A010203)) == "c"
+
+
+def test_save_and_load_with_mmap(tmp_path):
+    index = IPRangeIndex(["10.0.0.0/8", "10.0.0.0/24"], ["x", "y"])
+    path = tmp_path / "ranges.idx"
+    index.save(path)
+
+    loaded = IPRangeIndex.load(path)
+
+    assert loaded.lookup_many(["10.0.0.1", "10.0.1.1", "9.9.9.9"]) == ["y", "x", None]
+
+
+def test_lookup_many_rejects_malformed_addresses():
+    index = IPRangeIndex(["0.0.0.0/0"], ["x"])
+
+    for ips in (["10.0.0.1.10", "0.0.1"], ["10.0.0.1", "10.0.0.256"], ["10.0.0.-1"], ["10..0.1"]):
+        with pytest.raises(ValueError):
+            index.lookup_many(ips)
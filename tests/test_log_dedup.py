@@ -0,0 +1,69 @@
+import io
+import logging
+
+from funcguard import DedupFilter, configure_funcguard_logger, time_log
+
+
+def test_dedup_filter_collapses_repeated_messages():
+    stream = io.StringIO()
+    logger = logging.getLogger("test_dedup")
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    logger.addHandler(handler)
+    dedup = DedupFilter(window=60, burst=2)
+    logger.addFilter(dedup)
+    try:
+        for _ in range(10):
+            logger.warning("连接失败: %s", "upstream down")
+        logger.warning("其他消息")
+        dedup.flush(logger)
+    finally:
+        logger.removeHandler(handler)
+        logger.removeFilter(dedup)
+
+    lines = stream.getvalue().splitlines()
+    assert lines[:3] == ["连接失败: upstream down", "连接失败: upstream down", "其他消息"]
+    assert len(lines) == 4
+    assert lines[3].startswith("连接失败: upstream down（") and "重复 8 次" in lines[3]
+
+
+def test_funcguard_logger_silent_mode(capsys):
+    try:
+        configure_funcguard_logger(silent=True)
+        time_log("静默")
+        assert capsys.readouterr().out == ""
+
+        configure_funcguard_logger()
+        time_log("输出")
+        assert capsys.readouterr().out.endswith(" 输出\n")
+    finally:
+        configure_funcguard_logger()
+
+
+def test_repeated_time_log_lines_are_all_emitted_by_default(capsys):
+    try:
+        configure_funcguard_logger()
+        for _ in range(20):
+            time_log("同一耗时")
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 20 and all(line.endswith(" 同一耗时") for line in lines)
+
+        # 重试等 WARNING 信息仍按默认的 burst=5 去重
+        logger = logging.getLogger("funcguard")
+        for _ in range(20):
+            logger.warning("请求失败，正在重试")
+        assert capsys.readouterr().out.splitlines() == ["请求失败，正在重试"] * 5
+    finally:
+        configure_funcguard_logger()
+    capsys.readouterr()
+
+
+def test_dedup_level_option(capsys):
+    try:
+        configure_funcguard_logger(dedup_level="info", burst=2)
+        for _ in range(5):
+            time_log("重复")
+        assert len(capsys.readouterr().out.splitlines()) == 2
+    finally:
+        configure_funcguard_logger()
+    capsys.readouterr()
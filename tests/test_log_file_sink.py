@@ -0,0 +1,42 @@
+import gzip
+import json
+import logging
+
+from funcguard import setup_logger
+
+
+def _close(logger: logging.Logger) -> None:
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def test_json_file_sink_rotates_and_compresses(tmp_path):
+    log_file = tmp_path / "logs" / "app.log"
+    logger = setup_logger(
+        "test_json_sink", level="info", log_file=str(log_file), max_bytes=300, backup_count=2
+    )
+    # 重复调用不会重复添加同一文件的 handler
+    setup_logger("test_json_sink", level="info", log_file=str(log_file))
+    assert len(logger.handlers) == 2
+
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("被过滤的日志不应格式化消息")
+
+    logger.debug("%s", Unformattable())
+    for i in range(30):
+        logger.success("msg %d", i, extra={"user": "张三"})
+    _close(logger)
+
+    names = sorted(p.name for p in log_file.parent.iterdir())
+    assert names == ["app.log", "app.log.1.gz", "app.log.2.gz"]
+
+    last = json.loads(log_file.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["level"] == "SUCCESS"
+    assert last["message"] == "msg 29"
+    assert last["user"] == "张三"
+
+    with gzip.open(log_file.parent / "app.log.1.gz", "rt", encoding="utf-8") as f:
+        rotated = [json.loads(line) for line in f]
+    assert rotated and all(r["logger"] == "test_json_sink" for r in rotated)
@@ -0,0 +1,135 @@
+import io
+import logging
+import threading
+
+import pytest
+
+from funcguard import configure_funcguard_logger, setup_logger
+from funcguard import log_utils
+from funcguard.log_utils import _NonBlockingQueueHandler
+
+
+@pytest.fixture
+def close_queues():
+    yield
+    for handler in list(log_utils._non_blocking_handlers):
+        handler.close()
+
+
+def _queue_handlers(logger):
+    return [handler for handler in logger.handlers if isinstance(handler, _NonBlockingQueueHandler)]
+
+
+def _close(logger):
+    for handler in _queue_handlers(logger):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_queue_handler_writes_everything_on_close(close_queues):
+    stream = io.StringIO()
+    logger = setup_logger("test_nb_close", stream=stream, message_only=True, non_blocking=True)
+    for i in range(1000):
+        logger.info("line %d", i)
+    handlers = _queue_handlers(logger)
+    _close(logger)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1000
+    assert "line 0" in lines[0] and "line 999" in lines[-1]
+    assert all(handler not in log_utils._non_blocking_handlers for handler in handlers)
+
+
+class _SlowStream(io.StringIO):
+    """第一次写入时阻塞，直到测试放行"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        if not self.entered.is_set():
+            self.entered.set()
+            self.release.wait(timeout=10)
+        return super().write(text)
+
+
+def test_drop_on_full_counts_and_reports_dropped(close_queues):
+    stream = _SlowStream()
+    logger = logging.getLogger("test_nb_drop")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    target = logging.StreamHandler(stream)
+    handler = _NonBlockingQueueHandler(target, maxsize=2, overflow="drop")
+    logger.addHandler(handler)
+
+    logger.info("first")
+    assert stream.entered.wait(timeout=10)  # 后台线程已取出第一条并阻塞在写入
+    for i in range(10):
+        logger.info("queued %d", i)
+    assert handler.dropped == 8
+    stream.release.set()
+    _close(logger)
+
+    text = stream.getvalue()
+    assert text.splitlines()[:3] == ["first", "queued 0", "queued 1"]
+    assert "共丢弃 8 条日志" in text
+
+
+def test_block_overflow_loses_nothing(close_queues):
+    stream = io.StringIO()
+    logger = setup_logger("test_nb_block", stream=stream, message_only=True,
+                          non_blocking=True, queue_size=4, overflow="block")
+    for i in range(500):
+        logger.info("%d", i)
+    _close(logger)
+    assert len(stream.getvalue().splitlines()) == 500
+
+
+def test_existing_blocking_handler_is_wrapped(close_queues):
+    stream = io.StringIO()
+    logger = setup_logger("test_nb_wrap", stream=stream, message_only=True)
+    assert not _queue_handlers(logger)
+
+    same = setup_logger("test_nb_wrap", non_blocking=True)
+    assert same is logger
+    assert len(logger.handlers) == 1 and _queue_handlers(logger)
+    assert logger.handlers[0].target.stream is stream
+
+    logger.info("hello")
+    _close(logger)
+    assert stream.getvalue().count("hello") == 1
+
+
+def test_listener_respects_target_level_and_filters(close_queues):
+    stream = io.StringIO()
+    logger = logging.getLogger("test_nb_filters")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    target = logging.StreamHandler(stream)
+    target.setLevel(logging.INFO)
+    target.addFilter(lambda record: "secret" not in record.getMessage())
+    logger.addHandler(_NonBlockingQueueHandler(target, maxsize=100, overflow="drop"))
+
+    logger.debug("debug line")
+    logger.info("public line")
+    logger.info("secret line")
+    _close(logger)
+
+    assert stream.getvalue().splitlines() == ["public line"]
+
+
+def test_funcguard_logger_can_switch_to_non_blocking(close_queues):
+    stream = io.StringIO()
+    try:
+        logger = configure_funcguard_logger(stream=stream, dedup=False, non_blocking=True)
+        assert len(_queue_handlers(logger)) == 1
+        logger.info("async")
+
+        # 重新配置时先写完旧队列中的日志
+        configure_funcguard_logger(stream=stream, dedup=False)
+        assert stream.getvalue() == "async\n"
+        assert not _queue_handlers(logger)
+    finally:
+        configure_funcguard_logger()
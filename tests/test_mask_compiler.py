@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard.pd_utils.statistics.mask_compiler import compile_conditions
+from funcguard.pd_utils.statistics.mask_utils import _combine_condition_masks, build_base_mask
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame(
+        {
+            "i": rng.integers(-5, 5, n),
+            "u": rng.integers(0, 10, n).astype("uint8"),
+            "f": np.where(rng.random(n) < 0.2, np.nan, rng.normal(size=n)),
+            "f32": rng.random(n).astype("float32"),
+            "b": rng.random(n) < 0.5,
+            "s": rng.choice(["a", "b", "ab", "", None], n),
+            "ni": pd.array(np.where(rng.random(n) < 0.2, None, rng.integers(0, 3, n)), dtype="Int64"),
+            "d": pd.date_range("2024-01-01", periods=n, freq="h"),
+        },
+        index=pd.RangeIndex(100, 100 + n),
+    )
+
+
+CONDITIONS = [
+    ("i", ">", 0),
+    ("i", "<=", 2.5),
+    ("u", ">", -1),
+    ("u", "!=", 3),
+    ("f", ">=", 0.1),
+    ("f", "!=", 0.5),
+    ("f", "null"),
+    ("f", "not null"),
+    ("f32", "<", 0.1),
+    ("b", "==", True),
+    ("b", False),
+    ("i", "in", [1, 2, 3]),
+    ("f", "in", [np.nan, 1.0]),
+    ("i", "not in", [0]),
+    ("s", "contains", "a"),
+    ("s", "==", "ab"),
+    ("s", "not empty"),
+    ("ni", ">", 0),
+    ("d", ">", "2024-01-05"),
+]
+
+
+@pytest.mark.parametrize("logic", ["and", "or"])
+def test_fused_mask_matches_loop_exactly(logic):
+    df = _frame()
+    combos = [list(c) for c in itertools.combinations(CONDITIONS, 2)] + [CONDITIONS[:11], CONDITIONS]
+    for conditions in combos:
+        expected = _combine_condition_masks(df, conditions, logic)
+        result = build_base_mask(df, conditions, logic)
+        pd.testing.assert_series_equal(result, expected)
+
+        seed = pd.Series(np.arange(len(df)) % 3 == 0, index=df.index)
+        expected = _combine_condition_masks(df, conditions, logic, seed, seed)
+        result = build_base_mask(df, conditions, logic, seed, seed)
+        pd.testing.assert_series_equal(result, expected)
+
+
+def test_compiled_conditions_reusable_and_fall_back_on_nullable_results():
+    df = _frame()
+    compiled = compile_conditions([("i", ">", 0), ("f", "not null")])
+    pd.testing.assert_series_equal(compiled(df), _combine_condition_masks(df, compiled.conditions))
+    pd.testing.assert_series_equal(compiled(df.head(10)), _combine_condition_masks(df.head(10), compiled.conditions))
+
+    # 可空整数列的比较结果为可空布尔类型，无法融合求值
+    assert compile_conditions([("ni", ">", 0)])(df) is None
+
+
+def test_short_circuit_on_mixed_object_column_matches_full_column():
+    # 仍需求值的行中 code 只有整数，.str 无法在这些行上使用，回退为整列求值
+    df = pd.DataFrame({"a": [1, 2, 3], "code": pd.Series([1, 2, "xa"], dtype=object)})
+    assert build_base_mask(df, [("a", "<", 3), ("code", "contains", "x")]).tolist() == [False, False, False]
+    assert build_base_mask(df, [("a", ">", 2), ("code", "contains", "x")], "or").tolist() == [False, False, True]
+
+    # 抽样行中没有字符串时按默认选择率估算，不影响求值结果
+    big = pd.DataFrame({"a": np.arange(5000), "code": pd.Series([1] * 5000, dtype=object)})
+    big.loc[4998, "code"] = "xa"
+    mask = build_base_mask(big, [("a", ">", 10), ("code", "contains", "x")])
+    assert mask[mask].index.tolist() == [4998]
@@ -0,0 +1,96 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from funcguard.monitor_utils import MemoryProbe, TimingRegistry, timed
+
+_MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def no_external_tracing():
+    assert not tracemalloc.is_tracing()
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        pytest.fail("tracemalloc 未在最后一个探针结束时停止")
+
+
+def test_nested_probe_keeps_outer_peak():
+    outer = MemoryProbe().start()
+    buffer = bytearray(8 * _MB)
+    del buffer
+    inner = MemoryProbe().start()
+    small = bytearray(_MB)
+    inner_usage = inner.stop()
+    del small
+    outer_usage = outer.stop()
+
+    assert outer_usage["peak_bytes"] >= 8 * _MB
+    assert _MB <= inner_usage["peak_bytes"] < 2 * _MB
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_timed_decorators():
+    registry = TimingRegistry()
+
+    @timed(name="inner", registry=registry, track_memory=True)
+    def inner():
+        return len(bytearray(_MB))
+
+    @timed(name="outer", registry=registry, track_memory=True)
+    def outer():
+        buffer = bytearray(4 * _MB)
+        del buffer
+        return inner()
+
+    outer()
+    assert registry.get("outer")["peak_max_mb"] >= 4
+    assert 1 <= registry.get("inner")["peak_max_mb"] < 2
+
+
+def test_probe_stopping_first_does_not_stop_other_thread():
+    started, first_stopped = threading.Event(), threading.Event()
+    usage = {}
+
+    def worker():
+        probe = MemoryProbe().start()
+        started.set()
+        first_stopped.wait(timeout=10)
+        buffer = bytearray(4 * _MB)
+        del buffer
+        usage["worker"] = probe.stop()
+
+    first = MemoryProbe().start()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait(timeout=10)
+    usage["first"] = first.stop()
+    still_tracing = tracemalloc.is_tracing()
+    first_stopped.set()
+    thread.join()
+
+    assert still_tracing
+
+    assert usage["worker"]["peak_bytes"] >= 4 * _MB
+    assert usage["first"]["peak_bytes"] < 4 * _MB
+
+
+def test_external_tracing_is_reused_and_left_running():
+    tracemalloc.start()
+    try:
+        buffer = bytearray(8 * _MB)
+        del buffer
+        usage = MemoryProbe().start().stop()
+        assert tracemalloc.is_tracing()
+        # 不重置调用方的峰值
+        assert tracemalloc.get_traced_memory()[1] >= 8 * _MB
+        assert usage["peak_bytes"] < _MB
+
+        probe = MemoryProbe().start()
+        buffer = bytearray(16 * _MB)
+        del buffer
+        assert probe.stop()["peak_bytes"] >= 16 * _MB
+    finally:
+        tracemalloc.stop()
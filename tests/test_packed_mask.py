@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from funcguard import DataFrameStatistics, PackedMask
+
+
+def test_packed_operations_match_boolean_arrays():
+    rng = np.random.default_rng(11)
+    for length in (0, 1, 7, 64, 1001):
+        a, b = rng.random(length) > 0.5, rng.random(length) > 0.3
+        pa, pb = PackedMask.from_mask(a), PackedMask.from_mask(b)
+
+        assert (pa & pb).count() == int((a & b).sum())
+        assert (pa | pb).count() == int((a | b).sum())
+        assert (pa ^ pb).count() == int((a ^ b).sum())
+        assert (~pa).count() == int((~a).sum())
+        np.testing.assert_array_equal((~pa | pb).to_numpy(), ~a | b)
+        np.testing.assert_array_equal(pa.positions(), np.flatnonzero(a))
+        assert pa.nbytes <= max(8, length // 8 + 8)
+
+
+def test_append_matches_concatenated_masks():
+    rng = np.random.default_rng(5)
+    for head, tail in ((0, 3), (5, 0), (7, 9), (64, 1), (13, 100)):
+        a, b = rng.random(head) > 0.5, rng.random(tail) > 0.5
+        appended = PackedMask.from_mask(a).append(b)
+        assert len(appended) == head + tail
+        assert appended.count() == int(a.sum() + b.sum())
+        np.testing.assert_array_equal(appended.to_numpy(), np.concatenate([a, b]))
+        np.testing.assert_array_equal((~appended).to_numpy(), ~np.concatenate([a, b]))
+
+    indexed = PackedMask.from_mask(pd.Series([True, False], index=[10, 20])).append(pd.Series([True], index=[30]))
+    assert list(indexed.to_series().index) == [10, 20, 30]
+
+
+def test_statistics_caches_packed_masks():
+    df = pd.DataFrame(
+        {"x": np.arange(1000), "y": pd.array([1, None] * 500, dtype="Int64")},
+        index=np.arange(1000) * 2,
+    )
+    stats = DataFrameStatistics(df)
+
+    packed = stats.build_packed_mask([("x", ">=", 100), ("x", "<", 900)])
+    assert isinstance(packed, PackedMask)
+    assert packed.count() == 800
+    assert stats.count([("x", ">=", 100), ("x", "<", 900)]) == 800
+    pd.testing.assert_series_equal(
+        stats.build_base_mask([("x", ">=", 100), ("x", "<", 900)]),
+        (df["x"] >= 100) & (df["x"] < 900),
+        check_names=False,
+    )
+
+    # 可空布尔结果保持 Series 缓存，NA 在压缩时视为 False
+    assert stats.count(("y", ">", 0)) == 500
+    assert (stats.build_packed_mask(("y", ">", 0)) & packed).count() == 400
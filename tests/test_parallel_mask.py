@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import DataFrameStatistics, pd_count, pd_filter
+from funcguard.pd_utils.statistics import parallel
+
+
+def _frame(n: int = 5003) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 65, n),
+            "name": pd.Series(rng.choice(["张三", "test_user", "", None, "李四"], n), dtype=object),
+            "dept": pd.Categorical(rng.choice(["IT", "HR", "Sales"], n)),
+            "score": pd.array(rng.integers(0, 5, n), dtype="Int64"),
+            "joined": pd.date_range("2024-01-01", periods=n, freq="h"),
+        },
+        index=rng.permutation(n),
+    )
+    df.loc[df.index[::9], "score"] = pd.NA
+    return df
+
+
+@pytest.fixture(autouse=True)
+def _small_threshold(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_ROWS", 0)
+
+
+def test_parallel_matches_serial():
+    df = _frame()
+    cases = [
+        ("name", "empty"),
+        [("age", ">", 30), ("dept", "in", ["IT", "HR"]), ("score", ">", 1)],
+        {"or": [("name", "contains", "test"), {"and": [("joined", ">=", "2024-03-01"), {"not": ("dept", "==", "HR")}]}]},
+    ]
+    for conditions in cases:
+        expected = pd_filter(df, conditions)
+        pd.testing.assert_frame_equal(pd_filter(df, conditions, parallel=3), expected)
+        assert pd_count(df, conditions, parallel=3) == pd_count(df, conditions) == len(expected)
+
+    stats = DataFrameStatistics(df, parallel=2)
+    assert stats.count(cases[1]) == len(pd_filter(df, cases[1]))
+    assert stats.cache_info()["misses"] == 1
+
+
+def test_parallel_argument_validation():
+    df = _frame(100)
+    with pytest.raises(ValueError):
+        pd_filter(df, ("age", ">", 30), parallel=0)
+    with pytest.raises(KeyError):
+        pd_count(df, ("missing", "==", 1), parallel=2)
+    # 掩码Series列表不受 parallel 影响
+    mask = df["age"] > 30
+    assert len(pd_filter(df, [mask], parallel=2)) == int(mask.sum())
+
+
+def test_mixed_object_column_falls_back_to_serial():
+    # 第一个分区中只有整数，单独求值时 .str 无法使用
+    code = pd.Series([1] * 1000 + ["xa", "b"] * 500, dtype=object)
+    df = pd.DataFrame({"code": code, "n": np.arange(2000)})
+    expected = pd_filter(df, ("code", "contains", "x"))
+    assert len(expected) == 500
+    pd.testing.assert_frame_equal(pd_filter(df, ("code", "contains", "x"), parallel=2), expected)
+    assert pd_count(df, [("n", ">=", 0), ("code", "contains", "x")], parallel=2) == 500
+    assert DataFrameStatistics(df, parallel=2).count(("code", "contains", "x")) == 500
@@ -32,3 +32,31 @@ def test_pd_filter_not_empty_excludes_real_empty_containers_and_nan():
     filtered = pd_filter(df, ("segments", "not empty"))
 
     assert filtered["segments"].tolist() == [[1, 2], "[]", {"a": 1}]
+
+
+def test_vectorized_empty_matches_elementwise_helpers():
+    import numpy as np
+
+    from funcguard.pd_utils.statistics.mask_utils import _series_mask
+
+    class MyList(list):
+        pass
+
+    columns = {
+        "object": pd.Series(
+            [[], [1], None, math.nan, "", "a", {}, {"k": 1}, (), set(), np.array([]), np.array([1]),
+             MyList(), b"", 0, pd.NaT, pd.NA],
+            dtype=object,
+        ),
+        "float": pd.Series([1.0, math.nan, 0.0]),
+        "int": pd.Series([0, 1, 2]),
+        "nullable_int": pd.Series([1, None, 0], dtype="Int64"),
+        "datetime": pd.Series(pd.to_datetime(["2024-01-01", None])),
+        "string": pd.Series(["", "a", None], dtype="string"),
+        "category": pd.Series(["", "a", None, "a"], dtype="category"),
+    }
+    for name, series in columns.items():
+        expected_empty = np.array([_is_empty(x) for x in series], dtype=bool)
+        expected_not_empty = np.array([_is_not_empty(x) for x in series], dtype=bool)
+        assert _series_mask(series, "empty", None).tolist() == expected_empty.tolist(), name
+        assert _series_mask(series, "not empty", None).tolist() == expected_not_empty.tolist(), name
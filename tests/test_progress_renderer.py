@@ -0,0 +1,29 @@
+import io
+import threading
+
+from funcguard import ProgressRenderer
+
+
+def test_progress_renderer_counts_across_threads_plain_output():
+    stream = io.StringIO()
+    with ProgressRenderer(stream=stream, plain_interval=0.05) as renderer:
+        bars = [renderer.add_bar(f"worker-{i}", total=4000) for i in range(2)]
+
+        def work(bar):
+            for _ in range(2000):
+                bar.update()
+
+        threads = [threading.Thread(target=work, args=(bar,)) for bar in bars for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for bar in bars:
+            bar.close()
+
+    assert [bar.count for bar in bars] == [4000, 4000]
+    output = stream.getvalue()
+    assert "\r" not in output and "\033[" not in output  # 非终端输出不含控制符
+    final_lines = output.splitlines()[-2:]
+    assert final_lines[0].startswith("worker-0 |") and "4000/4000" in final_lines[0]
+    assert final_lines[1].startswith("worker-1 |") and "4000/4000" in final_lines[1]
@@ -0,0 +1,91 @@
+import pytest
+
+from funcguard import time_utils
+from funcguard.time_utils import ProgressTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time_utils.time, "perf_counter", fake)
+    return fake
+
+
+def _track(clock, tracker):
+    emits = []
+
+    def log(message=None):
+        emits.append((clock.now, tracker.count))
+        return tracker.progress_info()
+
+    tracker.log = log
+    return emits
+
+
+def _run(clock, tracker, steps):
+    for seconds_per_item, items in steps:
+        for _ in range(items):
+            clock.now += seconds_per_item
+            tracker.update()
+
+
+def test_reads_clock_sparsely_and_reports_on_interval(clock):
+    tracker = ProgressTracker(100_000, "处理中", interval=4)
+    emits = _track(clock, tracker)
+
+    _run(clock, tracker, [(0.001, 100_000)])
+
+    assert clock.reads < 1_000
+    assert emits[-1] == (pytest.approx(100.0), 100_000)
+    gaps = [b[0] - a[0] for a, b in zip(emits, emits[1:-1])]
+    assert gaps and all(4 <= gap <= 4.5 for gap in gaps)
+
+
+def test_stride_shrinks_when_rate_drops(clock):
+    tracker = ProgressTracker(0, interval=4)
+    emits = _track(clock, tracker)
+
+    # 先以 1000 条/秒处理，再降到 10 条/秒
+    _run(clock, tracker, [(0.001, 20_000), (0.1, 600)])
+
+    slow = [emit for emit in emits if emit[1] > 20_000]
+    gaps = [b[0] - a[0] for a, b in zip(slow, slow[1:])]
+    # 降速后只有跨越降速点的那一次检查会滞后，之后的输出间隔不超过 interval 加一次检查的粒度
+    assert len(gaps) >= 10
+    assert all(gap <= 4.2 for gap in gaps[1:])
+
+
+def test_interval_zero_reports_every_check_and_finish(clock):
+    tracker = ProgressTracker(5, interval=0)
+    emits = _track(clock, tracker)
+
+    _run(clock, tracker, [(1.0, 5)])
+
+    assert [count for _, count in emits] == [1, 2, 3, 4, 5]
+
+
+def test_eta_and_etr_use_ewma_rate(clock):
+    tracker = ProgressTracker(100, interval=1000, alpha=1)
+    _track(clock, tracker)
+
+    _run(clock, tracker, [(0.5, 40)])
+
+    assert tracker.rate == pytest.approx(2.0)
+    assert tracker.etr() == "etr 0:00:30"
+    assert tracker.eta().startswith("eta ")
+    assert tracker.progress_info().startswith("40/100 ( eta ")
+
+
+def test_invalid_alpha():
+    with pytest.raises(ValueError):
+        ProgressTracker(10, alpha=0)
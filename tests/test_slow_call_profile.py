@@ -0,0 +1,120 @@
+import io
+import threading
+import time
+
+import pytest
+
+from funcguard import SlowCallProfile, configure_funcguard_logger, time_monitored
+from funcguard import monitor_utils
+from funcguard.monitor_utils import SamplingProfiler, arm_slow_call_sampler, capture_slow_call
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter():
+    monitor_utils._slow_call_limiter.reset()
+    yield
+    monitor_utils._slow_call_limiter.reset()
+
+
+def busy_work():
+    return sum(i * i for i in range(20_000))
+
+
+def test_rerun_mode_writes_cprofile_report(tmp_path):
+    config = SlowCallProfile(mode="rerun", save_dir=str(tmp_path))
+
+    path = capture_slow_call(busy_work, (), {}, 2.5, 1.0, config)
+
+    text = open(path, encoding="utf-8").read()
+    assert path.startswith(str(tmp_path))
+    assert "耗时: 2.500000秒，阈值: 1.0秒" in text
+    assert "分析模式: rerun" in text
+    assert "busy_work" in text and "cumulative" in text
+
+
+def test_sample_mode_writes_sampled_stacks(tmp_path):
+    config = SlowCallProfile(save_dir=str(tmp_path), sample_interval=0.001)
+    sampler = arm_slow_call_sampler(busy_work, config)
+    assert isinstance(sampler, SamplingProfiler)
+
+    sampler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        busy_work()
+    sampler.stop()
+    path = capture_slow_call(busy_work, (), {}, 0.05, 0.01, config, sampler)
+
+    text = open(path, encoding="utf-8").read()
+    assert "分析模式: sample" in text
+    assert "采样次数:" in text and "busy_work" in text
+    # 未传入 sampler 时没有可用数据
+    assert capture_slow_call(busy_work, (), {}, 0.05, 0.01, SlowCallProfile(save_dir=str(tmp_path))) is None
+
+
+def test_limiter_enforces_interval_and_max_captures(tmp_path):
+    config = SlowCallProfile(mode="rerun", save_dir=str(tmp_path), min_interval=3600, max_captures=10)
+    assert capture_slow_call(busy_work, (), {}, 2, 1, config) is not None
+    assert capture_slow_call(busy_work, (), {}, 2, 1, config) is None
+    # 限流期间不再启动采样线程
+    assert arm_slow_call_sampler(busy_work, SlowCallProfile(min_interval=3600)) is None
+
+    config = SlowCallProfile(mode="rerun", save_dir=str(tmp_path), min_interval=0, max_captures=2)
+    monitor_utils._slow_call_limiter.reset()
+    paths = [capture_slow_call(busy_work, (), {}, 2, 1, config) for _ in range(4)]
+    assert [path is not None for path in paths] == [True, True, False, False]
+
+
+def test_concurrent_slow_calls_do_not_exceed_limit():
+    config = SlowCallProfile(min_interval=0, max_captures=3)
+    limiter = monitor_utils._SlowCallLimiter()
+    barrier = threading.Barrier(16)
+    granted = []
+
+    def worker():
+        barrier.wait()
+        granted.append(limiter.acquire("f", config))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert granted.count(True) == 3
+
+
+def test_invalid_mode_and_missing_threshold(tmp_path):
+    with pytest.raises(ValueError):
+        capture_slow_call(busy_work, (), {}, 2, 1, SlowCallProfile(mode="trace", save_dir=str(tmp_path)))
+    with pytest.raises(ValueError):
+        time_monitored(slow_profile=SlowCallProfile())
+
+
+def test_time_monitored_captures_slow_call(tmp_path, capsys):
+    @time_monitored(0.0, high_resolution=True, slow_profile=SlowCallProfile(mode="rerun", save_dir=str(tmp_path)))
+    def job(n):
+        return sum(range(n))
+
+    assert job(1000) == sum(range(1000))
+    assert "慢调用分析报告已保存至" in capsys.readouterr().out
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_rerun_failure_is_logged_through_funcguard_logger(tmp_path, capsys):
+    def failing():
+        raise RuntimeError("boom")
+
+    stream = io.StringIO()
+    try:
+        configure_funcguard_logger(stream=stream, dedup=False)
+        path = capture_slow_call(failing, (), {}, 2, 1, SlowCallProfile(mode="rerun", save_dir=str(tmp_path)))
+        assert "cProfile 重新执行" in stream.getvalue() and "boom" in stream.getvalue()
+        assert capsys.readouterr().out == ""
+        assert path is not None  # 出错时仍保存已采集的统计数据
+
+        configure_funcguard_logger(silent=True)
+        monitor_utils._slow_call_limiter.reset()
+        capture_slow_call(failing, (), {}, 2, 1, SlowCallProfile(mode="rerun", save_dir=str(tmp_path)))
+        assert capsys.readouterr().out == ""
+    finally:
+        configure_funcguard_logger()
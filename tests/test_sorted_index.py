@@ -0,0 +1,65 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from funcguard import DataFrameStatistics, SortedIndex
+from funcguard.pd_utils.statistics.mask_utils import _series_mask
+
+
+def _events(n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(6)
+    ts = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 72, n), unit="h")
+    return pd.DataFrame(
+        {
+            "ts": pd.Series(ts).where(rng.random(n) > 0.1),
+            "amount": np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 100),
+            "qty": rng.integers(-5, 5, n),
+            "kind": rng.choice(["click", "view"], n),
+        }
+    )
+
+
+def test_range_lookups_match_column_scans():
+    df = _events()
+    cases = {
+        "ts": ["2024-01-02", pd.Timestamp("2024-01-02 05:00"), datetime.datetime(2024, 1, 3)],
+        "amount": [0, 50, 50.5, 100],
+        "qty": [-5, 0, 1.5, 2**70],
+    }
+    for column, values in cases.items():
+        index = SortedIndex(df[column])
+        for op in (">", ">=", "<", "<="):
+            for value in values:
+                expected = _series_mask(df[column], op, value).to_numpy(dtype=bool)
+                mask = index.mask(op, value)
+                if mask is None:
+                    continue
+                np.testing.assert_array_equal(mask, expected)
+                np.testing.assert_array_equal(index.positions(op, value), np.flatnonzero(expected))
+                assert index.count(op, value) == int(expected.sum())
+
+    # 类型不匹配时交给整列扫描
+    assert SortedIndex(df["ts"]).bounds(">", pd.Timestamp("2024-01-02", tz="UTC")) is None
+    assert SortedIndex(df["qty"]).bounds(">", True) is None
+
+
+def test_statistics_time_window_uses_sorted_index():
+    df = _events()
+    stats = DataFrameStatistics(df)
+    stats.create_index("ts", "amount", kind="sorted")
+    stats.create_index("kind")
+    fresh = DataFrameStatistics(df, cache_size=0)
+
+    window = [("ts", ">=", "2024-01-02"), ("ts", "<", "2024-01-03")]
+    assert stats._index_count(window, "and") == fresh.count(window)
+    assert stats.count(window) == fresh.count(window)
+
+    mixed = window + [("kind", "==", "click"), ("amount", ">", 20)]
+    assert stats.count(mixed) == fresh.count(mixed)
+    assert stats.count(mixed, "or") == fresh.count(mixed, "or")
+    assert stats.group_agg("kind", "amount", conditions=window) == fresh.group_agg("kind", "amount", conditions=window)
+
+    stats.drop_index(kind="sorted")
+    assert stats._index_count(window, "and") is None
+    assert stats.count(("kind", "==", "view")) == fresh.count(("kind", "==", "view"))
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import DataFrameStatistics
+
+
+def _events(n: int, start: int = 0, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amount = rng.random(n) * 100
+    amount[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame(
+        {
+            "status": rng.choice(["paid", "open", None], n),
+            "region": rng.choice(["north", "south", "east"], n),
+            "amount": amount,
+            "qty": rng.integers(0, 9, n).astype("int16"),
+        },
+        index=range(start, start + n),
+    )
+
+
+QUERIES = {
+    "paid": {"type": "count", "conditions": ("status", "==", "paid")},
+    "statuses": {"type": "value_counts", "column": "status", "dropna": False, "sort": "desc"},
+    "regions": {"type": "value_counts", "column": "region", "mode": "percent", "conditions": [("amount", ">", 50)]},
+    "by_region": {
+        "type": "group_agg",
+        "group_col": ["region", "status"],
+        "aggs": {"total": ("amount", "sum"), "avg": ("amount", "mean"), "low": ("qty", "min"), "n": ("qty", "count")},
+        "return_type": "df",
+    },
+    "qty": {"type": "group_agg", "group_col": "region", "agg_col": "qty", "sort": "asc",
+            "conditions": {"or": [("status", "==", "open"), ("amount", "<", 10)]}},
+}
+
+
+def _fresh(df: pd.DataFrame) -> dict:
+    stats = DataFrameStatistics(df)
+    results = {}
+    for query_id, spec in QUERIES.items():
+        spec = dict(spec)
+        results[query_id] = getattr(stats, spec.pop("type"))(**spec)
+    return results
+
+
+def test_append_updates_maintained_queries_and_cached_masks():
+    stats = DataFrameStatistics(_events(997))
+    stats.maintain(QUERIES)
+    window = [("region", "==", "north"), ("amount", ">", 30)]
+    stats.count(window)
+
+    for batch in range(5):
+        stats.append(_events(61, start=997 + batch * 61, seed=batch + 1))
+        misses = stats.cache_info()["misses"]
+        assert stats.count(window) == DataFrameStatistics(stats.df).count(window)
+        # 追加后缓存的掩码仍然有效
+        assert stats.cache_info()["misses"] == misses
+
+    results, expected = stats.maintained_results(), _fresh(stats.df)
+    assert len(stats.df) == 997 + 5 * 61
+    for query_id in ("paid", "statuses", "qty"):
+        assert results[query_id] == expected[query_id]
+    assert results["regions"] == pytest.approx(expected["regions"])
+    pd.testing.assert_frame_equal(results["by_region"], expected["by_region"])
+
+
+def test_append_validation_and_in_place_changes():
+    df = _events(200)
+    stats = DataFrameStatistics(df)
+    stats.maintain([{"type": "count", "conditions": ("qty", ">", 4)}])
+
+    with pytest.raises(ValueError):
+        stats.append(_events(5).drop(columns="qty"))
+    with pytest.raises(ValueError):
+        stats.maintain({"median": {"type": "group_agg", "group_col": "region", "agg_col": "qty", "agg_func": "median"}})
+    with pytest.raises(KeyError):
+        stats.maintained_results("missing")
+
+    # 整列替换后登记的查询在全部行上重新计算
+    df["qty"] = 9
+    assert stats.maintained_results() == {0: 200}
+
+    # 原地修改不改变数据缓冲区，需要 invalidate()，或启用 strict_check 比较抽样行
+    df.loc[:, "qty"] = 0
+    assert stats.maintained_results() == {0: 200}
+    stats.invalidate()
+    assert stats.maintained_results() == {0: 0}
+
+    strict = DataFrameStatistics(df, strict_check=True)
+    strict.maintain([{"type": "count", "conditions": ("qty", ">", 4)}])
+    df.loc[:, "qty"] = 9
+    assert strict.maintained_results() == {0: 200}
+
+
+def test_append_defers_concatenation_until_full_frame_is_needed(monkeypatch):
+    stats = DataFrameStatistics(_events(500))
+    stats.maintain({key: QUERIES[key] for key in ("paid", "statuses", "by_region")})
+    window = [("region", "==", "north"), ("amount", ">", 30)]
+    stats.count(window)
+
+    concatenated = []
+    original = pd.concat
+
+    def record(objs, *args, **kwargs):
+        concatenated.append(sum(len(obj) for obj in objs))
+        return original(objs, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "concat", record)
+    for batch in range(4):
+        stats.append(_events(50, start=500 + batch * 50, seed=batch + 1))
+        stats.maintained_results()
+        stats.count(window)
+        assert len(stats._chunks) == batch + 1
+    # 只有部分结果的合并调用 concat，每次拼接的行数与总行数无关
+    assert concatenated and max(concatenated) < 500
+    assert len(stats._frame) == 500
+
+    concatenated.clear()
+    assert len(stats.df) == 700
+    assert concatenated == [700] and not stats._chunks
+
+
+def test_append_is_isolated_from_caller_frames():
+    df, new_rows = _events(100), _events(20, start=100, seed=1)
+    stats = DataFrameStatistics(df)
+    stats.maintain({"n": {"type": "count", "conditions": ("qty", ">", 4)}})
+    expected = int((df["qty"] > 4).sum() + (new_rows["qty"] > 4).sum())
+    stats.append(new_rows)
+
+    # 拼接前修改调用方的 DataFrame 不影响统计
+    df["qty"] = 0
+    new_rows["qty"] = 0
+    assert stats.maintained_results() == {"n": expected}
+    assert stats.count(("qty", ">", 4)) == expected
+    assert len(stats.df) == 120 and int((stats.df["qty"] > 4).sum()) == expected
+
+
+def test_maintained_group_agg_keeps_group_agg_dtypes():
+    def frame(n, start, seed):
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame(
+            {
+                "g": rng.choice(["a", "b"], n),
+                "i32": rng.integers(-50, 50, n).astype("int32"),
+                "i8": rng.integers(0, 100, n).astype("int8"),
+                "f32": rng.random(n).astype("float32"),
+            },
+            index=range(start, start + n),
+        )
+
+    aggs = {
+        "max": ("i32", "max"), "min": ("i32", "min"), "sum32": ("i32", "sum"), "sum8": ("i8", "sum"),
+        "mean8": ("i8", "mean"), "n": ("i8", "count"), "fsum": ("f32", "sum"), "fmax": ("f32", "max"),
+    }
+    stats = DataFrameStatistics(frame(100, 0, 1))
+    stats.maintain({"by_g": {"type": "group_agg", "group_col": "g", "aggs": aggs, "return_type": "df"}})
+    for batch in range(3):
+        stats.append(frame(40, 100 + batch * 40, batch + 2))
+
+    result = stats.maintained_results()["by_g"]
+    expected = DataFrameStatistics(stats.df).group_agg("g", aggs=aggs, return_type="df")
+    pd.testing.assert_frame_equal(result, expected, check_exact=False)
+    assert result["max"].dtype == np.int32 and result["sum8"].dtype == np.int64
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funcguard import DataFrameStatistics
+
+
+def _frame(n: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    return pd.DataFrame(
+        {
+            "dept": rng.choice(["IT", "HR", "Sales", None], n),
+            "age": rng.integers(18, 65, n),
+            "salary": rng.random(n) * 1000,
+        }
+    )
+
+
+def test_run_batch_matches_individual_calls():
+    df = _frame()
+    stats = DataFrameStatistics(df)
+    adults = [("age", ">=", 30)]
+    queries = {
+        "n": {"type": "count", "conditions": adults},
+        "n_or": {"type": "count", "conditions": [("age", "<", 20), ("dept", "==", "IT")], "logic": "or"},
+        "depts": {"type": "value_counts", "column": "dept", "conditions": adults, "mode": "percent", "sort": "desc"},
+        "all_depts": {"type": "value_counts", "column": "dept", "dropna": False},
+        "mean": {"type": "group_agg", "group_col": "dept", "agg_col": "salary", "agg_func": "mean", "conditions": adults},
+        "max_age": {"type": "group_agg", "group_col": "dept", "agg_col": "age", "agg_func": "max",
+                    "conditions": adults, "sort": "asc", "return_type": "series"},
+        "total": {"type": "group_agg", "group_col": "dept", "agg_col": "salary", "return_type": "df"},
+    }
+    results = stats.run_batch(queries)
+
+    fresh = DataFrameStatistics(df, cache_size=0)
+    assert results["n"] == fresh.count(adults)
+    assert results["n_or"] == fresh.count([("age", "<", 20), ("dept", "==", "IT")], "or")
+    assert results["depts"] == fresh.value_counts("dept", "percent", "desc", conditions=adults)
+    assert results["all_depts"] == fresh.value_counts("dept", dropna=False)
+    assert results["mean"] == fresh.group_agg("dept", "salary", "mean", conditions=adults)
+    pd.testing.assert_series_equal(
+        results["max_age"],
+        fresh.group_agg("dept", "age", "max", "asc", conditions=adults, return_type="series"),
+    )
+    pd.testing.assert_frame_equal(results["total"], fresh.group_agg("dept", "salary", return_type="df"))
+
+    # 相同的过滤条件只构建一次掩码
+    assert stats.cache_info()["misses"] == 2
+
+
+def test_run_batch_list_ids_and_validation():
+    stats = DataFrameStatistics(_frame())
+    results = stats.run_batch([
+        {"type": "count", "conditions": ("dept", "==", "IT")},
+        {"id": "hr", "type": "count", "conditions": ("dept", "==", "HR")},
+    ])
+    assert set(results) == {0, "hr"}
+
+    with pytest.raises(ValueError, match="类型不支持"):
+        stats.run_batch([{"type": "sum"}])
+    with pytest.raises(ValueError, match="缺少 column"):
+        stats.run_batch([{"type": "value_counts", "conditions": ("dept", "==", "IT")}])
+    with pytest.raises(ValueError, match="缺少 group_col"):
+        stats.run_batch([{"type": "group_agg", "agg_col": "age"}])
+    with pytest.raises(ValueError, match="agg_func"):
+        stats.run_batch([{"type": "group_agg", "group_col": "dept", "agg_col": "age", "agg_func": "mode"}])
+    with pytest.raises(ValueError, match="series"):
+        stats.run_batch([{"type": "group_agg", "group_col": "dept", "agg_col": ["age", "salary"],
+                          "return_type": "series"}])
+
+
+def test_run_batch_group_agg_forms_match_group_agg():
+    df = _frame()
+    df["region"] = np.where(df["age"] % 2 == 0, "north", "south")
+    stats = DataFrameStatistics(df)
+    adults = [("age", ">=", 30)]
+    aggs = {"total": ("salary", "sum"), "orders": ("salary", "count"), "oldest": ("age", "max")}
+    queries = {
+        "aggs": {"type": "group_agg", "group_col": "dept", "aggs": aggs, "conditions": adults, "sort": "desc"},
+        "cols": {"type": "group_agg", "group_col": "dept", "agg_col": ["salary", "age"], "agg_func": "mean",
+                 "conditions": adults, "return_type": "df"},
+        "funcs": {"type": "group_agg", "group_col": "dept", "agg_col": "salary", "agg_func": ["sum", "max"],
+                  "conditions": adults},
+        "keys": {"type": "group_agg", "group_col": ["region", "dept"], "agg_col": "salary", "agg_func": "mean"},
+        "single": {"type": "group_agg", "group_col": "dept", "agg_col": "salary", "conditions": adults},
+    }
+    results = stats.run_batch(queries)
+
+    fresh = DataFrameStatistics(df, cache_size=0)
+    assert results["aggs"] == fresh.group_agg("dept", aggs=aggs, conditions=adults, sort="desc")
+    pd.testing.assert_frame_equal(
+        results["cols"], fresh.group_agg("dept", ["salary", "age"], "mean", conditions=adults, return_type="df")
+    )
+    assert results["funcs"] == fresh.group_agg("dept", "salary", ["sum", "max"], conditions=adults)
+    assert results["keys"] == fresh.group_agg(["region", "dept"], "salary", "mean")
+    assert results["single"] == fresh.group_agg("dept", "salary", conditions=adults)
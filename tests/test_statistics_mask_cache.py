@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from funcguard import DataFrameStatistics, pd_count, pd_group_agg, pd_value_counts
+from funcguard.pd_utils.statistics import df_statistics
+
+
+def _frame(n: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    return pd.DataFrame(
+        {
+            "dept": rng.choice(["IT", "HR", "Sales"], n),
+            "age": rng.integers(18, 65, n),
+            "salary": rng.random(n) * 1000,
+        }
+    )
+
+
+def test_repeated_queries_reuse_cached_masks():
+    df = _frame()
+    stats = DataFrameStatistics(df)
+    conditions = [("age", ">", 30), ("dept", "in", ["IT", "HR"])]
+
+    assert stats.count(conditions) == pd_count(df, conditions)
+    assert stats.value_counts("dept", conditions=conditions) == pd_value_counts(df, "dept", conditions=conditions)
+    assert stats.group_agg("dept", "salary", "sum", conditions=conditions) == pd_group_agg(
+        df, "dept", "salary", "sum", conditions=conditions
+    )
+    assert stats.cache_info()["misses"] == 1
+    assert stats.cache_info()["hits"] == 2
+
+    # 返回副本，调用方修改不影响缓存
+    mask = stats.build_base_mask(conditions)
+    mask[:] = False
+    assert stats.count(conditions) == pd_count(df, conditions)
+
+
+def test_cache_is_bounded_and_invalidated_on_mutation():
+    df = _frame()
+    stats = DataFrameStatistics(df, cache_size=2)
+    for age in (20, 30, 40):
+        stats.count([("age", ">", age)])
+    assert stats.cache_info()["size"] == 2
+
+    # 整列替换：长度不变，但数据地址和取值变化
+    df["age"] = df["age"] + 100
+    assert stats.count([("age", ">", 40)]) == len(df)
+
+    # 抽样行之外的原地修改需要手动失效
+    df.loc[1, "dept"] = "Ops"
+    stats.invalidate()
+    assert stats.count(("dept", "==", "Ops")) == 1
+
+
+def test_replacing_a_column_only_drops_masks_that_depend_on_it():
+    df = _frame()
+    stats = DataFrameStatistics(df)
+    stats.count(("dept", "==", "IT"))
+    stats.count([("age", ">", 40)])
+
+    df["age"] = df["age"] - 100
+    assert stats.count([("age", ">", 40)]) == 0
+    assert stats.count(("dept", "==", "IT")) == pd_count(df, ("dept", "==", "IT"))
+    assert stats.cache_info()["hits"] == 1  # dept 的掩码仍然有效
+
+    # 替换后的列再次被替换，即使新缓冲区复用了已释放的地址也能检测到
+    for _ in range(5):
+        df["age"] = df["age"] + 100
+        assert stats.count([("age", ">", 40)]) == pd_count(df, [("age", ">", 40)])
+        df["age"] = df["age"] - 100
+
+
+def test_strict_check_detects_in_place_changes_on_sampled_rows():
+    df = _frame()
+    stats = DataFrameStatistics(df, strict_check=True)
+    assert stats.count(("age", "<", 0)) == 0
+
+    df.loc[0, "age"] = -1  # 第 0 行始终在抽样行中
+    assert stats.count(("age", "<", 0)) == 1
+
+
+def test_cache_hit_on_wide_frame_only_checks_referenced_columns(monkeypatch):
+    df = pd.DataFrame(np.random.default_rng(0).random((1000, 300)), columns=[f"c{i}" for i in range(300)])
+    stats = DataFrameStatistics(df)
+    conditions = [("c5", ">", 0.5)]
+    assert stats.count(conditions) == pd_count(df, conditions)
+
+    checked = []
+    original = df_statistics._column_token
+
+    def record(series, strict=False):
+        checked.append(series.name)
+        return original(series, strict)
+
+    monkeypatch.setattr(df_statistics, "_column_token", record)
+    for _ in range(20):
+        assert stats.count(conditions) == pd_count(df, conditions)
+    # 命中缓存时只校验查询引用的列，与列数无关
+    assert set(checked) == {"c5"} and len(checked) == 20
+    assert stats.cache_info()["hits"] == 20 and stats.cache_info()["misses"] == 1
+
+
+def test_column_replacement_detected_after_frame_level_reset():
+    df = pd.DataFrame({"x": [1, 2, 3, 4]})
+    stats = DataFrameStatistics(df)
+    assert stats.count(("x", ">", 1)) == 3
+    df.index = [10, 11, 12, 13]
+    assert stats.count(("x", ">", 1)) == 3
+    df["x"] = [0, 0, 0, 0]
+    assert stats.count(("x", ">", 1)) == 0
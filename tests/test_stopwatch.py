@@ -0,0 +1,111 @@
+import pytest
+
+from funcguard import time_utils
+from funcguard.time_utils import Stopwatch, timer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += int(seconds * 1e9)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time_utils.time, "perf_counter_ns", fake)
+    return fake
+
+
+def _total(node):
+    return sum(lap["elapsed"] for lap in node["laps"]) + sum(child["elapsed"] for child in node["children"])
+
+
+def test_nested_timers_build_tree(clock):
+    with timer("pipeline") as t:
+        clock.advance(1)
+        t.lap("load")
+        with timer("transform"):
+            clock.advance(0.5)
+            with timer("clean") as inner:
+                clock.advance(0.25)
+                inner.lap("dedup")
+            clock.advance(0.25)
+        clock.advance(2)
+        t.lap("save")
+
+    result = t.to_dict()
+    assert result == {
+        "name": "pipeline",
+        "elapsed": 4.0,
+        "laps": [{"name": "load", "elapsed": 1.0}, {"name": "save", "elapsed": 2.0}],
+        "children": [{
+            "name": "transform",
+            "elapsed": 1.0,
+            "laps": [],
+            "children": [{"name": "clean", "elapsed": 0.25, "laps": [{"name": "dedup", "elapsed": 0.25}], "children": []}],
+        }],
+    }
+    # 子计时器结束后，父计时器的下一个分段从子计时器结束时开始，分段与子计时器耗时之和等于总耗时
+    assert _total(result) == result["elapsed"]
+    assert [type(item) for item in t.items] == [tuple, Stopwatch, tuple]
+
+
+def test_child_durations_fit_within_parent_with_real_clock():
+    with timer("outer") as outer:
+        for i in range(3):
+            with outer.child(f"step{i}"):
+                sum(range(10_000))
+        outer.lap("tail")
+
+    result = outer.to_dict()
+    assert [child["name"] for child in result["children"]] == ["step0", "step1", "step2"]
+    assert _total(result) <= result["elapsed"]
+    assert all(child["elapsed"] <= result["elapsed"] for child in result["children"])
+
+
+def test_explicit_start_stop_and_lap_before_start(clock):
+    watch = Stopwatch("manual")
+    with pytest.raises(RuntimeError):
+        watch.lap("too early")
+
+    watch.start()
+    clock.advance(0.5)
+    assert watch.elapsed == 0.5  # 未结束时返回截至当前的耗时
+    assert watch.lap("a") == 0.5
+    clock.advance(1)
+    assert watch.stop() == 1.5
+    clock.advance(10)
+    assert watch.stop() == 1.5  # 重复 stop 不改变结果
+
+
+def test_timer_stack_is_restored_after_exception(clock):
+    with pytest.raises(ValueError):
+        with timer("failing"):
+            raise ValueError("boom")
+
+    with timer("next") as t:
+        pass
+    assert t._parent is None
+
+
+def test_summary_prints_tree_with_percentages(clock, monkeypatch):
+    logged = []
+    monkeypatch.setattr(time_utils.color_logger, "log", lambda level, text: logged.append(text))
+
+    with timer("job", summary=True) as t:
+        clock.advance(1)
+        t.lap("a")
+        with timer("b"):
+            clock.advance(3)
+
+    assert logged == [
+        "job: 4.000000s\n"
+        "├─ a: 1.000000s (25.0%)\n"
+        "└─ b: 3.000000s (75.0%)"
+    ]
@@ -0,0 +1,47 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from funcguard import DataFrameStatistics, pd_build_mask, pd_count
+from funcguard.pd_utils.statistics.mask_utils import _string_predicate
+
+
+def _names(n: int = 20000) -> pd.DataFrame:
+    rng = np.random.default_rng(9)
+    values = np.array(["apple_1", "Banana", "cherry_22", "", None, np.nan], dtype=object)
+    return pd.DataFrame(
+        {
+            "obj": values[rng.integers(0, len(values), n)],
+            "str": pd.Series(values[rng.integers(0, len(values), n)], dtype="str"),
+            "cat": pd.Series(values[rng.integers(0, len(values), n)]).astype("category"),
+            "score": rng.random(n),
+        }
+    )
+
+
+def test_dictionary_evaluation_matches_row_by_row():
+    df = _names()
+    cases = [
+        ("contains", "an"), ("not contains", "an"), ("startswith", "ch"), ("endswith", "1"),
+        ("regex", r"_\d+$"), ("regex", re.compile("^b", re.IGNORECASE)),
+    ]
+    for column in ("obj", "str", "cat"):
+        for op, value in cases:
+            pd.testing.assert_series_equal(
+                pd_build_mask(df, (column, op, value)), _string_predicate(df[column], op, value)
+            )
+
+
+def test_statistics_caches_string_dictionary():
+    df = _names()
+    stats = DataFrameStatistics(df, cache_size=0)
+    condition = ("obj", "regex", re.compile(r"_\d+$"))
+    expected = int(_string_predicate(df["obj"], "regex", condition[2]).sum())
+    assert stats.count(condition) == expected
+    assert stats.count(condition) == expected
+    assert ("obj", "dictionary") in stats._column_indexes
+
+    mixed = [("str", "not contains", "an"), ("score", ">", 0.3)]
+    assert stats.count(mixed) == pd_count(df, mixed)
+    assert stats.count(mixed, "or") == pd_count(df, mixed, "or")
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from funcguard import time_monitor, time_monitored
+from funcguard.monitor_utils import TimingRegistry, TimingStats, timed, timing_registry
+
+
+def test_percentiles_from_known_samples():
+    stats = TimingStats("f", reservoir_size=1024)
+    rng = random.Random(0)
+    for elapsed_ns in random.Random(1).sample(range(101), 101):
+        stats.add(elapsed_ns, rng)
+
+    assert stats.percentile(50) == 50
+    assert stats.percentile(95) == 95
+    row = stats.to_dict()
+    assert row["count"] == 101
+    assert row["total"] == pytest.approx(sum(range(101)) / 1e9)
+    assert row["min"] == 0 and row["max"] == pytest.approx(100 / 1e9)
+    assert row["p99"] == pytest.approx(99 / 1e9)
+
+
+def test_reservoir_is_bounded_and_deterministic_with_seeded_rng():
+    def run(seed):
+        stats = TimingStats("f", reservoir_size=100)
+        rng = random.Random(seed)
+        for elapsed_ns in range(10_000):
+            stats.add(elapsed_ns, rng)
+        return stats
+
+    stats = run(42)
+    assert len(stats._samples) == 100
+    assert stats._samples == run(42)._samples
+    # 均匀样本的估计值应接近真实百分位
+    assert abs(stats.percentile(50) - 5_000) < 1_500
+    assert stats.count == 10_000 and stats.total_ns == sum(range(10_000))
+    assert stats.min_ns == 0 and stats.max_ns == 9_999
+
+
+def test_registry_stats_report_and_reset(capsys):
+    registry = TimingRegistry()
+    for elapsed_ns in (1_000_000, 3_000_000):
+        registry.record("slow", elapsed_ns)
+    registry.record("fast", 500_000)
+
+    assert [row["name"] for row in registry.stats()] == ["slow", "fast"]
+    assert [row["name"] for row in registry.stats("count")] == ["slow", "fast"]
+    assert registry.get("slow")["mean"] == pytest.approx(0.002)
+    with pytest.raises(ValueError):
+        registry.stats("unknown")
+
+    rows = registry.report(top=1)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(rows) == 1 and len(lines) == 3
+    assert lines[2].split()[:3] == ["slow", "2", "4.000"]
+
+    registry.reset()
+    assert registry.stats() == [] and registry.get("slow") is None
+
+
+def test_timed_records_calls_including_exceptions():
+    registry = TimingRegistry()
+
+    @timed(name="job", registry=registry)
+    def job(fail=False):
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    assert job() == "ok"
+    with pytest.raises(RuntimeError):
+        job(fail=True)
+    assert registry.get("job")["count"] == 2
+    assert job.__name__ == "job"
+
+
+def test_timed_without_arguments_uses_global_registry():
+    @timed
+    def plain():
+        return 1
+
+    key = f"{__name__}.test_timed_without_arguments_uses_global_registry.<locals>.plain"
+    before = (timing_registry.get(key) or {"count": 0})["count"]
+    plain()
+    assert timing_registry.get(key)["count"] == before + 1
+
+
+def test_monitor_options_do_not_swallow_function_kwargs():
+    def target(x, high_resolution=None, track_memory=None, slow_profile=None, memory_threshold=None):
+        return x, high_resolution, track_memory, slow_profile, memory_threshold
+
+    result = time_monitor(None, 2, target, 1, high_resolution=True, track_memory="t",
+                          slow_profile="s", memory_threshold=5)
+    assert result == (1, True, "t", "s", 5)
+
+    wrapped = time_monitored(print_mode=0, high_resolution=True)(target)
+    value, seconds = wrapped(2, track_memory=True)
+    assert value == (2, None, True, None, None)
+    assert isinstance(seconds, float)
+
+
+def test_time_monitored_validates_options():
+    with pytest.raises(ValueError):
+        time_monitored(print_mode=3)
+    with pytest.raises(ValueError):
+        time_monitored(memory_threshold=10)
+    with pytest.raises(ValueError):
+        time_monitor(func=None)